@@ -1,33 +1,336 @@
+import argparse
 import locale
+import logging
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from itertools import repeat
+from time import perf_counter
 
+from booker import config, tracing
+from booker.availability import unavailable_dates
+from booker.bench import compare_profiles, run_bench
+from booker.listing import ListingFingerprint
+from booker.notifier import SlackNotifier
+from booker.recorder import finish_recording
+from booker.scheduler import Sniper, parse_reservable_start
+from booker.session import SessionPool
 from booker.tasks import (
     CheckingConnectionTask,
+    DigestNotificationTask,
+    HttpReservationTask,
+    IndexingSlotTask,
     LoadingUserTask,
     NotificationTask,
     ReservationTask,
 )
+from booker.tracing import span
 from booker.types import User
+from booker.waits import latency_store
 
 locale.setlocale(locale.LC_TIME, "ja_JP.UTF-8")
 
+LOG_FORMAT = "%(asctime)s [%(threadName)s] %(levelname)s %(message)s"
 
-def main():
-    checking_connection_task = CheckingConnectionTask()
-    checking_connection_task()
 
-    if checking_connection_task.is_connectable:
+def cli():
+    parser = argparse.ArgumentParser(prog="booker")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=config.WORKERS,
+        help="number of users to process concurrently",
+    )
+    subparsers = parser.add_subparsers(dest="command")
+    bench_parser = subparsers.add_parser(
+        "bench", help="run the pipeline against a local fake site"
+    )
+    bench_parser.add_argument(
+        "--users", type=int, default=20, help="number of synthetic users"
+    )
+    bench_parser.add_argument(
+        "--dates", type=int, default=30, help="number of listed dates"
+    )
+    bench_parser.add_argument(
+        "--capacity",
+        type=int,
+        default=None,
+        help="applications per date (default: number of users)",
+    )
+    bench_parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.0,
+        help="seconds the fake site waits before each response",
+    )
+    bench_parser.add_argument(
+        "--host",
+        default="127.0.0.1",
+        help="address the fake site listens on",
+    )
+    bench_parser.add_argument(
+        "--public-host",
+        default=None,
+        help="host name the browser uses to reach the fake site",
+    )
+    bench_parser.add_argument(
+        "--asset-latency",
+        type=float,
+        default=0.0,
+        help="seconds the fake site waits before images, fonts and scripts",
+    )
+    bench_parser.add_argument(
+        "--profiles",
+        default=None,
+        help="comma separated browser profiles to compare, e.g. default,fast",
+    )
+    bench_parser.add_argument(
+        "--output", default=None, help="write the results as JSON"
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format=LOG_FORMAT)
+    if args.command == "bench":
+        kwargs = {
+            "users": args.users,
+            "dates": args.dates,
+            "capacity": args.capacity,
+            "latency": args.latency,
+            "asset_latency": args.asset_latency,
+            "workers": args.workers,
+            "host": args.host,
+            "public_host": args.public_host,
+            "output": args.output,
+        }
+        if args.profiles:
+            compare_profiles(args.profiles.split(","), **kwargs)
+        else:
+            run_bench(**kwargs)
+    else:
+        main(workers=args.workers)
+
+
+def main(workers=None):
+    # a local driver has no hub to wait for
+    if config.ENGINE == "selenium" and config.DRIVER == "remote":
+        checking_connection_task = CheckingConnectionTask()
+        checking_connection_task()
+        if not checking_connection_task.is_connectable:
+            return
+
+    # users are streamed, so loading ends once they are all read
+    with span("load_users"):
         loading_user_task = LoadingUserTask()
         loading_user_task()
+        users = list(loading_user_task.users)
+    logging.info(
+        f"👥 Loaded {len(users)} users for shard "
+        f"{config.SHARD_INDEX + 1}/{config.SHARD_COUNT}."
+    )
+
+    workers = max(workers or config.WORKERS, 1)
+    session_pool = None
+    if config.ENGINE == "selenium":
+        session_pool = SessionPool(size=workers)
+        # an unchanged listing needs a single session
+        session_pool.start(lazy=config.INCREMENTAL)
+
+    notifier = SlackNotifier()
+    sniper = None
+    fingerprint = None
+    if config.INCREMENTAL:
+        fingerprint = ListingFingerprint(users)
+        fingerprint.load()
+    try:
+        indexing_slot_task = IndexingSlotTask(
+            session_pool,
+            [
+                user.date_pattern
+                for user in valid_users(users)
+                if isinstance(user.date_pattern, str)
+            ],
+            fingerprint,
+        )
+        with span("index_slots"):
+            indexing_slot_task()
+        # dates only appear at opening when sniping
+        if fingerprint and not config.SNIPE and not indexing_slot_task.slots:
+            logging.info("🟰 Listing is unchanged, nothing to do.")
+            return
+        if config.SNIPE:
+            sniper = snipe(indexing_slot_task, session_pool)
+
+        started_at = perf_counter()
+        with ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="booker"
+        ) as executor:
+            results = list(
+                executor.map(
+                    run_tasks,
+                    users,
+                    repeat(session_pool),
+                    repeat(indexing_slot_task),
+                    repeat(notifier),
+                )
+            )
+        if config.NOTIFICATION_MODE == "digest":
+            digest_notification_task = DigestNotificationTask(
+                [
+                    reservation
+                    for _, _, _, reservations in results
+                    for reservation in reservations
+                ],
+                notifier,
+            )
+            digest_notification_task()
+        if fingerprint is not None:
+            save_fingerprint(fingerprint, indexing_slot_task, users, results)
+    finally:
+        if session_pool is not None:
+            session_pool.close()
+        notifier.close()
+        if latency_store().dirty:
+            latency_store().save()
+        if (
+            config.UNAVAILABLE_PERSIST
+            and unavailable_dates() is not None
+            and unavailable_dates().dirty
+        ):
+            unavailable_dates().save()
+    report(results, perf_counter() - started_at)
+    report_unavailable_dates()
+    if sniper is not None:
+        report_gaps(sniper, results)
+    tracing.export()
+    if not finish_recording():
+        sys.exit(1)
+
+
+def snipe(indexing_slot_task, session_pool=None):
+    opens_at = parse_reservable_start(indexing_slot_task.reservable_start)
+    if opens_at is None:
+        logging.warning("⛔ Reservable start date not found, firing now.")
+        return None
+
+    sniper = Sniper(opens_at, config.SNIPE_LEAD_TIME)
+    if unavailable_dates() is not None:
+        unavailable_dates().not_before = sniper.opening
+    sniper.wait(
+        keepalive=session_pool.keep_alive if session_pool is not None else None
+    )
+
+    # dates may only be listed once booking opens
+    if not indexing_slot_task.slots:
+        indexing_slot_task()
+    return sniper
+
+
+def run_tasks(
+    user_kwargs, session_pool=None, indexing_slot_task=None, notifier=None
+):
+    tag = user_kwargs.get("email")
+    threading.current_thread().name = f"booker-{tag}"
+    tracing.tag(user=tag)
+
+    started_at = perf_counter()
+    try:
+        with span("user"):
+            reservations = do_tasks(
+                user_kwargs, session_pool, indexing_slot_task, notifier
+            )
+    except Exception:
+        logging.exception(f"🚨 Failed to process {tag}!")
+        succeeded, reservations = False, []
+    else:
+        succeeded = True
+    return tag, perf_counter() - started_at, succeeded, reservations
+
+
+# a broken record fails its own user in run_tasks, not the whole run
+def valid_users(users):
+    for user_kwargs in users:
+        try:
+            yield User(**user_kwargs)
+        except TypeError:
+            continue
+
+
+def save_fingerprint(fingerprint, indexing_slot_task, users, results):
+    # full dates come back when their marker changes, failed ones always
+    unsettled = set(indexing_slot_task.unsettled)
+    failed = {tag for tag, _, succeeded, _ in results if not succeeded}
+    for user in valid_users(users):
+        if user.email in failed:
+            unsettled.update(
+                slot.text for slot in indexing_slot_task.slots_for(user)
+            )
+
+    if unsettled:
+        logging.info(f"🧾 {len(unsettled)} dates will be retried next run.")
+    fingerprint.save(
+        [
+            slot
+            for slot in indexing_slot_task.listing
+            if slot.text not in unsettled
+        ]
+    )
+
+
+def report(results, elapsed):
+    logging.info(f"📊 Processed {len(results)} users in {elapsed:.2f}s.")
+    for tag, user_elapsed, succeeded, reservations in results:
+        mark = "✅" if succeeded else "🚨"
+        logging.info(
+            f"{mark} {tag}: {user_elapsed:.2f}s, "
+            f"{len(reservations)} reservations"
+        )
+
+
+def report_unavailable_dates():
+    dates = unavailable_dates()
+    if dates is None or not dates.hits + dates.misses:
+        return
+    # every hit is a date page that was never opened
+    logging.info(
+        f"🈵 Unavailable dates cache: {dates.hits} hits, "
+        f"{dates.misses} misses, saved {dates.hits} page loads."
+    )
+
 
-        for user_kwargs in loading_user_task.users:
-            do_tasks(user_kwargs)
+def report_gaps(sniper, results):
+    gaps = sorted(
+        sniper.gap(reservation.submitted_at)
+        for _, _, _, reservations in results
+        for reservation in reservations
+        if reservation.submitted_at is not None
+    )
+    if gaps:
+        logging.info(
+            f"🎯 Submitted {len(gaps)} reservations "
+            f"{gaps[0]:+.3f}s to {gaps[-1]:+.3f}s from opening."
+        )
 
 
-def do_tasks(user_kwargs):
+def do_tasks(
+    user_kwargs, session_pool=None, indexing_slot_task=None, notifier=None
+):
     user = User(**user_kwargs)
+    slots = None
+    if indexing_slot_task is not None:
+        slots = indexing_slot_task.slots_for(user)
 
-    reservation_task = ReservationTask(user)
+    if config.ENGINE == "http":
+        reservation_task = HttpReservationTask(user, session_pool, slots)
+    else:
+        reservation_task = ReservationTask(user, session_pool, slots)
     reservation_task()
+    if indexing_slot_task is not None:
+        indexing_slot_task.retry(reservation_task.failed_dates)
 
-    notification_task = NotificationTask(reservation_task.reservations)
-    notification_task()
+    # the digest is sent once for the whole run by main
+    if config.NOTIFICATION_MODE != "digest":
+        notification_task = NotificationTask(
+            reservation_task.reservations, notifier
+        )
+        notification_task()
+    return reservation_task.reservations
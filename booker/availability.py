@@ -0,0 +1,72 @@
+import json
+import os
+from functools import lru_cache
+from threading import Lock
+from time import perf_counter, time
+
+from booker import config
+from booker.cache import write_json
+
+
+class UnavailableDates:
+    def __init__(self, ttl: float = None, file: str = None):
+        self.ttl = config.UNAVAILABLE_TTL if ttl is None else ttl
+        self.file = file or os.path.join(config.CACHE_DIR, "unavailable.json")
+        self.dirty = False
+        self.hits = 0
+        self.misses = 0
+        # error pages loaded before booking opens say nothing about capacity
+        self.not_before = None
+        self._expires_at = {}
+        self._lock = Lock()
+
+    def load(self):
+        try:
+            with open(self.file, encoding="utf-8") as f:
+                expires_at = json.load(f)
+        except (OSError, ValueError):
+            return
+        now = time()
+        with self._lock:
+            for date, expiry in expires_at.items():
+                if expiry > now:
+                    self._expires_at[date] = expiry
+
+    def save(self):
+        now = time()
+        with self._lock:
+            expires_at = {
+                date: expiry
+                for date, expiry in self._expires_at.items()
+                if expiry > now
+            }
+            self.dirty = False
+        write_json(self.file, expires_at)
+
+    def add(self, date: str, seen_at: float = None):
+        seen_at = seen_at or perf_counter()
+        if self.not_before is not None and seen_at < self.not_before:
+            return
+        with self._lock:
+            self._expires_at[date] = time() + self.ttl
+            self.dirty = True
+
+    def contains(self, date: str):
+        with self._lock:
+            # wall clock, so entries survive between runs
+            if self._expires_at.get(date, 0) > time():
+                self.hits += 1
+                return True
+            self.misses += 1
+            return False
+
+
+@lru_cache(maxsize=None)
+def unavailable_dates():
+    if config.UNAVAILABLE_TTL <= 0:
+        return None
+
+    dates = UnavailableDates()
+    if config.UNAVAILABLE_PERSIST:
+        dates.load()
+    return dates
@@ -0,0 +1,204 @@
+import json
+import logging
+import os
+import tempfile
+from collections import Counter
+from contextlib import contextmanager
+from datetime import date, timedelta
+from time import perf_counter
+
+import booker
+from booker import config
+from booker.availability import unavailable_dates
+from booker.cache import write_json
+from booker.fakesite import FakeSite
+from booker.ledger import reservation_ledger
+from booker.tracing import percentile, summarize
+
+WEEKDAYS = "月火水木金土日"
+PAGE_LOAD_STEPS = ("listing", "open_date", "wait.application")
+DATE_PATTERNS = ["（土", "（日", "（土,（日", "（金）", "（水"]
+
+
+def run_bench(
+    users=20,
+    dates=30,
+    capacity=None,
+    latency=0.0,
+    workers=None,
+    host="127.0.0.1",
+    public_host=None,
+    output=None,
+    profile=None,
+    asset_latency=0.0,
+):
+    with tempfile.TemporaryDirectory() as directory, FakeSite(
+        dates=make_dates(dates),
+        capacity=capacity or users,
+        latency=latency,
+        host=host,
+        public_host=public_host,
+        asset_latency=asset_latency,
+    ) as site:
+        users_file = os.path.join(directory, "users.jsonl")
+        write_users(users_file, users)
+        trace_file = os.path.join(directory, "trace.jsonl")
+
+        with override_config(
+            USERS_FILE_PATH=f"file://{users_file}",
+            RESERVATION_URL=site.url,
+            SLACK_API_URL=site.slack_api_url,
+            CACHE_DIR=directory,
+            TRACE="jsonl",
+            TRACE_FILE=trace_file,
+            SNIPE=False,
+            SHARD_INDEX=0,
+            SHARD_COUNT=1,
+            BROWSER_PROFILE=profile or config.BROWSER_PROFILE,
+            UNAVAILABLE_PERSIST=False,
+            LEDGER_PATH=None,
+        ):
+            # every profile starts without dates known to be full or booked
+            unavailable_dates.cache_clear()
+            reservation_ledger.cache_clear()
+            started_at = perf_counter()
+            booker.main(workers=workers)
+            elapsed = perf_counter() - started_at
+
+            spans = read_spans(trace_file)
+            result = measure(site, spans, elapsed, users)
+
+    report(result)
+    if output:
+        write_json(output, result)
+    return result
+
+
+def make_dates(count):
+    first = date(2022, 5, 1)
+    return [
+        f"{d.month}月{d.day}日（{WEEKDAYS[d.weekday()]}）"
+        for d in (first + timedelta(days=i) for i in range(count))
+    ]
+
+
+def write_users(path, count):
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(count):
+            user = {
+                "name_kanji": f"予約太郎{i}",
+                "name_kana": f"ヨヤクタロウ{i}",
+                "telephone": f"090-0000-{i % 10000:04d}",
+                "email": f"user{i}@example.com",
+                "date_pattern": DATE_PATTERNS[i % len(DATE_PATTERNS)],
+            }
+            f.write(json.dumps(user, ensure_ascii=False) + "\n")
+
+
+@contextmanager
+def override_config(**values):
+    originals = {name: getattr(config, name) for name in values}
+    for name, value in values.items():
+        setattr(config, name, value)
+    try:
+        yield
+    finally:
+        for name, value in originals.items():
+            setattr(config, name, value)
+
+
+def read_spans(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            records = [json.loads(line) for line in f]
+    except OSError:
+        return []
+    return [record for record in records if record["name"] != "summary"]
+
+
+def measure(site, spans, elapsed, users):
+    reservations = sum(len(a) for a in site.applications.values())
+    user_latencies = [s["duration"] for s in spans if s["name"] == "user"]
+    commands = Counter(
+        s["name"][len("webdriver.") :]
+        for s in spans
+        if s["name"].startswith("webdriver.")
+    )
+    steps = summarize(spans)
+    dates = unavailable_dates()
+    return {
+        "users": users,
+        "dates": len(site.dates),
+        "engine": config.ENGINE,
+        "profile": config.BROWSER_PROFILE,
+        "elapsed": elapsed,
+        "reservations": reservations,
+        "reservations_per_minute": reservations / elapsed * 60,
+        "user_latency": (
+            {
+                "p50": percentile(user_latencies, 0.5),
+                "p95": percentile(user_latencies, 0.95),
+                "max": max(user_latencies),
+            }
+            if user_latencies
+            else {}
+        ),
+        "webdriver_commands": sum(commands.values()),
+        "webdriver_commands_per_user": sum(commands.values()) / users,
+        "commands": dict(commands.most_common()),
+        "http_requests": len(site.requests),
+        "slack_calls": len(site.slack_messages),
+        "unavailable_hits": dates.hits if dates else 0,
+        "unavailable_misses": dates.misses if dates else 0,
+        "steps": {
+            name: metrics
+            for name, metrics in steps.items()
+            if not name.startswith("webdriver.")
+        },
+        "page_load": {
+            name: steps[name] for name in PAGE_LOAD_STEPS if name in steps
+        },
+    }
+
+
+def compare_profiles(profiles, output=None, **kwargs):
+    results = [run_bench(profile=profile, **kwargs) for profile in profiles]
+    baseline = results[0]
+    for result in results:
+        for name, metrics in result["page_load"].items():
+            base = baseline["page_load"].get(name)
+            change = (
+                f" ({metrics['p50'] / base['p50'] - 1:+.0%} "
+                f"vs {baseline['profile']})"
+                if base and base["p50"] and result is not baseline
+                else ""
+            )
+            logging.info(
+                f"📊 {result['profile']} {name}: "
+                f"p50 {metrics['p50'] * 1000:.1f}ms, "
+                f"p95 {metrics['p95'] * 1000:.1f}ms{change}"
+            )
+    if output:
+        write_json(output, results)
+    return results
+
+
+def report(result):
+    logging.info(
+        f"🏁 {result['reservations']} reservations for {result['users']} "
+        f"users over {result['dates']} dates in {result['elapsed']:.2f}s "
+        f"({result['reservations_per_minute']:.1f}/min, "
+        f"{result['engine']}, {result['profile']} profile)."
+    )
+    if result["user_latency"]:
+        latency = result["user_latency"]
+        logging.info(
+            f"⏱ Per user: p50 {latency['p50']:.3f}s, "
+            f"p95 {latency['p95']:.3f}s, max {latency['max']:.3f}s."
+        )
+    logging.info(
+        f"🤖 {result['webdriver_commands']} WebDriver commands "
+        f"({result['webdriver_commands_per_user']:.1f}/user), "
+        f"{result['http_requests']} site requests, "
+        f"{result['slack_calls']} Slack calls."
+    )
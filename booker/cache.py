@@ -0,0 +1,51 @@
+import json
+import logging
+import os
+from hashlib import sha1
+from time import time
+
+from booker import config
+
+
+class UsersCache:
+    def __init__(self, path: str):
+        digest = sha1(path.encode("utf-8")).hexdigest()
+        self.file = os.path.join(config.CACHE_DIR, f"users-{digest}.json")
+
+    def load(self):
+        try:
+            with open(self.file, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def save(self, etag: str, users: list):
+        entry = {"etag": etag, "cached_at": time(), "users": users}
+        write_json(self.file, entry, mode=0o600)
+        return entry
+
+    def touch(self, entry: dict):
+        entry["cached_at"] = time()
+        write_json(self.file, entry, mode=0o600)
+
+    def invalidate(self):
+        try:
+            os.remove(self.file)
+        except FileNotFoundError:
+            pass
+
+    def is_fresh(self, entry: dict):
+        return time() - entry["cached_at"] < config.USERS_CACHE_TTL
+
+
+def write_json(path: str, obj, mode: int = 0o644):
+    # write to a temporary file first so readers never see half a file
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    try:
+        fd = os.open(temporary, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, mode)
+        with open(fd, "w", encoding="utf-8") as f:
+            json.dump(obj, f, ensure_ascii=False)
+        os.replace(temporary, path)
+    except OSError as e:
+        logging.warning(f"⛔ Unable to write {path} ({e}).")
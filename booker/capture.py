@@ -0,0 +1,109 @@
+import base64
+import io
+import logging
+from time import perf_counter
+
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.common.by import By
+
+from booker import config, metadata
+from booker.driver import execute_cdp
+from booker.types import Screenshot
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+MODES = ("window", "page", "element", "text")
+
+
+def capture(driver, mode=None, image_format=None, scale=None, quality=None):
+    mode = mode or config.CAPTURE
+    image_format = image_format or config.CAPTURE_FORMAT
+    scale = scale or config.CAPTURE_SCALE
+    quality = quality or config.CAPTURE_QUALITY
+    if mode not in MODES:
+        raise ValueError(f"Unknown capture mode: {mode}")
+
+    started_at = perf_counter()
+    if mode == "text":
+        screenshot = None
+    elif mode == "page":
+        screenshot = _capture_page(driver, image_format, scale, quality)
+    elif mode == "element":
+        png = driver.find_element(
+            By.XPATH, metadata.XPATH_APPLICATION_NUMBERS
+        ).screenshot_as_png
+        screenshot = encode(png, image_format, scale, quality)
+    else:
+        screenshot = encode(
+            _capture_window(driver), image_format, scale, quality
+        )
+
+    size = len(screenshot.data) if screenshot is not None else 0
+    logging.info(
+        f"📸 Captured {mode} in {perf_counter() - started_at:.3f}s, "
+        f"{size} bytes."
+    )
+    return screenshot
+
+
+def encode(png, image_format="png", scale=1.0, quality=80):
+    if image_format == "png" and scale == 1.0:
+        return Screenshot(data=png, format="png")
+    if Image is None:
+        logging.warning("⛔ Pillow is not installed, keeping PNG.")
+        return Screenshot(data=png, format="png")
+
+    image = Image.open(io.BytesIO(png))
+    if scale != 1.0:
+        image = image.resize(
+            (
+                max(1, int(image.width * scale)),
+                max(1, int(image.height * scale)),
+            )
+        )
+    if image_format == "jpeg":
+        image = image.convert("RGB")
+    buffer = io.BytesIO()
+    image.save(buffer, format=image_format.upper(), quality=quality)
+    return Screenshot(data=buffer.getvalue(), format=image_format)
+
+
+def _capture_page(driver, image_format, scale, quality):
+    # Chrome renders beyond the viewport itself, so the window keeps its size
+    # and the page is not laid out again.
+    try:
+        metrics = execute_cdp(driver, "Page.getLayoutMetrics")
+        size = metrics.get("cssContentSize") or metrics["contentSize"]
+        params = {
+            "format": image_format,
+            "captureBeyondViewport": True,
+            "clip": {
+                "x": 0,
+                "y": 0,
+                "width": size["width"],
+                "height": size["height"],
+                "scale": scale,
+            },
+        }
+        if image_format != "png":
+            params["quality"] = quality
+        data = execute_cdp(driver, "Page.captureScreenshot", params)["data"]
+    except (WebDriverException, KeyError) as e:
+        logging.warning(f"⛔ Failed to capture over CDP, resizing: {e}")
+        return encode(_capture_window(driver), image_format, scale, quality)
+    return Screenshot(data=base64.b64decode(data), format=image_format)
+
+
+def _capture_window(driver):
+    size = driver.get_window_size()
+    w = driver.execute_script("return document.body.scrollWidth")
+    h = driver.execute_script("return document.body.scrollHeight")
+    driver.set_window_size(w, h)
+    try:
+        return driver.get_screenshot_as_png()
+    finally:
+        # pooled sessions go on to serve the next user
+        driver.set_window_size(size["width"], size["height"])
@@ -1,4 +1,5 @@
 import os
+import tempfile
 
 from dotenv import load_dotenv
 
@@ -10,3 +11,53 @@ SELENIUM_REMOTE_URL = os.getenv("SELENIUM_REMOTE_URL")
 RESERVATION_URL = os.getenv("RESERVATION_URL")
 SLACK_TOKEN = os.getenv("SLACK_TOKEN")
 SLACK_CHANNEL = os.getenv("SLACK_CHANNEL")
+WORKERS = int(os.getenv("BOOKER_WORKERS", "1"))
+SESSION_MAX_USES = int(os.getenv("BOOKER_SESSION_MAX_USES", "10"))
+NAVIGATION = os.getenv("BOOKER_NAVIGATION", "click")
+FORM_FILL = os.getenv("BOOKER_FORM_FILL", "script")
+ENGINE = os.getenv("BOOKER_ENGINE", "selenium")
+HTTP_TIMEOUT = float(os.getenv("BOOKER_HTTP_TIMEOUT", "10"))
+SNIPE = os.getenv("BOOKER_SNIPE", "false").lower() in ("1", "true")
+SNIPE_LEAD_TIME = float(os.getenv("BOOKER_SNIPE_LEAD_TIME", "0"))
+READINESS_TIMEOUT = float(os.getenv("BOOKER_READINESS_TIMEOUT", "100"))
+CACHE_DIR = os.getenv(
+    "BOOKER_CACHE_DIR", os.path.join(tempfile.gettempdir(), "booker")
+)
+# users are personal data, so they are only cached where asked to
+USERS_CACHE = "BOOKER_CACHE_DIR" in os.environ
+USERS_CACHE_TTL = float(os.getenv("BOOKER_USERS_CACHE_TTL", "0"))
+USERS_CACHE_INVALIDATE = os.getenv(
+    "BOOKER_USERS_CACHE_INVALIDATE", "false"
+).lower() in ("1", "true")
+SHARD_INDEX = int(os.getenv("BOOKER_SHARD_INDEX", "0"))
+SHARD_COUNT = int(os.getenv("BOOKER_SHARD_COUNT", "1"))
+SHARD_PLACEMENT = os.getenv("BOOKER_SHARD_PLACEMENT", "hash")
+SLACK_API_URL = os.getenv("BOOKER_SLACK_API_URL", "https://slack.com/api")
+NOTIFIER_CONCURRENCY = int(os.getenv("BOOKER_NOTIFIER_CONCURRENCY", "4"))
+CAPTURE = os.getenv("BOOKER_CAPTURE", "window")
+CAPTURE_FORMAT = os.getenv("BOOKER_CAPTURE_FORMAT", "png")
+CAPTURE_SCALE = float(os.getenv("BOOKER_CAPTURE_SCALE", "1"))
+CAPTURE_QUALITY = int(os.getenv("BOOKER_CAPTURE_QUALITY", "80"))
+NOTIFICATION_MODE = os.getenv("BOOKER_NOTIFICATION_MODE", "each")
+WAIT_TIMEOUT = float(os.getenv("BOOKER_WAIT_TIMEOUT", "10"))
+WAIT_MIN_TIMEOUT = float(os.getenv("BOOKER_WAIT_MIN_TIMEOUT", "2"))
+WAIT_POLL_INTERVAL = float(os.getenv("BOOKER_WAIT_POLL_INTERVAL", "0.05"))
+TRACE = os.getenv("BOOKER_TRACE", "")
+TRACE_FILE = os.getenv("BOOKER_TRACE_FILE")
+TRACE_NAMESPACE = os.getenv("BOOKER_TRACE_NAMESPACE", "booker")
+RECORD = os.getenv("BOOKER_RECORD", "false").lower() in ("1", "true")
+RECORD_FILE = os.getenv("BOOKER_RECORD_FILE")
+COMMAND_BUDGET = int(os.getenv("BOOKER_COMMAND_BUDGET", "0"))
+BROWSER_PROFILE = os.getenv("BOOKER_BROWSER_PROFILE", "default")
+PAGE_LOAD_STRATEGY = os.getenv("BOOKER_PAGE_LOAD_STRATEGY", "")
+WINDOW_SIZE = os.getenv("BOOKER_WINDOW_SIZE", "")
+BLOCKED_URLS = os.getenv("BOOKER_BLOCKED_URLS", "")
+DRIVER = os.getenv("BOOKER_DRIVER", "remote")
+CHROMEDRIVER_PATH = os.getenv("BOOKER_CHROMEDRIVER_PATH")
+CHROME_BINARY = os.getenv("BOOKER_CHROME_BINARY")
+LEDGER_PATH = os.getenv("BOOKER_LEDGER_PATH")
+UNAVAILABLE_TTL = float(os.getenv("BOOKER_UNAVAILABLE_TTL", "0"))
+UNAVAILABLE_PERSIST = os.getenv(
+    "BOOKER_UNAVAILABLE_PERSIST", "false"
+).lower() in ("1", "true")
+INCREMENTAL = os.getenv("BOOKER_INCREMENTAL", "false").lower() in ("1", "true")
@@ -0,0 +1,139 @@
+import re
+from html.parser import HTMLParser
+
+VOID_ELEMENTS = {
+    "area",
+    "base",
+    "br",
+    "col",
+    "embed",
+    "hr",
+    "img",
+    "input",
+    "link",
+    "meta",
+    "source",
+    "track",
+    "wbr",
+}
+
+
+class DocumentError(Exception):
+    pass
+
+
+# collapses whitespace within lines like WebDriver's element text
+def normalize_text(text: str):
+    lines = text.split("\n")
+    return "\n".join(" ".join(line.split()) for line in lines).strip()
+
+
+class Element:
+    def __init__(self, tag: str, attrs: dict, parent=None):
+        self.tag = tag
+        self.attrs = attrs
+        self.parent = parent
+        self.children = []
+
+    @property
+    def elements(self):
+        return [child for child in self.children if isinstance(child, Element)]
+
+    @property
+    def classes(self):
+        return self.attrs.get("class", "").split()
+
+    @property
+    def text(self):
+        return normalize_text("".join(self._texts()))
+
+    def iter(self, tag=None):
+        for element in self.elements:
+            if tag is None or element.tag == tag:
+                yield element
+            yield from element.iter(tag)
+
+    def closest(self, tag: str):
+        node = self.parent
+        while node is not None and node.tag != tag:
+            node = node.parent
+        return node
+
+    def _texts(self):
+        for child in self.children:
+            if isinstance(child, Element):
+                if child.tag == "br":
+                    yield "\n"
+                elif child.tag not in ("script", "style"):
+                    yield from child._texts()
+            else:
+                yield child.replace("\n", " ")
+
+
+class _TreeBuilder(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.root = Element("#document", {})
+        self.current = self.root
+
+    def handle_starttag(self, tag, attrs):
+        # browsers insert tbody, and the XPaths in metadata rely on it
+        if tag == "tr" and self.current.tag == "table":
+            self.handle_starttag("tbody", [])
+
+        element = Element(
+            tag, {name: value or "" for name, value in attrs}, self.current
+        )
+        self.current.children.append(element)
+        if tag not in VOID_ELEMENTS:
+            self.current = element
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_ELEMENTS:
+            self.current = self.current.parent
+
+    def handle_endtag(self, tag):
+        node = self.current
+        while node is not self.root and node.tag != tag:
+            node = node.parent
+        if node is not self.root:
+            self.current = node.parent
+
+    def handle_data(self, data):
+        self.current.children.append(data)
+
+
+class Document:
+    def __init__(self, html: str):
+        builder = _TreeBuilder()
+        builder.feed(html)
+        builder.close()
+        self.root = builder.root
+
+    @property
+    def title(self):
+        for element in self.root.iter("title"):
+            return element.text
+        return ""
+
+    def find(self, xpath: str):
+        node = self.root
+        for step in xpath.strip("/").split("/"):
+            match = re.fullmatch(r"([\w-]+)(?:\[(\d+)\])?", step)
+            if match is None:
+                raise DocumentError(f"Unsupported XPath step {step!r}.")
+            tag, position = match.group(1), int(match.group(2) or 1)
+            candidates = [e for e in node.elements if e.tag == tag]
+            if len(candidates) < position:
+                return None
+            node = candidates[position - 1]
+        return node
+
+    def select(self, css_selector: str):
+        tag, *classes = css_selector.split(".")
+        return [
+            element
+            for element in self.root.iter(tag or None)
+            if all(c in element.classes for c in classes)
+        ]
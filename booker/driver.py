@@ -0,0 +1,116 @@
+import logging
+from functools import lru_cache
+
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.chrome.service import Service
+from webdriver_manager.chrome import ChromeDriverManager
+
+from booker import config
+from booker.recorder import record_driver
+from booker.tracing import trace_driver
+
+BLOCKED_URLS = [
+    "*analytics*",
+    "*googletagmanager.com*",
+    "*doubleclick.net*",
+    "*googlesyndication.com*",
+    "*connect.facebook.net*",
+    "*.woff",
+    "*.woff2",
+    "*.ttf",
+    "*.otf",
+]
+
+PROFILES = {
+    "default": {
+        "page_load_strategy": "normal",
+        "block_images": False,
+        "blocked_urls": [],
+        "window_size": (1200, 900),
+    },
+    # only the DOM matters to us, so the rest of the page is never loaded
+    "fast": {
+        "page_load_strategy": "eager",
+        "block_images": True,
+        "blocked_urls": BLOCKED_URLS,
+        "window_size": (800, 600),
+    },
+}
+
+
+def browser_profile(name=None):
+    profile = dict(PROFILES[name or config.BROWSER_PROFILE])
+    if config.PAGE_LOAD_STRATEGY:
+        profile["page_load_strategy"] = config.PAGE_LOAD_STRATEGY
+    if config.WINDOW_SIZE:
+        width, height = config.WINDOW_SIZE.lower().split("x")
+        profile["window_size"] = (int(width), int(height))
+    if config.BLOCKED_URLS:
+        profile["blocked_urls"] = config.BLOCKED_URLS.split(",")
+    return profile
+
+
+def create_driver(profile=None):
+    profile = browser_profile(profile)
+    options = webdriver.ChromeOptions()
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.page_load_strategy = profile["page_load_strategy"]
+    if profile["block_images"]:
+        options.add_experimental_option(
+            "prefs", {"profile.managed_default_content_settings.images": 2}
+        )
+    if config.DRIVER == "local":
+        driver = _create_local_driver(options)
+    else:
+        driver = webdriver.Remote(
+            command_executor=config.SELENIUM_REMOTE_URL,
+            desired_capabilities=options.to_capabilities(),
+            options=options,
+        )
+    driver.set_window_size(*profile["window_size"])
+    if profile["blocked_urls"]:
+        block_urls(driver, profile["blocked_urls"])
+    return record_driver(trace_driver(driver))
+
+
+def _create_local_driver(options):
+    # commands go straight to a chromedriver child process, not over the hub
+    options.add_argument("--headless")
+    if config.CHROME_BINARY:
+        options.binary_location = config.CHROME_BINARY
+    return webdriver.Chrome(
+        service=Service(chromedriver_path()), options=options
+    )
+
+
+@lru_cache(maxsize=None)
+def chromedriver_path():
+    if config.CHROMEDRIVER_PATH:
+        return config.CHROMEDRIVER_PATH
+    return ChromeDriverManager(
+        log_level=logging.WARNING, print_first_line=False
+    ).install()
+
+
+def block_urls(driver, patterns):
+    try:
+        execute_cdp(driver, "Network.enable")
+        execute_cdp(driver, "Network.setBlockedURLs", {"urls": patterns})
+    except WebDriverException as e:
+        logging.warning(f"⛔ Unable to block URLs over CDP ({e}).")
+
+
+def execute_cdp(driver, cmd, params=None):
+    if hasattr(driver, "execute_cdp_cmd"):
+        return driver.execute_cdp_cmd(cmd, params or {})
+
+    # Remote does not expose CDP, but the Grid forwards the chromedriver
+    # endpoint once the command is registered.
+    driver.command_executor._commands.setdefault(
+        "executeCdpCommand", ("POST", "/session/$sessionId/goog/cdp/execute")
+    )
+    return driver.execute(
+        "executeCdpCommand", {"cmd": cmd, "params": params or {}}
+    )["value"]
@@ -0,0 +1,320 @@
+import re
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock, Thread
+from time import sleep
+from urllib.parse import parse_qsl, urlsplit
+
+DATES = [
+    "5月3日（火・祝）",
+    "5月4日（水・祝）",
+    "5月5日（木・祝）",
+    "5月6日（金）",
+    "5月7日（土）",
+    "5月8日（日）",
+]
+
+ASSETS_HTML = """<link rel="stylesheet" href="/static/site.css">
+<script src="/static/analytics.js"></script>"""
+
+LISTING_HTML = """<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>来館予約</title>{assets}</head>
+<body>
+<div><img src="/static/banner.png" alt=""></div><div></div><div></div>
+<div><main>
+  <div></div><div></div>
+  <div><div>
+    <div></div>
+    <div><section>
+      <table></table>
+      <table>
+        {rows}
+        <tr><td>受付開始</td><td>
+          <p></p><p></p><p></p><p><span>{reservable_start}</span></p>
+        </td></tr>
+      </table>
+      <ul>{links}</ul>
+    </section></div>
+  </div></div>
+</main></div>
+</body>
+</html>
+"""
+
+LINK_HTML = (
+    '<li><a class="iconFont is-outIcon" href="/dates/{index}" '
+    'target="_blank">{date}</a> <span>{status}</span></li>'
+)
+
+APPLICATION_HTML = """<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>申込み {date}</title>{assets}</head>
+<body>
+<div><img src="/static/banner.png" alt=""></div><div></div>
+<div><form action="/dates/{index}/confirm" method="post">
+  <input type="hidden" name="token" value="{token}">
+  <table>
+    <tr><td>お名前</td><td><input type="text" name="name_kanji"></td></tr>
+    <tr><td>フリガナ</td><td><input type="text" name="name_kana"></td></tr>
+    <tr><td>電話番号</td><td><input type="text" name="telephone"></td></tr>
+    <tr><td>メールアドレス</td><td><div>
+      <div><input type="text" name="email"></div>
+      <div><input type="text" name="email_confirmation"></div>
+    </div></td></tr>
+    <tr><td>来館時間</td><td><fieldset>
+      <input type="checkbox" name="time" value="14:00-17:30">
+    </fieldset></td></tr>
+  </table>
+  <div></div><div></div><div></div>
+  <div><div></div><div>
+    <input type="submit" name="confirm" value="確認する">
+  </div></div>
+</form></div>
+</body>
+</html>
+"""
+
+CONFIRMATION_HTML = """<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>申込み内容確認</title></head>
+<body>
+<div></div><div></div>
+<div>
+  <div></div><div></div><div></div><div></div>
+  <div><div></div><div><form action="/dates/{index}/apply" method="post">
+    {hidden}
+    <input type="submit" name="apply" value="申し込む">
+  </form></div></div>
+</div>
+</body>
+</html>
+"""
+
+HIDDEN_HTML = '<input type="hidden" name="{name}" value="{value}">'
+
+COMPLETION_HTML = """<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>申込み完了</title></head>
+<body>
+<div></div><div></div>
+<div>
+  <div></div><div></div>
+  <div><div><span>到達番号：{application_number}<br>問合せ番号：{inquiry_number}</span></div></div>
+</div>
+</body>
+</html>
+"""
+
+ERROR_HTML = """<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>エラー</title></head>
+<body><div><p>{message}</p></div></body>
+</html>
+"""
+
+# what a real site makes the browser fetch besides the page itself
+ASSETS = {
+    "/static/site.css": (
+        "text/css",
+        b"@font-face{font-family:f;src:url(/static/font.woff2)}"
+        b"body{font-family:f}",
+    ),
+    "/static/font.woff2": ("font/woff2", bytes(64 * 1024)),
+    "/static/banner.png": ("image/png", bytes(256 * 1024)),
+    "/static/analytics.js": ("text/javascript", b"window.analytics = {};"),
+}
+
+FIELDS = [
+    "token",
+    "name_kanji",
+    "name_kana",
+    "telephone",
+    "email",
+    "email_confirmation",
+    "time",
+]
+
+
+class FakeSite:
+    def __init__(
+        self,
+        dates=None,
+        capacity=1,
+        latency=0.0,
+        reservable_start="2022年5月1日 10:00",
+        host="127.0.0.1",
+        public_host=None,
+        asset_latency=0.0,
+    ):
+        self.dates = list(dates or DATES)
+        self.capacity = capacity
+        self.latency = latency
+        self.reservable_start = reservable_start
+        self.host = host
+        self.public_host = public_host
+        self.asset_latency = asset_latency
+        self.applications = {index: [] for index in range(len(self.dates))}
+        self.requests = []
+        self.slack_messages = []
+        self._lock = Lock()
+        self._server = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
+
+    @property
+    def url(self):
+        # a remote browser may reach the site under another name
+        host, port = self._server.server_address[:2]
+        return f"http://{self.public_host or host}:{port}/"
+
+    @property
+    def slack_api_url(self):
+        return f"{self.url}slack/api"
+
+    def start(self):
+        self._server = ThreadingHTTPServer((self.host, 0), self._handler())
+        self._server.daemon_threads = True
+        Thread(
+            target=self._server.serve_forever, args=(0.05,), daemon=True
+        ).start()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def listing(self):
+        rows = "<tr><td></td><td></td></tr>" * 6
+        links = "".join(
+            LINK_HTML.format(
+                index=index,
+                date=date,
+                status="×" if self._is_full(index) else "○",
+            )
+            for index, date in enumerate(self.dates)
+        )
+        return LISTING_HTML.format(
+            assets=ASSETS_HTML,
+            rows=rows,
+            links=links,
+            reservable_start=self.reservable_start,
+        )
+
+    def application(self, index):
+        if self._is_full(index):
+            return ERROR_HTML.format(message="満員です。")
+        return APPLICATION_HTML.format(
+            assets=ASSETS_HTML,
+            index=index,
+            date=self.dates[index],
+            token=self._token(index),
+        )
+
+    def confirmation(self, index, form):
+        if form.get("token") != self._token(index):
+            return ERROR_HTML.format(message="不正な操作です。")
+        if not all(form.get(name) for name in FIELDS):
+            return ERROR_HTML.format(message="未入力の項目があります。")
+        if form["email"] != form["email_confirmation"]:
+            return ERROR_HTML.format(message="メールアドレスが一致しません。")
+        hidden = "".join(
+            HIDDEN_HTML.format(name=name, value=escape(form[name]))
+            for name in FIELDS
+        )
+        return CONFIRMATION_HTML.format(index=index, hidden=hidden)
+
+    def completion(self, index, form):
+        if form.get("token") != self._token(index) or "apply" not in form:
+            return ERROR_HTML.format(message="不正な操作です。")
+
+        with self._lock:
+            applications = self.applications[index]
+            if len(applications) >= self.capacity:
+                return ERROR_HTML.format(message="満員です。")
+            if any(a["email"] == form["email"] for a in applications):
+                return ERROR_HTML.format(message="申込み済みです。")
+            applications.append(form)
+            number = sum(len(a) for a in self.applications.values())
+
+        return COMPLETION_HTML.format(
+            application_number=f"000_000_{index:03d}_{number:04d}",
+            inquiry_number=f"Q{number:05d}",
+        )
+
+    def _is_full(self, index):
+        with self._lock:
+            return len(self.applications[index]) >= self.capacity
+
+    def _token(self, index):
+        return f"token-{index}"
+
+    def _handler(self):
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                site._record(self)
+                if self.path == "/":
+                    self._send(site.listing())
+                elif self.path in ASSETS:
+                    sleep(site.asset_latency)
+                    content_type, body = ASSETS[self.path]
+                    self._send(body, content_type)
+                elif match := re.fullmatch(r"/dates/(\d+)", self.path):
+                    index = int(match.group(1))
+                    if index not in site.applications:
+                        return self.send_error(404)
+                    self._send(site.application(index))
+                else:
+                    self.send_error(404)
+
+            def do_POST(self):
+                site._record(self)
+                length = int(self.headers.get("Content-Length", 0))
+                body = self.rfile.read(length)
+                path = urlsplit(self.path).path
+                if match := re.fullmatch(r"/slack/api/([\w.]+)", path):
+                    with site._lock:
+                        site.slack_messages.append((match.group(1), length))
+                    return self._send('{"ok": true}', "application/json")
+
+                form = dict(
+                    parse_qsl(body.decode("utf-8"), keep_blank_values=True)
+                )
+                match = re.fullmatch(
+                    r"/dates/(\d+)/(confirm|apply)", self.path
+                )
+                if (
+                    match is None
+                    or int(match.group(1)) not in site.applications
+                ):
+                    return self.send_error(404)
+
+                index, step = int(match.group(1)), match.group(2)
+                if step == "confirm":
+                    self._send(site.confirmation(index, form))
+                else:
+                    self._send(site.completion(index, form))
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, html, content_type="text/html; charset=utf-8"):
+                body = html if isinstance(html, bytes) else html.encode()
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+    def _record(self, handler):
+        sleep(self.latency)
+        with self._lock:
+            self.requests.append((handler.command, handler.path))
@@ -1,15 +1,81 @@
 import json
-from urllib.parse import urlparse
+import zlib
+from functools import lru_cache
+from itertools import chain
+from urllib.parse import unquote, urlparse
 
 import boto3
+from botocore.exceptions import ClientError
 
+CHUNK_SIZE = 64 * 1024
+GZIP_MAGIC = b"\x1f\x8b"
 
-def read_jsonlines_s3(path: str):
+
+def read_jsonlines(path: str):
+    return iter_jsonlines(open_stream(path))
+
+
+def iter_jsonlines(stream):
+    try:
+        for line in _lines(_decompress(_chunks(stream))):
+            if line.strip():
+                yield json.loads(line)
+    finally:
+        stream.close()
+
+
+def open_stream(path: str):
     o = urlparse(path)
-    s3 = boto3.resource(o.scheme)
-    bucket = s3.Bucket(o.netloc)
-    obj = bucket.Object(o.path[1:])
-    res = obj.get()
-    body = res["Body"].read().decode("utf-8")
-    for line in body.splitlines():
-        yield json.loads(line)
+    if o.scheme == "s3":
+        return get_s3_object(path)["Body"]
+    elif o.scheme == "file":
+        return open(unquote(o.path), "rb")
+    elif o.scheme == "":
+        return open(path, "rb")
+    else:
+        raise ValueError(f"Unsupported path {path}.")
+
+
+def get_s3_object(path: str, if_none_match: str = None):
+    o = urlparse(path)
+    kwargs = {"IfNoneMatch": if_none_match} if if_none_match else {}
+    try:
+        return _s3_client().get_object(
+            Bucket=o.netloc, Key=o.path[1:], **kwargs
+        )
+    except ClientError as e:
+        if e.response.get("Error", {}).get("Code") in ("304", "NotModified"):
+            return None
+        raise
+
+
+@lru_cache(maxsize=None)
+def _s3_client():
+    return boto3.client("s3")
+
+
+def _chunks(stream):
+    while chunk := stream.read(CHUNK_SIZE):
+        yield chunk
+
+
+def _decompress(chunks):
+    first = next(chunks, b"")
+    if not first.startswith(GZIP_MAGIC):
+        yield first
+        yield from chunks
+        return
+
+    decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16)
+    for chunk in chain([first], chunks):
+        yield decompressor.decompress(chunk)
+    yield decompressor.flush()
+
+
+def _lines(chunks):
+    pending = b""
+    for chunk in chunks:
+        *lines, pending = (pending + chunk).split(b"\n")
+        yield from lines
+    if pending:
+        yield pending
@@ -0,0 +1,89 @@
+import logging
+import os
+import sqlite3
+from datetime import date, datetime
+from functools import lru_cache
+from threading import Lock
+from time import time
+
+from booker import config
+from booker.scheduler import JST, parse_reservable_start
+from booker.types import Reservation
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS reservations (
+    email TEXT NOT NULL,
+    reserved_date TEXT NOT NULL,
+    reserved_on TEXT,
+    application_number TEXT,
+    inquiry_number TEXT,
+    booked_at REAL NOT NULL,
+    PRIMARY KEY (email, reserved_date)
+)
+"""
+
+
+class ReservationLedger:
+    def __init__(self, path: str):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        # worker threads share one connection behind the lock
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock = Lock()
+        with self._lock, self._connection:
+            self._connection.execute(SCHEMA)
+        self._booked = self._load()
+
+    def is_booked(self, email: str, reserved_date: str):
+        return (email, reserved_date) in self._booked
+
+    def add(self, reservation: Reservation):
+        reserved_on = parse_reservable_start(reservation.reserved_date)
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO reservations "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    reservation.user.email,
+                    reservation.reserved_date,
+                    reserved_on.date().isoformat() if reserved_on else None,
+                    reservation.application_number,
+                    reservation.inquiry_number,
+                    time(),
+                ),
+            )
+            self._booked.add(
+                (reservation.user.email, reservation.reserved_date)
+            )
+
+    def compact(self, today: date = None):
+        today = today or datetime.now(JST).date()
+        with self._lock, self._connection:
+            expired = self._connection.execute(
+                "DELETE FROM reservations WHERE reserved_on < ?",
+                (today.isoformat(),),
+            ).rowcount
+        self._booked = self._load()
+        return expired
+
+    def close(self):
+        self._connection.close()
+
+    def _load(self):
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT email, reserved_date FROM reservations"
+            ).fetchall()
+        return set(rows)
+
+
+@lru_cache(maxsize=None)
+def reservation_ledger():
+    if not config.LEDGER_PATH:
+        return None
+
+    ledger = ReservationLedger(config.LEDGER_PATH)
+    expired = ledger.compact()
+    if expired:
+        logging.info(f"🧹 Expired {expired} past reservations from ledger.")
+    return ledger
@@ -0,0 +1,45 @@
+import json
+import os
+from hashlib import sha1
+
+from booker import config
+from booker.cache import write_json
+from booker.types import Slot
+
+
+class ListingFingerprint:
+    def __init__(self, users=(), file: str = None):
+        # shards list the same dates for different users
+        self.file = file or os.path.join(
+            config.CACHE_DIR,
+            f"listing-{config.SHARD_INDEX}-of-{config.SHARD_COUNT}.json",
+        )
+        # other users may want dates that were already there
+        self.users = sha1(
+            json.dumps(
+                sorted(users, key=lambda user: user.get("email", "")),
+                ensure_ascii=False,
+                sort_keys=True,
+            ).encode("utf-8")
+        ).hexdigest()
+        self._dates = {}
+
+    def load(self):
+        try:
+            with open(self.file, encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return
+        if entry.get("users") == self.users:
+            self._dates = entry.get("dates", {})
+
+    def save(self, slots: list[Slot]):
+        self._dates = {slot.text: [slot.href, slot.marker] for slot in slots}
+        write_json(self.file, {"users": self.users, "dates": self._dates})
+
+    def changed(self, slots: list[Slot]):
+        return [
+            slot
+            for slot in slots
+            if self._dates.get(slot.text) != [slot.href, slot.marker]
+        ]
@@ -0,0 +1,54 @@
+from collections import deque
+
+
+class DatePatternMatcher:
+    def __init__(self):
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [set()]
+        self._match_all = set()
+
+    def add(self, key, date_pattern: str):
+        for pattern in date_pattern.split(","):
+            # an empty pattern is a substring of every date
+            if not pattern:
+                self._match_all.add(key)
+                continue
+
+            node = 0
+            for char in pattern:
+                if char not in self._goto[node]:
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append(set())
+                    self._goto[node][char] = len(self._goto) - 1
+                node = self._goto[node][char]
+            self._output[node].add(key)
+
+    def build(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                self._output[child] |= self._output[self._fail[child]]
+                queue.append(child)
+
+    def match(self, texts):
+        for text in texts:
+            keys = self.match_one(text)
+            if keys:
+                yield text, keys
+
+    def match_one(self, text: str):
+        keys = set(self._match_all)
+        node = 0
+        for char in text:
+            while node and char not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(char, 0)
+            keys |= self._output[node]
+        return keys
@@ -0,0 +1,64 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from time import monotonic, sleep
+
+from booker import config
+from booker.session import create_http_session
+from booker.tracing import span
+
+MAX_ATTEMPTS = 5
+
+
+class SlackNotifier:
+    def __init__(self, concurrency: int = None):
+        self.session = create_http_session()
+        self._executor = ThreadPoolExecutor(
+            max_workers=concurrency or config.NOTIFIER_CONCURRENCY,
+            thread_name_prefix="notifier",
+        )
+        self._futures = []
+        self._lock = Lock()
+        self._retry_at = 0.0
+
+    def submit(self, fn, *args):
+        future = self._executor.submit(fn, *args)
+        with self._lock:
+            self._futures.append(future)
+        return future
+
+    def post(self, method: str, **kwargs):
+        url = f"{config.SLACK_API_URL}/{method}"
+        for _ in range(MAX_ATTEMPTS):
+            self._wait_rate_limit()
+            with span(f"slack.{method}"):
+                response = self.session.post(
+                    url, timeout=config.HTTP_TIMEOUT, **kwargs
+                )
+            if response.status_code != 429:
+                break
+
+            retry_after = float(response.headers.get("Retry-After", 1))
+            logging.warning(f"⛔ Rate limited by Slack for {retry_after}s.")
+            with self._lock:
+                self._retry_at = max(self._retry_at, monotonic() + retry_after)
+        else:
+            logging.error(f"🚨 Gave up calling {method} after retries!")
+            return response
+
+        if not response.ok or not response.json().get("ok"):
+            logging.error(f"🚨 Failed to call {method}: {response.text}")
+        return response
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        for future in self._futures:
+            if future.exception() is not None:
+                logging.error(
+                    "🚨 Failed to notify!", exc_info=future.exception()
+                )
+
+    def _wait_rate_limit(self):
+        # every worker honours the latest Retry-After
+        while (delay := self._retry_at - monotonic()) > 0:
+            sleep(delay)
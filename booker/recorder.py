@@ -0,0 +1,190 @@
+import json
+import logging
+import os
+from collections import Counter, deque
+from datetime import datetime
+from functools import lru_cache
+from threading import Lock
+from time import perf_counter
+
+from selenium import webdriver
+from selenium.webdriver.remote.command import Command
+
+from booker import config
+from booker.tracing import current_tags
+
+
+class BudgetExceeded(AssertionError):
+    pass
+
+
+class ReplayMismatch(AssertionError):
+    pass
+
+
+class CommandRecorder:
+    def __init__(self):
+        self.commands = []
+        self._lock = Lock()
+
+    def attach(self, driver):
+        execute = driver.command_executor.execute
+
+        # every command sent to the remote end is one HTTP round trip
+        def recorded(command, params):
+            started_at = perf_counter()
+            response = execute(command, params)
+            self.record(command, params, response, perf_counter() - started_at)
+            return response
+
+        driver.command_executor.execute = recorded
+        return driver
+
+    def record(self, command, params, response, duration):
+        entry = {
+            "command": command,
+            "duration": duration,
+            "request_bytes": _size(params),
+            "response_bytes": _size(response),
+            "params": params,
+            "response": response,
+            **current_tags(),
+        }
+        with self._lock:
+            self.commands.append(entry)
+
+    def summarize(self):
+        with self._lock:
+            commands = list(self.commands)
+        reservations = Counter(
+            (entry.get("user"), entry["date"])
+            for entry in commands
+            if "date" in entry
+        )
+        return {
+            "commands": len(commands),
+            "request_bytes": sum(e["request_bytes"] for e in commands),
+            "response_bytes": sum(e["response_bytes"] for e in commands),
+            "duration": sum(e["duration"] for e in commands),
+            "by_command": dict(
+                Counter(e["command"] for e in commands).most_common()
+            ),
+            "by_user": dict(Counter(e.get("user") for e in commands)),
+            "by_reservation": [
+                {"user": user, "date": date, "commands": count}
+                for (user, date), count in reservations.items()
+            ],
+        }
+
+    def over_budget(self, budget: int):
+        return [
+            reservation
+            for reservation in self.summarize()["by_reservation"]
+            if reservation["commands"] > budget
+        ]
+
+    def assert_budget(self, budget: int):
+        violations = self.over_budget(budget)
+        if violations:
+            raise BudgetExceeded(
+                f"{len(violations)} reservations exceeded {budget} commands: "
+                + ", ".join(
+                    f"{v['user']} {v['date']} ({v['commands']})"
+                    for v in violations
+                )
+            )
+
+    def save(self, path: str):
+        with self._lock:
+            commands = list(self.commands)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            for entry in commands:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+
+class ReplayConnection:
+    def __init__(self, commands):
+        self.commands = deque(commands)
+
+    def execute(self, command, params):
+        if command == Command.NEW_SESSION and (
+            not self.commands or self.commands[0]["command"] != command
+        ):
+            # sessions are created before the recorder is attached
+            return {
+                "value": {"sessionId": "replay", "capabilities": {}},
+            }
+        if not self.commands:
+            raise ReplayMismatch(f"Unexpected command {command}.")
+
+        expected = self.commands.popleft()
+        if expected["command"] != command:
+            raise ReplayMismatch(
+                f"Expected {expected['command']} but got {command}."
+            )
+        return expected["response"]
+
+
+def load_commands(path: str):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def replay_driver(commands):
+    return webdriver.Remote(command_executor=ReplayConnection(commands))
+
+
+def record_driver(driver):
+    if not config.RECORD:
+        return driver
+    return command_recorder().attach(driver)
+
+
+@lru_cache(maxsize=None)
+def command_recorder():
+    return CommandRecorder()
+
+
+def finish_recording():
+    if not config.RECORD:
+        return True
+
+    recorder = command_recorder()
+    summary = recorder.summarize()
+    logging.info(
+        f"📼 Recorded {summary['commands']} WebDriver commands "
+        f"({summary['request_bytes']} bytes sent, "
+        f"{summary['response_bytes']} bytes received) "
+        f"in {summary['duration']:.2f}s."
+    )
+    for user, count in summary["by_user"].items():
+        logging.info(f"📼 {user}: {count} commands")
+    for reservation in summary["by_reservation"]:
+        logging.info(
+            f"📼 {reservation['user']} {reservation['date']}: "
+            f"{reservation['commands']} commands"
+        )
+
+    file = config.RECORD_FILE or os.path.join(
+        config.CACHE_DIR, f"commands-{datetime.now():%Y%m%d%H%M%S}.jsonl"
+    )
+    try:
+        recorder.save(file)
+    except OSError as e:
+        logging.warning(f"⛔ Unable to write {file} ({e}).")
+
+    if not config.COMMAND_BUDGET:
+        return True
+    try:
+        recorder.assert_budget(config.COMMAND_BUDGET)
+    except BudgetExceeded as e:
+        logging.error(f"🚨 {e}")
+        return False
+    return True
+
+
+def _size(obj):
+    if obj is None:
+        return 0
+    return len(json.dumps(obj, ensure_ascii=False).encode("utf-8"))
@@ -0,0 +1,75 @@
+import logging
+import re
+from datetime import datetime, timedelta, timezone
+from time import perf_counter, sleep
+
+JST = timezone(timedelta(hours=9), "JST")
+SPIN_THRESHOLD = 0.02
+MAX_SLEEP = 60
+# well under the 300s idle timeout of Selenium Grid sessions
+KEEPALIVE_INTERVAL = 60
+KEEPALIVE_MARGIN = 5
+
+RESERVABLE_START_PATTERN = re.compile(
+    r"(?:(\d{4})\s*年)?\s*(\d{1,2})\s*月\s*(\d{1,2})\s*日"
+    r"(?:\D*?(\d{1,2})\s*[:：時]\s*(\d{1,2})?)?"
+)
+
+
+def parse_reservable_start(text: str, now: datetime = None):
+    match = RESERVABLE_START_PATTERN.search(text or "")
+    if match is None:
+        return None
+
+    now = now or datetime.now(JST)
+    year, month, day, hour, minute = (
+        int(value) if value else None for value in match.groups()
+    )
+    opens_at = datetime(
+        year or now.year, month, day, hour or 0, minute or 0, tzinfo=JST
+    )
+    # the listing omits the year around new year
+    if year is None and opens_at < now - timedelta(days=180):
+        opens_at = opens_at.replace(year=opens_at.year + 1)
+    return opens_at
+
+
+class Sniper:
+    def __init__(self, opens_at: datetime, lead_time: float = 0.0):
+        self.opens_at = opens_at
+        self.lead_time = lead_time
+        # the opening instant on the monotonic perf_counter clock
+        remaining = (opens_at - datetime.now(JST)).total_seconds()
+        self.opening = perf_counter() + remaining
+
+    def wait(self, keepalive=None):
+        deadline = self.opening - self.lead_time
+        logging.info(
+            f"🎯 Waiting {max(deadline - perf_counter(), 0):.3f}s for "
+            f"{self.opens_at:%Y-%m-%d %H:%M:%S}."
+        )
+        kept_alive_at = perf_counter()
+        while (remaining := deadline - perf_counter()) > 0:
+            # never touch the sessions right before firing
+            if (
+                keepalive is not None
+                and remaining > KEEPALIVE_MARGIN
+                and perf_counter() - kept_alive_at >= KEEPALIVE_INTERVAL
+            ):
+                keepalive()
+                kept_alive_at = perf_counter()
+            elif remaining > SPIN_THRESHOLD:
+                sleep(
+                    min(
+                        remaining - SPIN_THRESHOLD,
+                        MAX_SLEEP,
+                        KEEPALIVE_INTERVAL,
+                    )
+                )
+
+        offset = self.gap(perf_counter())
+        logging.info(f"🔫 Fired {offset:+.3f}s from opening.")
+        return offset
+
+    def gap(self, at: float):
+        return at - self.opening
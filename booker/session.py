@@ -0,0 +1,158 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
+from queue import Queue
+from threading import Lock
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from booker import config
+from booker.driver import create_driver
+
+RESET_STORAGE_SCRIPT = """
+try { window.localStorage.clear(); } catch (e) {}
+try { window.sessionStorage.clear(); } catch (e) {}
+"""
+
+
+class SessionPool:
+    def __init__(self, size=1, max_uses=None, factory=create_driver):
+        self.size = size
+        self.max_uses = max_uses or config.SESSION_MAX_USES
+        self.factory = factory
+        self._idle = Queue()
+        self._uses = {}
+        self._lock = Lock()
+
+    def start(self, lazy=False):
+        if lazy:
+            # sessions are created on first lease instead
+            for _ in range(self.size):
+                self._idle.put(None)
+            return
+
+        with ThreadPoolExecutor(max_workers=self.size) as executor:
+            futures = [executor.submit(self._create) for _ in range(self.size)]
+        try:
+            drivers = [future.result() for future in futures]
+        except Exception:
+            # sessions already created would never reach close()
+            for future in futures:
+                if future.exception() is None:
+                    self._discard(future.result())
+            raise
+        for driver in drivers:
+            self._idle.put(driver)
+
+    @contextmanager
+    def lease(self):
+        driver = self._acquire()
+        try:
+            yield driver
+        finally:
+            self._release(driver)
+
+    def keep_alive(self):
+        drivers = []
+        while len(drivers) < self.size and not self._idle.empty():
+            drivers.append(self._idle.get_nowait())
+
+        # idle sessions are pinged, dead or missing ones created again
+        for driver in drivers:
+            if driver is not None and not self._is_healthy(driver):
+                logging.warning("⛔ Session expired while idle, recycling.")
+                self._discard(driver)
+                driver = None
+            if driver is None:
+                try:
+                    driver = self._create()
+                except Exception as e:
+                    logging.warning(f"⛔ Failed to create session ({e}).")
+            self._idle.put(driver)
+
+    def close(self):
+        while not self._idle.empty():
+            driver = self._idle.get_nowait()
+            if driver is not None:
+                self._discard(driver)
+
+    def _acquire(self):
+        driver = self._idle.get()
+        if driver is not None and not self._is_healthy(driver):
+            logging.warning("⛔ Session is unhealthy, recycling.")
+            self._discard(driver)
+            driver = None
+        if driver is None:
+            try:
+                driver = self._create()
+            except Exception:
+                self._idle.put(None)
+                raise
+        return driver
+
+    def _release(self, driver):
+        with self._lock:
+            self._uses[driver] += 1
+            uses = self._uses[driver]
+
+        if uses >= self.max_uses:
+            logging.info(f"♻️ Session reached {uses} uses, recycling.")
+            self._discard(driver)
+            self._idle.put(None)
+            return
+
+        try:
+            self._reset(driver)
+        except Exception:
+            logging.warning("⛔ Failed to reset session, recycling.")
+            self._discard(driver)
+            self._idle.put(None)
+        else:
+            self._idle.put(driver)
+
+    def _create(self):
+        driver = self.factory()
+        with self._lock:
+            self._uses[driver] = 0
+        return driver
+
+    def _discard(self, driver):
+        with self._lock:
+            self._uses.pop(driver, None)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def _is_healthy(self, driver):
+        # a hub that went away raises urllib3 errors, not WebDriver ones
+        try:
+            driver.window_handles
+        except Exception:
+            return False
+        return True
+
+    def _reset(self, driver):
+        handles = driver.window_handles
+        for handle in handles[1:]:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(handles[0])
+        driver.delete_all_cookies()
+        driver.execute_script(RESET_STORAGE_SCRIPT)
+
+
+def create_http_session():
+    # sessions keep their own cookies but share one connection pool
+    session = requests.Session()
+    adapter = _http_adapter()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+@lru_cache(maxsize=None)
+def _http_adapter():
+    return HTTPAdapter(pool_maxsize=max(config.WORKERS, 10))
@@ -0,0 +1,56 @@
+from collections import defaultdict
+from hashlib import sha1
+
+
+def shard_users(users, index: int, count: int, placement: str = "hash"):
+    if not 0 <= index < count:
+        raise ValueError(f"Shard index {index} is out of range of {count}.")
+    if count == 1:
+        return users
+    if placement == "date":
+        return _shard_by_date(users, index, count)
+    return (u for u in users if _digest(identity(u)) % count == index)
+
+
+def identity(user_kwargs: dict):
+    return f"{user_kwargs.get('email')}\t{user_kwargs.get('name_kanji')}"
+
+
+def _shard_by_date(users, index, count):
+    # each comma-separated pattern is a date users compete for, so every
+    # user goes to the shard with the fewest others wanting the same dates
+    entries = [
+        (str(user_kwargs.get("date_pattern")).split(","), user_kwargs)
+        for user_kwargs in users
+    ]
+    # users with more patterns are the hardest to place, so they go first
+    entries.sort(
+        key=lambda entry: (
+            -len(entry[0]),
+            entry[0],
+            _digest(identity(entry[1])),
+        )
+    )
+
+    loads = [defaultdict(int) for _ in range(count)]
+    sizes = [0] * count
+    sharded = []
+    for patterns, user_kwargs in entries:
+        shard = min(
+            range(count),
+            key=lambda i: (
+                sum(loads[i][pattern] for pattern in patterns),
+                sizes[i],
+                i,
+            ),
+        )
+        for pattern in patterns:
+            loads[shard][pattern] += 1
+        sizes[shard] += 1
+        if shard == index:
+            sharded.append(user_kwargs)
+    return sharded
+
+
+def _digest(value: str):
+    return int(sha1(value.encode("utf-8")).hexdigest(), 16)
@@ -1,19 +1,81 @@
+import codecs
+import io
 import logging
-import os
 import sys
+import zipfile
 from datetime import datetime
-from subprocess import DEVNULL, STDOUT, Popen
-from time import sleep
-from urllib.parse import urlparse
+from threading import Lock
+from time import perf_counter, sleep
+from urllib.parse import urljoin, urlparse
 
 import requests
-from selenium import webdriver
+from selenium.common.exceptions import TimeoutException, WebDriverException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 
 from booker import config, metadata
-from booker.io import read_jsonlines_s3
-from booker.types import Reservation, User
+from booker.availability import unavailable_dates
+from booker.cache import UsersCache
+from booker.capture import capture
+from booker.document import Document, DocumentError, normalize_text
+from booker.driver import create_driver
+from booker.io import get_s3_object, iter_jsonlines, read_jsonlines
+from booker.ledger import reservation_ledger
+from booker.listing import ListingFingerprint
+from booker.matcher import DatePatternMatcher
+from booker.notifier import SlackNotifier
+from booker.session import SessionPool, create_http_session
+from booker.sharding import shard_users
+from booker.tracing import span, tagged
+from booker.types import Reservation, Slot, User
+from booker.waits import StepWaiter
+
+READINESS_INITIAL_INTERVAL = 0.05
+READINESS_MAX_INTERVAL = 1.0
+FILLING_FORM_SCRIPT = """
+const [fields, checkTimeXpath] = arguments;
+const find = (xpath) => document.evaluate(
+    xpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null
+).singleNodeValue;
+for (const [xpath] of fields.concat([[checkTimeXpath]])) {
+    if (!find(xpath)) {
+        return xpath;
+    }
+}
+for (const [xpath, value] of fields) {
+    const input = find(xpath);
+    input.focus();
+    input.value = value;
+    input.dispatchEvent(new Event("input", { bubbles: true }));
+    input.dispatchEvent(new Event("change", { bubbles: true }));
+}
+const checkTime = find(checkTimeXpath);
+if (!checkTime.checked) {
+    checkTime.click();
+}
+return null;
+"""
+INDEXING_SLOT_SCRIPT = """
+const [selector, reservableStartXpath] = arguments;
+const reservableStart = document.evaluate(
+    reservableStartXpath,
+    document,
+    null,
+    XPathResult.FIRST_ORDERED_NODE_TYPE,
+    null
+).singleNodeValue;
+return [
+    Array.from(document.querySelectorAll(selector)).map((a) => [
+        a.innerText.trim(),
+        a.href,
+        [
+            Array.from(a.classList).join(" "),
+            (a.parentElement || a).innerText.trim(),
+        ].join(" "),
+    ]),
+    reservableStart ? reservableStart.innerText.trim() : null,
+];
+"""
 
 
 class CheckingConnectionTask:
@@ -22,31 +84,45 @@ class CheckingConnectionTask:
         host, port = o.netloc.split(":")
         self.host = host
         self.port = port
+        self.url = f"{config.SELENIUM_REMOTE_URL.rstrip('/')}/status"
         self.is_connectable = False
+        self.time_to_ready = None
 
     def __call__(self):
-        retry = 100
-        for _ in range(retry):
-            if self._check_connection():
-                self.is_connectable = True
-                break
-            logging.info("Sleeping.")
-            sleep(1)
-        else:
-            logging.error(f"🚨 Failed to connect to {self.host}:{self.port}!")
-            sys.exit(1)
-
-    def _check_connection(self):
-        process = Popen(
-            ["nc", "-zv", self.host, self.port], stdout=DEVNULL, stderr=STDOUT
+        session = create_http_session()
+        started_at = perf_counter()
+        deadline = started_at + config.READINESS_TIMEOUT
+        interval = READINESS_INITIAL_INTERVAL
+        while not self._check_connection(session):
+            remaining = deadline - perf_counter()
+            if remaining <= 0:
+                logging.error(
+                    f"🚨 Failed to connect to {self.host}:{self.port}!"
+                )
+                sys.exit(1)
+            logging.info(f"Sleeping {interval:.2f}s.")
+            sleep(min(interval, remaining))
+            interval = min(interval * 2, READINESS_MAX_INTERVAL)
+
+        self.is_connectable = True
+        self.time_to_ready = perf_counter() - started_at
+        logging.info(
+            f"⏱ {self.host}:{self.port} was ready "
+            f"in {self.time_to_ready:.2f}s."
         )
-        if process.wait() != 0:
-            logging.warning(
-                f"⛔ Unable to communicate with {self.host}:{self.port}."
-            )
+
+    def _check_connection(self, session):
+        try:
+            response = session.get(self.url, timeout=READINESS_MAX_INTERVAL)
+            is_ready = response.ok and response.json()["value"]["ready"]
+        except (requests.RequestException, ValueError, KeyError, TypeError):
+            is_ready = False
+
+        if not is_ready:
+            logging.warning(f"⛔ {self.host}:{self.port} is not ready.")
             return False
         else:
-            logging.info(f"✅ Can communicate with {self.host}:{self.port}!")
+            logging.info(f"✅ {self.host}:{self.port} is ready!")
             return True
 
 
@@ -55,53 +131,278 @@ class LoadingUserTask:
         self.users = []
 
     def __call__(self):
-        self.users = read_jsonlines_s3(config.USERS_FILE_PATH)
+        path = config.USERS_FILE_PATH
+        if urlparse(path).scheme == "s3" and config.USERS_CACHE:
+            users = self._load_cached(path)
+        else:
+            users = read_jsonlines(path)
+        self.users = shard_users(
+            users,
+            config.SHARD_INDEX,
+            config.SHARD_COUNT,
+            config.SHARD_PLACEMENT,
+        )
+
+    def _load_cached(self, path):
+        cache = UsersCache(path)
+        if config.USERS_CACHE_INVALIDATE:
+            cache.invalidate()
+
+        entry = cache.load()
+        if entry is not None and cache.is_fresh(entry):
+            logging.info("📦 Using cached users.")
+            return entry["users"]
+
+        res = get_s3_object(path, entry["etag"] if entry else None)
+        if res is None:
+            logging.info("📦 Users file is not modified, using cached users.")
+            cache.touch(entry)
+            return entry["users"]
+
+        users = [
+            user_kwargs
+            for user_kwargs in iter_jsonlines(res["Body"])
+            if self._is_valid(user_kwargs)
+        ]
+        cache.save(res["ETag"], users)
+        return users
+
+    def _is_valid(self, user_kwargs):
+        try:
+            User(**user_kwargs)
+        except TypeError as e:
+            logging.warning(f"⛔ Skipping invalid user ({e}).")
+            return False
+        return True
+
+
+class IndexingSlotTask:
+    def __init__(
+        self,
+        session_pool: SessionPool,
+        date_patterns=(),
+        fingerprint: ListingFingerprint = None,
+    ):
+        self.session_pool = session_pool
+        self.date_patterns = set(date_patterns)
+        self.fingerprint = fingerprint
+        self.listing = []
+        self.slots = []
+        self.slots_by_pattern = {}
+        self.reservable_start = None
+        self.unsettled = set()
+        self._lock = Lock()
+
+    def __call__(self):
+        if self.session_pool is None:
+            links, reservable_start = load_listing_over_http(
+                create_http_session()
+            )
+        else:
+            with self.session_pool.lease() as driver:
+                # open reservation top page once for every user
+                driver.get(config.RESERVATION_URL)
+                links, reservable_start = driver.execute_script(
+                    INDEXING_SLOT_SCRIPT,
+                    metadata.CSS_SELECTOR,
+                    metadata.XPATH_RESERVABLE_START_DATE,
+                )
+        self.reservable_start = reservable_start
+        self.listing = [
+            Slot(
+                index=index,
+                text=normalize_text(text),
+                href=href,
+                marker=marker,
+            )
+            for index, (text, href, marker) in enumerate(links)
+        ]
+        self.slots = self.listing
+        if self.fingerprint is not None:
+            self.slots = self.fingerprint.changed(self.listing)
+            logging.info(
+                f"🧾 {len(self.slots)} of {len(self.listing)} dates "
+                "are new or changed since the last run."
+            )
+        self._index_date_patterns()
+        logging.info(f"📅 Indexed {len(self.slots)} dates.")
+
+    def slots_for(self, user: User):
+        if user.date_pattern in self.slots_by_pattern:
+            return self.slots_by_pattern[user.date_pattern]
+
+        patterns = user.date_pattern.split(",")
+        return [
+            slot
+            for slot in self.slots
+            if any(pattern in slot.text for pattern in patterns)
+        ]
+
+    def retry(self, dates):
+        # users finish on worker threads
+        with self._lock:
+            self.unsettled.update(dates)
+
+    def _index_date_patterns(self):
+        matcher = DatePatternMatcher()
+        for date_pattern in self.date_patterns:
+            matcher.add(date_pattern, date_pattern)
+        matcher.build()
+
+        self.slots_by_pattern = {
+            date_pattern: [] for date_pattern in self.date_patterns
+        }
+        for slot in self.slots:
+            for date_pattern in matcher.match_one(slot.text):
+                self.slots_by_pattern[date_pattern].append(slot)
 
 
 class ReservationTask:
-    def __init__(self, user: User):
+    def __init__(
+        self,
+        user: User,
+        session_pool: SessionPool = None,
+        slots: list[Slot] = None,
+    ):
         self.user = user
+        self.session_pool = session_pool
+        self.slots = slots
         self.reservations = []
+        self.failed_dates = []
+        self.submitted_at = None
+        self.waiter = StepWaiter()
+        self.ledger = reservation_ledger()
+        self.unavailable_dates = unavailable_dates()
 
     def __call__(self):
-        options = webdriver.ChromeOptions()
-        options.add_argument("--no-sandbox")
-        options.add_argument("--disable-dev-shm-usage")
-        driver = webdriver.Remote(
-            command_executor=config.SELENIUM_REMOTE_URL,
-            desired_capabilities=options.to_capabilities(),
-            options=options,
-        )
-        driver.set_window_size(1200, 900)
-        self._start(driver)
+        if self.slots is not None:
+            self.slots = self._pending(self.slots)
+        if self.slots is not None and not self.slots:
+            logging.info("💤 No matching dates, skipping.")
+            return
+
+        if self.session_pool is not None:
+            with self.session_pool.lease() as driver:
+                self._start(driver)
+        else:
+            driver = create_driver()
+            try:
+                self._start(driver)
+            finally:
+                driver.quit()
 
     def _start(self, driver):
+        if config.NAVIGATION == "direct" and self.slots is not None:
+            self._navigate_dates(driver)
+        else:
+            self._click_dates(driver, self.slots)
+
+    def _navigate_dates(self, driver):
+        fallback_slots = []
+        for slot in self.slots:
+            if urlparse(slot.href).scheme not in ("http", "https"):
+                fallback_slots.append(slot)
+                continue
+
+            with tagged(date=slot.text):
+                # open date application page in the current tab
+                started_at = perf_counter()
+                with span("open_date"):
+                    driver.get(slot.href)
+
+                self._try_reserve(driver, slot.text, started_at)
+
+        # links that only work through JavaScript need the listing
+        if fallback_slots:
+            self._click_dates(driver, fallback_slots)
+
+    def _click_dates(self, driver, slots):
         # open reservation top page
-        driver.get(config.RESERVATION_URL)
+        with span("listing"):
+            started_at = perf_counter()
+            driver.get(config.RESERVATION_URL)
+            date_elements = (
+                self.waiter.wait(driver, "listing", started_at) or []
+            )
 
-        date_elements = driver.find_elements(
-            By.CSS_SELECTOR, metadata.CSS_SELECTOR
-        )
+        for date, date_element in self._target_dates(date_elements, slots):
+            with tagged(date=date):
+                self._open_date(driver, date, date_element)
+
+    def _open_date(self, driver, date, date_element):
+        with span("open_date"):
+            # click a date link
+            started_at = perf_counter()
+            date_element.click()
+
+            # switch to date application page
+            try:
+                self.waiter.wait(driver, "window", started_at)
+            except TimeoutException as e:
+                logging.warning(f"⛔ Skipping {date} ({e.msg}).")
+                return
+            driver.switch_to.window(driver.window_handles[1])
+
+        self._try_reserve(driver, date, started_at)
+
+        # close date application form page
+        driver.close()
+
+        # switch to reservation top page
+        driver.switch_to.window(driver.window_handles[0])
+
+    def _target_dates(self, date_elements, slots):
+        if slots is None:
+            for date_element in date_elements:
+                date = normalize_text(date_element.text)
+                if self._match_date_pattern(date) and self._is_pending(date):
+                    yield date, date_element
+        else:
+            for slot in slots:
+                date_element = self._find_date_element(date_elements, slot)
+                if date_element is not None:
+                    yield slot.text, date_element
+
+    def _find_date_element(self, date_elements, slot):
+        # innerText and WebDriver text differ in whitespace, e.g. &nbsp;
+        if (
+            slot.index < len(date_elements)
+            and normalize_text(date_elements[slot.index].text) == slot.text
+        ):
+            return date_elements[slot.index]
+
+        # the listing changed since it was indexed
         for date_element in date_elements:
-            date = date_element.text
-            if self._match_date_pattern(date):
-                # click a date link
-                date_element.click()
+            if normalize_text(date_element.text) == slot.text:
+                return date_element
+        logging.warning(f"⛔ {slot.text} is no longer listed, skipping.")
+        return None
 
-                # switch to date application page
-                driver.switch_to.window(driver.window_handles[1])
+    def _pending(self, slots):
+        return [slot for slot in slots if self._is_pending(slot.text)]
 
-                # reserve date if reservable
-                if self._is_reservable(driver):
-                    self._reserve(driver, date)
+    def _is_pending(self, date):
+        return not self._is_booked(date) and not self._is_unavailable(date)
 
-                # close date application form page
-                driver.close()
+    def _is_booked(self, date):
+        if self.ledger is None or not self.ledger.is_booked(
+            self.user.email, date
+        ):
+            return False
+        logging.info(f"📒 Already booked {date}, skipping.")
+        return True
 
-                # switch to reservation top page
-                driver.switch_to.window(driver.window_handles[0])
+    def _is_unavailable(self, date):
+        if self.unavailable_dates is None or not (
+            self.unavailable_dates.contains(date)
+        ):
+            return False
+        logging.info(f"🈵 {date} is known to be full, skipping.")
+        return True
 
-        driver.quit()
+    def _mark_unavailable(self, date, seen_at=None):
+        if self.unavailable_dates is not None:
+            self.unavailable_dates.add(date, seen_at)
 
     def _match_date_pattern(self, date):
         date_pattern = self.user.date_pattern
@@ -109,10 +410,86 @@ class ReservationTask:
             if pattern in date:
                 return True
 
-    def _is_reservable(self, driver):
-        return "エラー" not in driver.title
+    def _try_reserve(self, driver, date, started_at=None):
+        # a slow date must not cost the user the remaining ones
+        try:
+            if self._is_reservable(driver, started_at):
+                self._reserve(driver, date)
+            else:
+                self._mark_unavailable(date, started_at)
+        except TimeoutException as e:
+            logging.warning(f"⛔ Skipping {date} ({e.msg}).")
+            self.failed_dates.append(date)
+
+    def _is_reservable(self, driver, started_at=None):
+        return bool(self.waiter.wait(driver, "application", started_at))
 
     def _reserve(self, driver, date):
+        with span("reserve"):
+            self.waiter.wait(driver, "form")
+            self._fill_form(driver)
+
+            # click confirmation button
+            started_at = perf_counter()
+            driver.find_element(
+                By.XPATH, metadata.XPATH_CONFIRMATION_BUTTON
+            ).click()
+
+            # click apply button
+            apply_button = self.waiter.wait(driver, "confirmation", started_at)
+            if not apply_button:
+                return
+            self.submitted_at = perf_counter()
+            apply_button.click()
+
+            # the site may already have the application, so wait it out
+            try:
+                completed = self.waiter.wait(
+                    driver,
+                    "completion",
+                    self.submitted_at,
+                    timeout=config.WAIT_TIMEOUT,
+                )
+            except TimeoutException:
+                logging.error(f"🚨 Unknown result of applying {date}!")
+                self._append_unknown_reservation(date)
+                return
+            if completed:
+                self._store_reservation(driver, date)
+                self._save_screenshot(driver, date)
+
+    def _fill_form(self, driver):
+        started_at = perf_counter()
+        with span("fill_form"):
+            if config.FORM_FILL == "script" and self._fill_form_by_script(
+                driver
+            ):
+                method = "script"
+            else:
+                self._fill_form_by_keys(driver)
+                method = "keys"
+        # BOOKER_RECORD counts the WebDriver commands actually sent
+        logging.info(
+            f"⏱ Filled form by {method} in {perf_counter() - started_at:.3f}s."
+        )
+
+    def _fill_form_by_script(self, driver):
+        fields = [
+            [metadata.XPATH_NAME_KANJI_FORM, self.user.name_kanji],
+            [metadata.XPATH_NAME_KANA_FORM, self.user.name_kana],
+            [metadata.XPATH_TELEPHONE_FORM, self.user.telephone],
+            [metadata.XPATH_EMAIL_FORM, self.user.email],
+            [metadata.XPATH_EMAIL_CONFIRMATION_FORM, self.user.email],
+        ]
+        missing = driver.execute_script(
+            FILLING_FORM_SCRIPT, fields, metadata.XPATH_CHECK_TIME_FORM
+        )
+        if missing:
+            logging.warning(f"⛔ Form field {missing} not found, typing keys.")
+            return False
+        return True
+
+    def _fill_form_by_keys(self, driver):
         # fill kanji name form
         driver.find_element(
             By.XPATH, metadata.XPATH_NAME_KANJI_FORM
@@ -143,58 +520,295 @@ class ReservationTask:
             By.XPATH, metadata.XPATH_CHECK_TIME_FORM
         ).send_keys(Keys.SPACE)
 
-        # click confirmation button
-        driver.find_element(
-            By.XPATH, metadata.XPATH_CONFIRMATION_BUTTON
-        ).click()
-
-        # click apply button
-        driver.find_element(By.XPATH, metadata.XPATH_APPLY_BUTTON).click()
-
-        if self._is_reservable(driver):
-            self._store_reservation(driver, date)
-            self._save_screenshot(driver, date)
-
     def _store_reservation(self, driver, date):
-        application_number, inquiry_number = driver.find_element(
-            By.XPATH, metadata.XPATH_APPLICATION_NUMBERS
-        ).text.split("\n")
+        try:
+            text = driver.find_element(
+                By.XPATH, metadata.XPATH_APPLICATION_NUMBERS
+            ).text
+        except WebDriverException as e:
+            logging.error(f"🚨 Application numbers of {date} not found ({e})!")
+            self._append_unknown_reservation(date)
+            return
+        self._append_reservation(date, text)
+
+    def _append_reservation(self, date, text):
+        # the application was sent, so an odd page still gets recorded
+        try:
+            application_number, inquiry_number = text.split("\n")
+        except ValueError:
+            logging.error(f"🚨 Unexpected application numbers of {date}!")
+            self._append_unknown_reservation(date)
+            return
         self.reservations.append(
             Reservation(
                 user=self.user,
                 reserved_date=date,
                 application_number=application_number[-16:],
                 inquiry_number=inquiry_number[-6:],
+                submitted_at=self.submitted_at,
+                booked_at=datetime.now(),
+            )
+        )
+        if self.ledger is not None:
+            self.ledger.add(self.reservations[-1])
+
+    def _append_unknown_reservation(self, date):
+        # notified and kept in the ledger so nobody applies twice
+        self.reservations.append(
+            Reservation(
+                user=self.user,
+                reserved_date=date,
+                application_number=None,
+                inquiry_number=None,
+                submitted_at=self.submitted_at,
+                booked_at=datetime.now(),
             )
         )
+        if self.ledger is not None:
+            self.ledger.add(self.reservations[-1])
 
     def _save_screenshot(self, driver, date):
-        w = driver.execute_script("return document.body.scrollWidth")
-        h = driver.execute_script("return document.body.scrollHeight")
-        driver.set_window_size(w, h)
-        driver.save_screenshot(f"{date}.png")
+        # kept in memory so users booking the same date never collide
+        # the reservation is made, so a failed capture must not stop its notice
+        try:
+            with span("capture"):
+                self.reservations[-1].screenshot = capture(driver)
+        except Exception as e:
+            logging.warning(f"⛔ Unable to capture {date} ({e}).")
+
+
+class HttpReservationTask(ReservationTask):
+    def __call__(self):
+        if self.slots is not None:
+            self.slots = self._pending(self.slots)
+        if self.slots is not None and not self.slots:
+            logging.info("💤 No matching dates, skipping.")
+            return
+
+        session = create_http_session()
+        slots = self.slots
+        if slots is None:
+            slots = [
+                Slot(index=index, text=text, href=href, marker=marker)
+                for index, (text, href, marker) in enumerate(
+                    load_listing_over_http(session)[0]
+                )
+                if self._match_date_pattern(text) and self._is_pending(text)
+            ]
+
+        fallback_slots = []
+        for slot in slots:
+            try:
+                with tagged(date=slot.text), span("reserve", engine="http"):
+                    self._reserve_over_http(session, slot)
+            except (requests.RequestException, DocumentError) as e:
+                logging.warning(
+                    f"⛔ Unable to reserve {slot.text} over HTTP ({e}), "
+                    "falling back to Selenium."
+                )
+                fallback_slots.append(slot)
+
+        if fallback_slots:
+            self.slots = fallback_slots
+            super().__call__()
+
+    def _reserve_over_http(self, session, slot):
+        # open date application page
+        started_at = perf_counter()
+        response, document = request_document(session, "GET", slot.href)
+        if "エラー" in document.title:
+            self._mark_unavailable(slot.text, started_at)
+            return
+
+        # submit application form
+        method, url, data = self._form_request(
+            response,
+            document,
+            metadata.XPATH_CONFIRMATION_BUTTON,
+            {
+                metadata.XPATH_NAME_KANJI_FORM: self.user.name_kanji,
+                metadata.XPATH_NAME_KANA_FORM: self.user.name_kana,
+                metadata.XPATH_TELEPHONE_FORM: self.user.telephone,
+                metadata.XPATH_EMAIL_FORM: self.user.email,
+                metadata.XPATH_EMAIL_CONFIRMATION_FORM: self.user.email,
+                metadata.XPATH_CHECK_TIME_FORM: None,
+            },
+        )
+        response, document = request_document(session, method, url, data)
+        if "エラー" in document.title:
+            return
+
+        # submit confirmation form, which must not be retried by Selenium
+        method, url, data = self._form_request(
+            response, document, metadata.XPATH_APPLY_BUTTON, {}
+        )
+        self.submitted_at = perf_counter()
+        try:
+            response, document = request_document(session, method, url, data)
+        except requests.RequestException as e:
+            logging.error(f"🚨 Unknown result of applying {slot.text} ({e})!")
+            self._append_unknown_reservation(slot.text)
+            return
+        if "エラー" in document.title:
+            return
+
+        element = document.find(metadata.XPATH_APPLICATION_NUMBERS)
+        if element is None:
+            logging.error(f"🚨 Application numbers of {slot.text} not found!")
+            self._append_unknown_reservation(slot.text)
+            return
+        self._append_reservation(slot.text, element.text)
+
+    def _form_request(self, response, document, submit_xpath, values):
+        submit = document.find(submit_xpath)
+        form = submit.closest("form") if submit is not None else None
+        if form is None:
+            raise DocumentError(f"Form of {submit_xpath} not found.")
+
+        fields = {}
+        for xpath, value in values.items():
+            element = document.find(xpath)
+            if element is None:
+                raise DocumentError(f"Form field {xpath} not found.")
+            fields[element] = value
+
+        data = []
+        for element in form.iter():
+            name = element.attrs.get("name")
+            if not name or element.tag not in ("input", "select", "textarea"):
+                continue
+            elif element.tag == "select":
+                values = [fields[element]] if element in fields else None
+                for value in values or self._selected_values(element):
+                    data.append((name, value))
+            elif element.tag == "textarea":
+                data.append((name, fields.get(element) or element.text))
+            else:
+                self._append_input(data, element, name, fields, submit)
+
+        # requests would send UTF-8 to a Shift_JIS form
+        charset = self._form_charset(response, form)
+        data = [
+            (
+                name.encode(charset, "xmlcharrefreplace"),
+                (value or "").encode(charset, "xmlcharrefreplace"),
+            )
+            for name, value in data
+        ]
+
+        method = form.attrs.get("method", "get").upper()
+        url = urljoin(response.url, form.attrs.get("action") or response.url)
+        return method, url, data
+
+    def _append_input(self, data, element, name, fields, submit):
+        input_type = element.attrs.get("type", "text").lower()
+        value = element.attrs.get("value", "")
+        if element in fields:
+            # checkboxes are sent with their own value
+            data.append((name, fields[element] or value or "on"))
+        elif input_type in ("checkbox", "radio"):
+            if "checked" in element.attrs:
+                data.append((name, value or "on"))
+        elif input_type in ("submit", "image", "button", "reset"):
+            if element is submit:
+                data.append((name, value))
+        else:
+            data.append((name, value))
+
+    def _selected_values(self, select):
+        options = list(select.iter("option"))
+        selected = [o for o in options if "selected" in o.attrs]
+        if not selected and options and "multiple" not in select.attrs:
+            selected = options[:1]
+        return [o.attrs.get("value", o.text) for o in selected]
+
+    def _form_charset(self, response, form):
+        charsets = form.attrs.get("accept-charset") or ""
+        for charset in charsets.replace(",", " ").split() + [
+            response.encoding or "utf-8"
+        ]:
+            try:
+                return codecs.lookup(charset).name
+            except LookupError:
+                continue
+        return "utf-8"
 
 
 class NotificationTask:
-    def __init__(self, reservations: list[Reservation]):
+    def __init__(
+        self, reservations: list[Reservation], notifier: SlackNotifier = None
+    ):
         self.reservations = reservations
+        self.notifier = notifier
         self.token = config.SLACK_TOKEN
         self.channel = config.SLACK_CHANNEL
 
     def __call__(self):
-        for reservation in self.reservations:
-            self._notify(reservation)
+        if self.notifier is not None:
+            # uploads run in the background while the next user books
+            for reservation in self.reservations:
+                self.notifier.submit(self._notify, reservation)
+            return
+
+        self.notifier = SlackNotifier(concurrency=1)
+        try:
+            for reservation in self.reservations:
+                self._notify(reservation)
+        finally:
+            self.notifier.close()
 
     def _notify(self, reservation):
-        filename = f"{reservation.reserved_date}.png"
-        comment = f"""予約が完了しました。
+        heading = (
+            "予約が完了しました。"
+            if reservation.application_number is not None
+            else "予約の結果が不明です。サイトで確認してください。"
+        )
+        comment = f"""{heading}
 ```
-到達日時：
-  {datetime.now().strftime("%Y年%m月%d日 %H時%M分")}
+{self._describe(reservation)}
+```"""
+        if reservation.screenshot is None:
+            # reservations made over HTTP have no screenshot
+            self.notifier.post(
+                "chat.postMessage",
+                params={
+                    "token": self.token,
+                    "channel": self.channel,
+                    "text": comment,
+                },
+            )
+            return
+
+        screenshot = reservation.screenshot
+        filename = f"{reservation.reserved_date}.{screenshot.format}"
+        param = {
+            "token": self.token,
+            "channels": self.channel,
+            "filename": filename,
+            "initial_comment": comment,
+            "title": filename,
+        }
+        self.notifier.post(
+            "files.upload",
+            params=param,
+            files={
+                "file": (
+                    filename,
+                    screenshot.data,
+                    f"image/{screenshot.format}",
+                )
+            },
+        )
+
+    def _describe(self, reservation):
+        # digests are sent long after each reservation was made
+        booked_at = reservation.booked_at or datetime.now()
+        return f"""到達日時：
+  {booked_at.strftime("%Y年%m月%d日 %H時%M分")}
 到達番号：
-  {reservation.application_number}
+  {reservation.application_number or "不明"}
 問い合わせ番号：
-  {reservation.inquiry_number}
+  {reservation.inquiry_number or "不明"}
 申込内容：
 お名前:
   {reservation.user.name_kanji}
@@ -205,19 +819,119 @@ class NotificationTask:
 メールアドレス:
   {reservation.user.email}
 来館利用日時 :
-  {reservation.reserved_date} 14:00-17:30
+  {reservation.reserved_date} 14:00-17:30"""
+
+
+class DigestNotificationTask(NotificationTask):
+    def __call__(self):
+        if not self.reservations:
+            return
+
+        if self.notifier is not None:
+            self._notify_digest()
+            return
+
+        self.notifier = SlackNotifier(concurrency=1)
+        try:
+            self._notify_digest()
+        finally:
+            self.notifier.close()
+
+    def _notify_digest(self):
+        details = "\n\n".join(
+            self._describe(reservation) for reservation in self.reservations
+        )
+        unknown = sum(
+            reservation.application_number is None
+            for reservation in self.reservations
+        )
+        headings = []
+        if len(self.reservations) > unknown:
+            headings.append(
+                f"{len(self.reservations) - unknown}件の予約が完了しました。"
+            )
+        if unknown:
+            headings.append(
+                f"{unknown}件の予約の結果が不明です。サイトで確認してください。"
+            )
+        heading = "\n".join(headings)
+        comment = f"""{heading}
+```
+{details}
 ```"""
-        files = {"file": open(filename, "rb")}
-        param = {
-            "token": self.token,
-            "channels": self.channel,
-            "filename": filename,
-            "initial_comment": comment,
-            "title": filename,
-        }
-        requests.post(
-            url="https://slack.com/api/files.upload",
-            params=param,
-            files=files,
+        archive = self._archive()
+        if archive is None:
+            self.notifier.post(
+                "chat.postMessage",
+                params={
+                    "token": self.token,
+                    "channel": self.channel,
+                    "text": comment,
+                },
+            )
+            return
+
+        # every screenshot goes up in a single files.upload call
+        filename = f"reservations_{datetime.now():%Y%m%d%H%M%S}.zip"
+        self.notifier.post(
+            "files.upload",
+            params={
+                "token": self.token,
+                "channels": self.channel,
+                "filename": filename,
+                "initial_comment": comment,
+                "title": filename,
+            },
+            files={"file": (filename, archive, "application/zip")},
         )
-        os.remove(filename)
+
+    def _archive(self):
+        screenshots = [
+            reservation
+            for reservation in self.reservations
+            if reservation.screenshot is not None
+        ]
+        if not screenshots:
+            return None
+
+        buffer = io.BytesIO()
+        # images are already compressed, so they are stored as they are
+        with zipfile.ZipFile(buffer, "w", zipfile.ZIP_STORED) as archive:
+            for reservation in screenshots:
+                archive.writestr(
+                    f"{reservation.reserved_date}_{reservation.user.email}"
+                    f".{reservation.screenshot.format}",
+                    reservation.screenshot.data,
+                )
+        return buffer.getvalue()
+
+
+def load_listing_over_http(session):
+    response, document = request_document(
+        session, "GET", config.RESERVATION_URL
+    )
+    links = [
+        [
+            element.text,
+            urljoin(response.url, element.attrs.get("href", "")),
+            " ".join(
+                [" ".join(element.classes), (element.parent or element).text]
+            ),
+        ]
+        for element in document.select(metadata.CSS_SELECTOR)
+    ]
+    reservable_start = document.find(metadata.XPATH_RESERVABLE_START_DATE)
+    if reservable_start is not None:
+        reservable_start = reservable_start.text
+    return links, reservable_start
+
+
+def request_document(session, method, url, data=None):
+    if method == "GET":
+        response = session.get(url, params=data, timeout=config.HTTP_TIMEOUT)
+    else:
+        response = session.post(url, data=data, timeout=config.HTTP_TIMEOUT)
+    response.raise_for_status()
+    if "charset" not in response.headers.get("Content-Type", ""):
+        response.encoding = response.apparent_encoding
+    return response, Document(response.text)
@@ -0,0 +1,167 @@
+import json
+import logging
+import os
+import sys
+import threading
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from math import ceil
+from time import perf_counter, time
+
+from booker import config
+
+_NULL_SPAN = nullcontext()
+_local = threading.local()
+_lock = threading.Lock()
+_spans = []
+
+
+class Span:
+    __slots__ = ("name", "tags", "started_at")
+
+    def __init__(self, name: str, tags: dict):
+        self.name = name
+        self.tags = tags
+
+    def __enter__(self):
+        self.started_at = perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration = perf_counter() - self.started_at
+        record = {
+            "name": self.name,
+            "timestamp": time() - duration,
+            "duration": duration,
+            **current_tags(),
+            **self.tags,
+        }
+        if exc_type is not None:
+            record["error"] = exc_type.__name__
+        with _lock:
+            _spans.append(record)
+        return False
+
+
+def span(name: str, **tags):
+    # a disabled tracer costs one attribute lookup per step
+    if not config.TRACE:
+        return _NULL_SPAN
+    return Span(name, tags)
+
+
+def tag(**tags):
+    _local.tags = tags
+
+
+@contextmanager
+def tagged(**tags):
+    previous = current_tags()
+    _local.tags = {**previous, **tags}
+    try:
+        yield
+    finally:
+        _local.tags = previous
+
+
+def current_tags():
+    return getattr(_local, "tags", {})
+
+
+def trace_driver(driver):
+    if not config.TRACE:
+        return driver
+
+    execute = driver.execute
+
+    def traced(driver_command, params=None):
+        with span(f"webdriver.{driver_command}"):
+            return execute(driver_command, params)
+
+    # WebElement commands are routed through the parent driver as well
+    driver.execute = traced
+    return driver
+
+
+def percentile(samples, q):
+    # nearest rank
+    samples = sorted(samples)
+    return samples[max(ceil(len(samples) * q) - 1, 0)]
+
+
+def summarize(spans):
+    durations = {}
+    for record in spans:
+        durations.setdefault(record["name"], []).append(record["duration"])
+    return {
+        name: {
+            "count": len(samples),
+            "p50": percentile(samples, 0.5),
+            "p95": percentile(samples, 0.95),
+        }
+        for name, samples in sorted(durations.items())
+    }
+
+
+def export():
+    if not config.TRACE:
+        return
+
+    with _lock:
+        spans = list(_spans)
+        _spans.clear()
+    summary = summarize(spans)
+    for name, metrics in summary.items():
+        logging.info(
+            f"⏱ {name}: {metrics['count']} spans, "
+            f"p50 {metrics['p50'] * 1000:.1f}ms, "
+            f"p95 {metrics['p95'] * 1000:.1f}ms"
+        )
+
+    if config.TRACE == "emf":
+        # CloudWatch picks embedded metrics up from the log stream
+        _write_lines(
+            sys.stdout, [_emf(name, m) for name, m in summary.items()]
+        )
+        return
+
+    file = config.TRACE_FILE or os.path.join(
+        config.CACHE_DIR, f"trace-{datetime.now():%Y%m%d%H%M%S}.jsonl"
+    )
+    try:
+        os.makedirs(os.path.dirname(file) or ".", exist_ok=True)
+        with open(file, "w", encoding="utf-8") as f:
+            _write_lines(f, spans + [{"name": "summary", "steps": summary}])
+    except OSError as e:
+        logging.warning(f"⛔ Unable to write {file} ({e}).")
+        return
+    logging.info(f"🧾 Wrote {len(spans)} spans to {file}.")
+
+
+def _emf(name, metrics):
+    return {
+        "_aws": {
+            "Timestamp": int(time() * 1000),
+            "CloudWatchMetrics": [
+                {
+                    "Namespace": config.TRACE_NAMESPACE,
+                    "Dimensions": [["Step"]],
+                    "Metrics": [
+                        {"Name": "Count", "Unit": "Count"},
+                        {"Name": "p50", "Unit": "Milliseconds"},
+                        {"Name": "p95", "Unit": "Milliseconds"},
+                    ],
+                }
+            ],
+        },
+        "Step": name,
+        "Count": metrics["count"],
+        "p50": metrics["p50"] * 1000,
+        "p95": metrics["p95"] * 1000,
+    }
+
+
+def _write_lines(stream, objs):
+    for obj in objs:
+        stream.write(json.dumps(obj, ensure_ascii=False) + "\n")
+    stream.flush()
@@ -1,4 +1,5 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from datetime import datetime
 
 
 @dataclass
@@ -10,9 +11,27 @@ class User:
     date_pattern: str
 
 
+@dataclass
+class Screenshot:
+    data: bytes = field(repr=False)
+    format: str
+
+
 @dataclass
 class Reservation:
     user: User
     reserved_date: str
     application_number: str
     inquiry_number: str
+    submitted_at: float = field(default=None, compare=False)
+    booked_at: datetime = field(default=None, compare=False)
+    screenshot: "Screenshot" = field(default=None, compare=False, repr=False)
+
+
+@dataclass
+class Slot:
+    index: int
+    text: str
+    href: str
+    # classes and surrounding text, which change when a date fills up
+    marker: str = field(default="", compare=False)
@@ -0,0 +1,143 @@
+import json
+import os
+from collections import defaultdict, deque
+from functools import lru_cache
+from threading import Lock
+from time import perf_counter
+
+from selenium.common.exceptions import StaleElementReferenceException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions
+from selenium.webdriver.support.wait import WebDriverWait
+
+from booker import config, metadata
+from booker.cache import write_json
+from booker.tracing import percentile, span
+
+ERROR_TITLE = "エラー"
+SAMPLE_SIZE = 50
+MIN_SAMPLES = 5
+TIMEOUT_FACTOR = 3.0
+
+
+def listing_ready(driver):
+    elements = driver.find_elements(By.CSS_SELECTOR, metadata.CSS_SELECTOR)
+    if elements:
+        return elements
+    # a listing without dates is ready once the document has loaded
+    if driver.execute_script("return document.readyState") == "complete":
+        return []
+    return False
+
+
+def new_window(driver):
+    return len(driver.window_handles) > 1
+
+
+def title_known(driver):
+    return driver.title or False
+
+
+CONDITIONS = {
+    "listing": listing_ready,
+    "window": new_window,
+    "application": title_known,
+    "form": expected_conditions.element_to_be_clickable(
+        (By.XPATH, metadata.XPATH_NAME_KANJI_FORM)
+    ),
+    "confirmation": expected_conditions.element_to_be_clickable(
+        (By.XPATH, metadata.XPATH_APPLY_BUTTON)
+    ),
+    "completion": expected_conditions.presence_of_element_located(
+        (By.XPATH, metadata.XPATH_APPLICATION_NUMBERS)
+    ),
+}
+
+
+class StepWaiter:
+    def __init__(self, latencies=None, poll_frequency: float = None):
+        self.latencies = latencies or latency_store()
+        self.poll_frequency = poll_frequency or config.WAIT_POLL_INTERVAL
+
+    def wait(
+        self,
+        driver,
+        step: str,
+        started_at: float = None,
+        timeout: float = None,
+    ):
+        condition = CONDITIONS[step]
+
+        def check(driver):
+            # the error page never turns into the expected one
+            if ERROR_TITLE in driver.title:
+                return (None,)
+            result = condition(driver)
+            if result is False or result is None:
+                return False
+            return (result,)
+
+        timeout = timeout or self.latencies.timeout(step)
+        # navigation blocks until the page loads, so callers pass its start
+        started_at = started_at or perf_counter()
+        with span(f"wait.{step}"):
+            (result,) = WebDriverWait(
+                driver,
+                timeout,
+                poll_frequency=self.poll_frequency,
+                ignored_exceptions=(StaleElementReferenceException,),
+            ).until(check, message=f"{step} not ready in {timeout:.2f}s")
+        self.latencies.record(step, perf_counter() - started_at)
+        return False if result is None else result
+
+
+class LatencyStore:
+    def __init__(self, file: str = None):
+        self.file = file or os.path.join(config.CACHE_DIR, "latencies.json")
+        self.dirty = False
+        self._latencies = defaultdict(lambda: deque(maxlen=SAMPLE_SIZE))
+        self._lock = Lock()
+
+    def load(self):
+        try:
+            with open(self.file, encoding="utf-8") as f:
+                latencies = json.load(f)
+        except (OSError, ValueError):
+            return
+        with self._lock:
+            for step, samples in latencies.items():
+                self._latencies[step].extend(samples)
+
+    def save(self):
+        with self._lock:
+            latencies = {
+                step: list(samples)
+                for step, samples in self._latencies.items()
+            }
+            self.dirty = False
+        write_json(self.file, latencies)
+
+    def record(self, step: str, elapsed: float):
+        with self._lock:
+            self._latencies[step].append(round(elapsed, 4))
+            self.dirty = True
+
+    def timeout(self, step: str):
+        with self._lock:
+            samples = list(self._latencies[step])
+        if len(samples) < MIN_SAMPLES:
+            return config.WAIT_TIMEOUT
+
+        # generous enough for a slow page, short enough to fail fast
+        p95 = percentile(samples, 0.95)
+        return min(
+            max(p95 * TIMEOUT_FACTOR, config.WAIT_MIN_TIMEOUT),
+            config.WAIT_TIMEOUT,
+        )
+
+
+@lru_cache(maxsize=None)
+def latency_store():
+    latencies = LatencyStore()
+    latencies.load()
+    return latencies
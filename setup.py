@@ -13,8 +13,10 @@ setup(
         "python-dotenv==0.20.0",
         "boto3==1.22.9",
         "jsonlines==3.0.0",
+        "requests==2.27.1",
     ],
     extras_require={
+        "capture": ["Pillow==9.1.0"],
         "dev": [
             "black",
             "flake8",
@@ -25,5 +27,5 @@ setup(
             "pytest-randomly",
         ]
     },
-    entry_points={"console_scripts": [("booker=booker:main")]},
+    entry_points={"console_scripts": [("booker=booker:cli")]},
 )
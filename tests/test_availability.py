@@ -0,0 +1,105 @@
+import json
+import os
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+
+from booker import availability
+from booker.availability import UnavailableDates
+
+
+class UnavailableDatesTestCase(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.file = os.path.join(self.directory.name, "unavailable.json")
+
+    def test_contains(self):
+        sut = UnavailableDates(ttl=300, file=self.file)
+        sut.add("5月7日（土）")
+
+        self.assertTrue(sut.contains("5月7日（土）"))
+        self.assertFalse(sut.contains("5月8日（日）"))
+        self.assertTrue(sut.dirty)
+        self.assertEqual(sut.hits, 1)
+        self.assertEqual(sut.misses, 1)
+
+    def test_add_before_opening(self):
+        sut = UnavailableDates(ttl=300, file=self.file)
+        sut.not_before = 100.0
+        sut.add("5月7日（土）", 99.9)
+        sut.add("5月8日（日）", 100.1)
+
+        self.assertFalse(sut.contains("5月7日（土）"))
+        self.assertTrue(sut.contains("5月8日（日）"))
+
+    @patch("booker.availability.time")
+    def test_contains_expired(self, time_mock):
+        time_mock.return_value = 1000.0
+        sut = UnavailableDates(ttl=300, file=self.file)
+        sut.add("5月7日（土）")
+
+        time_mock.return_value = 1300.0
+        actual = sut.contains("5月7日（土）")
+
+        self.assertFalse(actual)
+        self.assertEqual(sut.misses, 1)
+
+    def test_save_and_load(self):
+        sut = UnavailableDates(ttl=300, file=self.file)
+        sut.add("5月7日（土）")
+        sut.save()
+
+        actual = UnavailableDates(ttl=300, file=self.file)
+        actual.load()
+
+        self.assertFalse(sut.dirty)
+        self.assertTrue(actual.contains("5月7日（土）"))
+
+    def test_load_expired(self):
+        with open(self.file, "w", encoding="utf-8") as f:
+            json.dump({"5月7日（土）": 0, "5月8日（日）": 2**40}, f)
+
+        sut = UnavailableDates(ttl=300, file=self.file)
+        sut.load()
+
+        self.assertFalse(sut.contains("5月7日（土）"))
+        self.assertTrue(sut.contains("5月8日（日）"))
+
+    def test_load_missing(self):
+        sut = UnavailableDates(ttl=300, file=self.file)
+        sut.load()
+
+        self.assertFalse(sut.contains("5月7日（土）"))
+
+
+@patch("booker.availability.config")
+class UnavailableDatesFactoryTestCase(TestCase):
+    def setUp(self):
+        availability.unavailable_dates.cache_clear()
+        self.addCleanup(availability.unavailable_dates.cache_clear)
+
+    def test_disabled(self, config_mock):
+        config_mock.UNAVAILABLE_TTL = 0
+
+        self.assertIsNone(availability.unavailable_dates())
+
+    @patch("booker.availability.UnavailableDates")
+    def test_persisted(self, unavailable_dates_mock, config_mock):
+        config_mock.UNAVAILABLE_TTL = 300
+        config_mock.UNAVAILABLE_PERSIST = True
+
+        actual = availability.unavailable_dates()
+
+        self.assertEqual(actual, unavailable_dates_mock.return_value)
+        self.assertIs(availability.unavailable_dates(), actual)
+        actual.load.assert_called_once_with()
+
+    @patch("booker.availability.UnavailableDates")
+    def test_in_memory(self, unavailable_dates_mock, config_mock):
+        config_mock.UNAVAILABLE_TTL = 300
+        config_mock.UNAVAILABLE_PERSIST = False
+
+        actual = availability.unavailable_dates()
+
+        actual.load.assert_not_called()
@@ -0,0 +1,92 @@
+import json
+import os
+import tempfile
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+from booker import bench, config
+
+
+class BenchTestCase(TestCase):
+    def test_make_dates(self):
+        actual = bench.make_dates(3)
+
+        self.assertEqual(
+            actual, ["5月1日（日）", "5月2日（月）", "5月3日（火）"]
+        )
+
+    def test_write_users(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "users.jsonl")
+            bench.write_users(path, 6)
+
+            with open(path, encoding="utf-8") as f:
+                actual = [json.loads(line) for line in f]
+
+        self.assertEqual(len(actual), 6)
+        self.assertEqual(actual[0]["email"], "user0@example.com")
+        self.assertEqual(actual[5]["date_pattern"], bench.DATE_PATTERNS[0])
+        self.assertEqual(len({user["email"] for user in actual}), 6)
+
+    def test_override_config(self):
+        original = config.RESERVATION_URL
+
+        with bench.override_config(RESERVATION_URL="http://127.0.0.1/"):
+            self.assertEqual(config.RESERVATION_URL, "http://127.0.0.1/")
+
+        self.assertEqual(config.RESERVATION_URL, original)
+
+    @patch("booker.bench.report")
+    def test_bench_over_http(self, report_mock):
+        with bench.override_config(ENGINE="http", NOTIFICATION_MODE="each"):
+            actual = bench.run_bench(users=4, dates=7, capacity=2)
+
+        # two weekend patterns, a Friday and a Wednesday among four users
+        self.assertEqual(actual["users"], 4)
+        self.assertEqual(actual["dates"], 7)
+        self.assertEqual(actual["engine"], "http")
+        self.assertEqual(actual["reservations"], 5)
+        self.assertEqual(actual["slack_calls"], 5)
+        self.assertEqual(actual["webdriver_commands"], 0)
+        self.assertGreaterEqual(actual["unavailable_hits"], 0)
+        self.assertGreater(actual["reservations_per_minute"], 0)
+        self.assertEqual(set(actual["user_latency"]), {"p50", "p95", "max"})
+        self.assertEqual(actual["steps"]["user"]["count"], 4)
+        report_mock.assert_called_once_with(actual)
+        self.assertEqual(actual["profile"], config.BROWSER_PROFILE)
+
+    @patch("booker.bench.report", MagicMock())
+    def test_bench_ignores_ledger(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "ledger.sqlite3")
+            with bench.override_config(
+                ENGINE="http", NOTIFICATION_MODE="each", LEDGER_PATH=path
+            ):
+                first = bench.run_bench(users=2, dates=7, capacity=2)
+                second = bench.run_bench(users=2, dates=7, capacity=2)
+
+            self.assertFalse(os.path.exists(path))
+        self.assertEqual(first["reservations"], second["reservations"])
+        self.assertGreater(second["reservations"], 0)
+
+    @patch("booker.bench.logging")
+    @patch("booker.bench.run_bench")
+    def test_compare_profiles(self, run_bench_mock, logging_mock):
+        run_bench_mock.side_effect = [
+            {
+                "profile": "default",
+                "page_load": {"open_date": {"p50": 0.4, "p95": 0.8}},
+            },
+            {
+                "profile": "fast",
+                "page_load": {"open_date": {"p50": 0.1, "p95": 0.2}},
+            },
+        ]
+
+        actual = bench.compare_profiles(["default", "fast"], users=5)
+
+        self.assertEqual(len(actual), 2)
+        run_bench_mock.assert_any_call(profile="fast", users=5)
+        logging_mock.info.assert_any_call(
+            "📊 fast open_date: p50 100.0ms, p95 200.0ms (-75% vs default)"
+        )
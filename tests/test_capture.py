@@ -0,0 +1,152 @@
+import base64
+from unittest import TestCase
+from unittest.mock import MagicMock, call, patch
+
+from booker import capture, metadata
+from booker.capture import By, Screenshot, WebDriverException
+
+
+@patch("booker.capture.config")
+class CaptureTestCase(TestCase):
+    def setUp(self):
+        self.driver = MagicMock()
+        self.driver.execute_script.side_effect = [1200, 3000]
+        self.driver.get_window_size.return_value = {
+            "width": 800,
+            "height": 600,
+        }
+        self.driver.get_screenshot_as_png.return_value = b"window"
+
+    def configure(self, config_mock, mode):
+        config_mock.CAPTURE = mode
+        config_mock.CAPTURE_FORMAT = "png"
+        config_mock.CAPTURE_SCALE = 1.0
+        config_mock.CAPTURE_QUALITY = 80
+
+    def test_capture_window(self, config_mock):
+        self.configure(config_mock, "window")
+
+        actual = capture.capture(self.driver)
+
+        self.assertEqual(actual, Screenshot(data=b"window", format="png"))
+        self.driver.execute_script.assert_has_calls(
+            [
+                call("return document.body.scrollWidth"),
+                call("return document.body.scrollHeight"),
+            ]
+        )
+        self.assertEqual(
+            self.driver.set_window_size.call_args_list,
+            [call(1200, 3000), call(800, 600)],
+        )
+
+    def test_capture_element(self, config_mock):
+        self.configure(config_mock, "element")
+        element = self.driver.find_element.return_value
+        element.screenshot_as_png = b"element"
+
+        actual = capture.capture(self.driver)
+
+        self.assertEqual(actual, Screenshot(data=b"element", format="png"))
+        self.driver.find_element.assert_called_once_with(
+            By.XPATH, metadata.XPATH_APPLICATION_NUMBERS
+        )
+        self.driver.set_window_size.assert_not_called()
+
+    @patch("booker.capture.execute_cdp")
+    def test_capture_page(self, execute_cdp_mock, config_mock):
+        self.configure(config_mock, "page")
+        execute_cdp_mock.side_effect = [
+            {"contentSize": {"width": 1200, "height": 3000}},
+            {"data": base64.b64encode(b"page").decode()},
+        ]
+
+        actual = capture.capture(self.driver, image_format="jpeg", scale=0.5)
+
+        self.assertEqual(actual, Screenshot(data=b"page", format="jpeg"))
+        execute_cdp_mock.assert_called_with(
+            self.driver,
+            "Page.captureScreenshot",
+            {
+                "format": "jpeg",
+                "captureBeyondViewport": True,
+                "clip": {
+                    "x": 0,
+                    "y": 0,
+                    "width": 1200,
+                    "height": 3000,
+                    "scale": 0.5,
+                },
+                "quality": 80,
+            },
+        )
+        self.driver.set_window_size.assert_not_called()
+
+    @patch("booker.capture.logging")
+    @patch("booker.capture.execute_cdp")
+    def test_capture_page_falls_back(
+        self, execute_cdp_mock, logging_mock, config_mock
+    ):
+        self.configure(config_mock, "page")
+        execute_cdp_mock.side_effect = WebDriverException("unknown command")
+
+        actual = capture.capture(self.driver)
+
+        self.assertEqual(actual, Screenshot(data=b"window", format="png"))
+        self.assertEqual(
+            self.driver.set_window_size.call_args_list,
+            [call(1200, 3000), call(800, 600)],
+        )
+        logging_mock.warning.assert_called_once()
+
+    @patch("booker.capture.logging")
+    def test_capture_text(self, logging_mock, config_mock):
+        self.configure(config_mock, "text")
+
+        actual = capture.capture(self.driver)
+
+        self.assertIsNone(actual)
+        self.driver.get_screenshot_as_png.assert_not_called()
+        self.assertIn("0 bytes", logging_mock.info.call_args.args[0])
+
+    def test_capture_unknown(self, config_mock):
+        self.configure(config_mock, "video")
+
+        with self.assertRaises(ValueError):
+            capture.capture(self.driver)
+
+
+class EncodeTestCase(TestCase):
+    def test_encode_png(self):
+        actual = capture.encode(b"png")
+
+        self.assertEqual(actual, Screenshot(data=b"png", format="png"))
+
+    @patch("booker.capture.logging")
+    @patch("booker.capture.Image", None)
+    def test_encode_without_pillow(self, logging_mock):
+        actual = capture.encode(b"png", "webp")
+
+        self.assertEqual(actual, Screenshot(data=b"png", format="png"))
+        logging_mock.warning.assert_called_once_with(
+            "⛔ Pillow is not installed, keeping PNG."
+        )
+
+    @patch("booker.capture.Image")
+    def test_encode_jpeg(self, image_mock):
+        image = image_mock.open.return_value
+        image.width, image.height = 1200, 3000
+        resized = image.resize.return_value
+        converted = resized.convert.return_value
+        converted.save.side_effect = lambda buffer, **kwargs: buffer.write(
+            b"jpeg"
+        )
+
+        actual = capture.encode(b"png", "jpeg", 0.5, 60)
+
+        self.assertEqual(actual, Screenshot(data=b"jpeg", format="jpeg"))
+        image.resize.assert_called_once_with((600, 1500))
+        resized.convert.assert_called_once_with("RGB")
+        self.assertEqual(
+            converted.save.call_args.kwargs, {"format": "JPEG", "quality": 60}
+        )
@@ -0,0 +1,68 @@
+from unittest import TestCase
+
+from booker.document import Document, DocumentError
+
+HTML = """<!DOCTYPE html>
+<html>
+<head><title> 申込み
+  ページ </title></head>
+<body>
+<div>
+  <a class="iconFont is-outIcon" href="/1">5月3日（火・祝）</a>
+  <a class="iconFont" href="/2">5月4日（水・祝）</a>
+  <br/>
+  <a class="is-outIcon iconFont" href="/3">5月5日（木・祝）</a>
+</div>
+<div>
+  <table>
+    <tr><td>name</td><td><input name="name" value="a"></td></tr>
+    <tr><td>tel</td><td><input name="tel"/></td></tr>
+  </table>
+  <p>到達番号：123_456_789_0123<br>
+     問合せ番号：AbCdEf</p>
+  <script>var a = "ignored";</script>
+</div>
+</body>
+</html>
+"""
+
+
+class DocumentTestCase(TestCase):
+    def setUp(self):
+        self.document = Document(HTML)
+
+    def test_title(self):
+        self.assertEqual(self.document.title, "申込み ページ")
+
+    def test_find(self):
+        actual = self.document.find(
+            "/html/body/div[2]/table/tbody/tr[2]/td[2]/input"
+        )
+
+        self.assertEqual(actual.attrs, {"name": "tel"})
+        self.assertEqual(actual.closest("table").tag, "table")
+
+    def test_find_missing(self):
+        actual = self.document.find("/html/body/div[3]/table")
+
+        self.assertIsNone(actual)
+
+    def test_find_unsupported(self):
+        with self.assertRaises(DocumentError):
+            self.document.find("//div[@id='a']")
+
+    def test_select(self):
+        actual = self.document.select("a.iconFont.is-outIcon")
+
+        self.assertEqual(
+            [(e.attrs["href"], e.text) for e in actual],
+            [("/1", "5月3日（火・祝）"), ("/3", "5月5日（木・祝）")],
+        )
+
+    def test_text(self):
+        actual = self.document.find("/html/body/div[2]").text
+
+        self.assertEqual(
+            actual,
+            "name tel 到達番号：123_456_789_0123\n問合せ番号：AbCdEf",
+        )
@@ -0,0 +1,179 @@
+from unittest import TestCase
+from unittest.mock import MagicMock, call, patch
+
+from booker import driver
+
+
+class DriverTestCase(TestCase):
+    def configure(self, config_mock, profile="default"):
+        config_mock.SELENIUM_REMOTE_URL = "http://local.selenium:4444/wd/hub"
+        config_mock.BROWSER_PROFILE = profile
+        config_mock.PAGE_LOAD_STRATEGY = ""
+        config_mock.WINDOW_SIZE = ""
+        config_mock.BLOCKED_URLS = ""
+        config_mock.DRIVER = "remote"
+
+    @patch("booker.driver.block_urls")
+    @patch("booker.driver.webdriver")
+    @patch("booker.driver.config")
+    def test_create_driver(self, config_mock, webdriver_mock, block_urls_mock):
+        self.configure(config_mock)
+        options = webdriver_mock.ChromeOptions.return_value
+
+        actual = driver.create_driver()
+
+        self.assertEqual(actual, webdriver_mock.Remote.return_value)
+        options.add_argument.assert_has_calls(
+            [
+                call("--no-sandbox"),
+                call("--disable-dev-shm-usage"),
+            ]
+        )
+        webdriver_mock.Remote.assert_called_once_with(
+            command_executor="http://local.selenium:4444/wd/hub",
+            desired_capabilities=options.to_capabilities.return_value,
+            options=options,
+        )
+        actual.set_window_size.assert_called_once_with(1200, 900)
+        self.assertEqual(options.page_load_strategy, "normal")
+        options.add_experimental_option.assert_not_called()
+        block_urls_mock.assert_not_called()
+
+    @patch("booker.driver.block_urls")
+    @patch("booker.driver.webdriver")
+    @patch("booker.driver.config")
+    def test_create_driver_fast(
+        self, config_mock, webdriver_mock, block_urls_mock
+    ):
+        self.configure(config_mock, "fast")
+        options = webdriver_mock.ChromeOptions.return_value
+
+        actual = driver.create_driver()
+
+        self.assertEqual(options.page_load_strategy, "eager")
+        options.add_experimental_option.assert_called_once_with(
+            "prefs", {"profile.managed_default_content_settings.images": 2}
+        )
+        actual.set_window_size.assert_called_once_with(800, 600)
+        block_urls_mock.assert_called_once_with(actual, driver.BLOCKED_URLS)
+
+    @patch("booker.driver.chromedriver_path")
+    @patch("booker.driver.Service")
+    @patch("booker.driver.webdriver")
+    @patch("booker.driver.config")
+    def test_create_driver_local(
+        self, config_mock, webdriver_mock, service_mock, chromedriver_path_mock
+    ):
+        self.configure(config_mock)
+        config_mock.DRIVER = "local"
+        config_mock.CHROME_BINARY = "/usr/bin/chromium"
+        options = webdriver_mock.ChromeOptions.return_value
+
+        actual = driver.create_driver()
+
+        self.assertEqual(actual, webdriver_mock.Chrome.return_value)
+        webdriver_mock.Remote.assert_not_called()
+        options.add_argument.assert_any_call("--headless")
+        self.assertEqual(options.binary_location, "/usr/bin/chromium")
+        service_mock.assert_called_once_with(
+            chromedriver_path_mock.return_value
+        )
+        webdriver_mock.Chrome.assert_called_once_with(
+            service=service_mock.return_value, options=options
+        )
+        actual.set_window_size.assert_called_once_with(1200, 900)
+
+    @patch("booker.driver.ChromeDriverManager")
+    @patch("booker.driver.config")
+    def test_chromedriver_path(self, config_mock, manager_mock):
+        driver.chromedriver_path.cache_clear()
+        self.addCleanup(driver.chromedriver_path.cache_clear)
+        config_mock.CHROMEDRIVER_PATH = None
+
+        actual = driver.chromedriver_path()
+        driver.chromedriver_path()
+
+        self.assertEqual(
+            actual, manager_mock.return_value.install.return_value
+        )
+        manager_mock.return_value.install.assert_called_once_with()
+
+    @patch("booker.driver.ChromeDriverManager")
+    @patch("booker.driver.config")
+    def test_chromedriver_path_configured(self, config_mock, manager_mock):
+        driver.chromedriver_path.cache_clear()
+        self.addCleanup(driver.chromedriver_path.cache_clear)
+        config_mock.CHROMEDRIVER_PATH = "/usr/bin/chromedriver"
+
+        actual = driver.chromedriver_path()
+
+        self.assertEqual(actual, "/usr/bin/chromedriver")
+        manager_mock.assert_not_called()
+
+    @patch("booker.driver.config")
+    def test_browser_profile_overrides(self, config_mock):
+        self.configure(config_mock, "fast")
+        config_mock.PAGE_LOAD_STRATEGY = "none"
+        config_mock.WINDOW_SIZE = "1024x768"
+        config_mock.BLOCKED_URLS = "*ads*,*.woff2"
+
+        actual = driver.browser_profile()
+
+        self.assertEqual(
+            actual,
+            {
+                "page_load_strategy": "none",
+                "block_images": True,
+                "blocked_urls": ["*ads*", "*.woff2"],
+                "window_size": (1024, 768),
+            },
+        )
+        self.assertEqual(driver.PROFILES["fast"]["window_size"], (800, 600))
+
+    @patch("booker.driver.execute_cdp")
+    def test_block_urls(self, execute_cdp_mock):
+        sut = MagicMock()
+
+        driver.block_urls(sut, ["*analytics*"])
+
+        execute_cdp_mock.assert_has_calls(
+            [
+                call(sut, "Network.enable"),
+                call(sut, "Network.setBlockedURLs", {"urls": ["*analytics*"]}),
+            ]
+        )
+
+    @patch("booker.driver.logging")
+    @patch("booker.driver.execute_cdp")
+    def test_block_urls_unsupported(self, execute_cdp_mock, logging_mock):
+        execute_cdp_mock.side_effect = driver.WebDriverException("unknown")
+
+        driver.block_urls(MagicMock(), ["*analytics*"])
+
+        logging_mock.warning.assert_called_once()
+
+    def test_execute_cdp(self):
+        sut = MagicMock()
+
+        actual = driver.execute_cdp(sut, "Page.getLayoutMetrics")
+
+        self.assertEqual(actual, sut.execute_cdp_cmd.return_value)
+        sut.execute_cdp_cmd.assert_called_once_with(
+            "Page.getLayoutMetrics", {}
+        )
+
+    def test_execute_cdp_remote(self):
+        sut = MagicMock(spec=["command_executor", "execute"])
+        sut.command_executor._commands = {}
+
+        actual = driver.execute_cdp(sut, "Page.captureScreenshot", {"a": 1})
+
+        self.assertEqual(actual, sut.execute.return_value["value"])
+        self.assertEqual(
+            sut.command_executor._commands["executeCdpCommand"],
+            ("POST", "/session/$sessionId/goog/cdp/execute"),
+        )
+        sut.execute.assert_called_once_with(
+            "executeCdpCommand",
+            {"cmd": "Page.captureScreenshot", "params": {"a": 1}},
+        )
@@ -1,38 +1,131 @@
+import gzip
+import io as _io
+import json
+import os
+import tempfile
 from unittest import TestCase
-from unittest.mock import MagicMock, call, patch
+from unittest.mock import patch
 
 from booker import io
+from botocore.exceptions import ClientError
+
+USERS = [
+    {"name_kanji": "潜行密用", "date_pattern": "（土,（日,祝）"},
+    {"name_kanji": "潜行密用", "date_pattern": "5月"},
+]
+BODY = "".join(
+    json.dumps(user, ensure_ascii=False) + "\n" for user in USERS
+).encode("utf-8")
 
 
 class IoTestCase(TestCase):
-    @patch("booker.io.json")
+    def setUp(self):
+        io._s3_client.cache_clear()
+
     @patch("booker.io.boto3")
-    @patch("booker.io.urlparse")
-    def test_read_jsonlines_s3(self, urlparse_mock, boto3_mock, json_mock):
+    def test_read_jsonlines_s3(self, boto3_mock):
         from types import GeneratorType
 
-        path = MagicMock(spec=str)
-        o = urlparse_mock.return_value
-        s3 = boto3_mock.resource.return_value
-        bucket = s3.Bucket.return_value
-        obj = bucket.Object.return_value
-        res = obj.get.return_value
-        body = res["Body"].read.return_value.decode.return_value
-        line_1, line_2 = MagicMock(), MagicMock()
-        body.splitlines.return_value = [line_1, line_2]
-        json_mock.loads.side_effect = [{"a": 1, "b": 2}, {"c": 3, "d": 4}]
-        expected = [{"a": 1, "b": 2}, {"c": 3, "d": 4}]
+        s3 = boto3_mock.client.return_value
+        s3.get_object.return_value = {"Body": _io.BytesIO(BODY)}
 
-        actual = io.read_jsonlines_s3(path)
+        actual = io.read_jsonlines("s3://bucket/path/to/users.jsonl")
 
         self.assertIsInstance(actual, GeneratorType)
-        self.assertEqual(list(actual), expected)
-        urlparse_mock.assert_called_once_with(path)
-        boto3_mock.resource.assert_called_once_with(o.scheme)
-        s3.Bucket.assert_called_once_with(o.netloc)
-        bucket.Object.assert_called_once_with(o.path[1:])
-        obj.get.assert_called_once_with()
-        res["Body"].read.assert_called_once_with()
-        res["Body"].read.return_value.decode.assert_called_once_with("utf-8")
-        body.splitlines.assert_called_once_with()
-        json_mock.loads.assert_has_calls([call(line_1), call(line_2)])
+        self.assertEqual(list(actual), USERS)
+        boto3_mock.client.assert_called_once_with("s3")
+        s3.get_object.assert_called_once_with(
+            Bucket="bucket", Key="path/to/users.jsonl"
+        )
+
+    @patch("booker.io.boto3")
+    def test_read_jsonlines_s3_reuses_client(self, boto3_mock):
+        s3 = boto3_mock.client.return_value
+        s3.get_object.side_effect = lambda **kwargs: {
+            "Body": _io.BytesIO(BODY)
+        }
+
+        list(io.read_jsonlines("s3://bucket/a.jsonl"))
+        list(io.read_jsonlines("s3://bucket/b.jsonl"))
+
+        boto3_mock.client.assert_called_once_with("s3")
+        self.assertEqual(s3.get_object.call_count, 2)
+
+    @patch("booker.io.boto3")
+    def test_read_jsonlines_s3_gzip(self, boto3_mock):
+        s3 = boto3_mock.client.return_value
+        s3.get_object.return_value = {"Body": _io.BytesIO(gzip.compress(BODY))}
+
+        actual = io.read_jsonlines("s3://bucket/users.jsonl.gz")
+
+        self.assertEqual(list(actual), USERS)
+
+    @patch("booker.io.CHUNK_SIZE", 7)
+    def test_read_jsonlines_file(self):
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, "users.jsonl")
+            with open(path, "wb") as f:
+                f.write(BODY.rstrip(b"\n") + b"\n\n")
+
+            self.assertEqual(list(io.read_jsonlines(path)), USERS)
+            self.assertEqual(list(io.read_jsonlines(f"file://{path}")), USERS)
+
+    @patch("booker.io.CHUNK_SIZE", 7)
+    def test_read_jsonlines_file_gzip(self):
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, "users.jsonl.gz")
+            with open(path, "wb") as f:
+                f.write(gzip.compress(BODY))
+
+            actual = io.read_jsonlines(f"file://{path}")
+
+            self.assertEqual(list(actual), USERS)
+
+    def test_read_jsonlines_streams(self):
+        stream = _io.BytesIO(BODY + b"not json\n")
+
+        with patch("booker.io.open_stream", return_value=stream):
+            actual = io.read_jsonlines("s3://bucket/users.jsonl")
+
+            self.assertEqual(next(actual), USERS[0])
+            self.assertEqual(next(actual), USERS[1])
+            with self.assertRaises(json.JSONDecodeError):
+                next(actual)
+        self.assertTrue(stream.closed)
+
+    @patch("booker.io.boto3")
+    def test_get_s3_object_if_none_match(self, boto3_mock):
+        s3 = boto3_mock.client.return_value
+
+        actual = io.get_s3_object("s3://bucket/users.jsonl", '"etag"')
+
+        self.assertEqual(actual, s3.get_object.return_value)
+        s3.get_object.assert_called_once_with(
+            Bucket="bucket", Key="users.jsonl", IfNoneMatch='"etag"'
+        )
+
+    @patch("booker.io.boto3")
+    def test_get_s3_object_not_modified(self, boto3_mock):
+        s3 = boto3_mock.client.return_value
+        s3.get_object.side_effect = ClientError(
+            {"Error": {"Code": "304", "Message": "Not Modified"}}, "GetObject"
+        )
+
+        actual = io.get_s3_object("s3://bucket/users.jsonl", '"etag"')
+
+        self.assertIsNone(actual)
+
+    @patch("booker.io.boto3")
+    def test_get_s3_object_error(self, boto3_mock):
+        s3 = boto3_mock.client.return_value
+        s3.get_object.side_effect = ClientError(
+            {"Error": {"Code": "NoSuchKey", "Message": "Not Found"}},
+            "GetObject",
+        )
+
+        with self.assertRaises(ClientError):
+            io.get_s3_object("s3://bucket/users.jsonl")
+
+    def test_open_stream_unsupported(self):
+        with self.assertRaises(ValueError):
+            io.open_stream("https://example.com/users.jsonl")
@@ -0,0 +1,93 @@
+import os
+import tempfile
+from datetime import date, datetime
+from unittest import TestCase
+from unittest.mock import patch
+
+from booker import ledger
+from booker.ledger import ReservationLedger
+from booker.types import Reservation, User
+
+
+class ReservationLedgerTestCase(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path = os.path.join(self.directory.name, "db", "ledger.sqlite3")
+        self.user = User(
+            name_kanji="潜行密用",
+            name_kana="センコウミツヨウ",
+            telephone="012-345-6789",
+            email="test@example.com",
+            date_pattern="（土,（日",
+        )
+
+    def reservation(self, reserved_date):
+        return Reservation(
+            user=self.user,
+            reserved_date=reserved_date,
+            application_number="123_456_789_0001",
+            inquiry_number="AbCdEf",
+        )
+
+    def test_add(self):
+        sut = ReservationLedger(self.path)
+        self.addCleanup(sut.close)
+        sut.add(self.reservation("5月7日（土）"))
+
+        self.assertTrue(sut.is_booked("test@example.com", "5月7日（土）"))
+        self.assertFalse(sut.is_booked("test@example.com", "5月8日（日）"))
+        self.assertFalse(sut.is_booked("other@example.com", "5月7日（土）"))
+
+    def test_persists(self):
+        sut = ReservationLedger(self.path)
+        sut.add(self.reservation("5月7日（土）"))
+        sut.add(self.reservation("5月7日（土）"))
+        sut.close()
+
+        actual = ReservationLedger(self.path)
+        self.addCleanup(actual.close)
+
+        self.assertTrue(actual.is_booked("test@example.com", "5月7日（土）"))
+        self.assertEqual(len(actual._booked), 1)
+
+    @patch("booker.ledger.parse_reservable_start")
+    def test_compact(self, parse_reservable_start_mock):
+        parse_reservable_start_mock.side_effect = [
+            datetime(2022, 5, 7),
+            datetime(2022, 5, 8),
+        ]
+        sut = ReservationLedger(self.path)
+        self.addCleanup(sut.close)
+        sut.add(self.reservation("5月7日（土）"))
+        sut.add(self.reservation("5月8日（日）"))
+
+        actual = sut.compact(date(2022, 5, 8))
+
+        self.assertEqual(actual, 1)
+        self.assertFalse(sut.is_booked("test@example.com", "5月7日（土）"))
+        self.assertTrue(sut.is_booked("test@example.com", "5月8日（日）"))
+
+
+@patch("booker.ledger.config")
+class ReservationLedgerFactoryTestCase(TestCase):
+    def setUp(self):
+        ledger.reservation_ledger.cache_clear()
+        self.addCleanup(ledger.reservation_ledger.cache_clear)
+
+    def test_disabled(self, config_mock):
+        config_mock.LEDGER_PATH = None
+
+        self.assertIsNone(ledger.reservation_ledger())
+
+    @patch("booker.ledger.ReservationLedger")
+    def test_reservation_ledger(self, ledger_mock, config_mock):
+        config_mock.LEDGER_PATH = "/data/ledger.sqlite3"
+        ledger_mock.return_value.compact.return_value = 0
+
+        actual = ledger.reservation_ledger()
+
+        self.assertEqual(actual, ledger_mock.return_value)
+        self.assertIs(ledger.reservation_ledger(), actual)
+        ledger_mock.assert_called_once_with("/data/ledger.sqlite3")
+        actual.compact.assert_called_once_with()
@@ -0,0 +1,75 @@
+import os
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+
+from booker.listing import ListingFingerprint
+from booker.types import Slot
+
+
+class ListingFingerprintTestCase(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.file = os.path.join(self.directory.name, "listing.json")
+        self.users = [
+            {"email": "a@example.com", "date_pattern": "（土"},
+            {"email": "b@example.com", "date_pattern": "（日"},
+        ]
+        self.slots = [
+            Slot(0, "5月7日（土）", "https://example.com/1", "○"),
+            Slot(1, "5月8日（日）", "https://example.com/2", "○"),
+        ]
+
+    def test_changed_first_run(self):
+        sut = ListingFingerprint(self.users, self.file)
+        sut.load()
+
+        self.assertEqual(sut.changed(self.slots), self.slots)
+
+    def test_changed(self):
+        ListingFingerprint(self.users, self.file).save(self.slots)
+        slots = [
+            Slot(0, "5月7日（土）", "https://example.com/1", "○"),
+            Slot(1, "5月8日（日）", "https://example.com/2", "満"),
+            Slot(2, "5月14日（土）", "https://example.com/3", "○"),
+        ]
+
+        sut = ListingFingerprint(list(reversed(self.users)), self.file)
+        sut.load()
+        actual = sut.changed(slots)
+
+        self.assertEqual(actual, slots[1:])
+
+    def test_changed_unchanged(self):
+        ListingFingerprint(self.users, self.file).save(self.slots)
+
+        sut = ListingFingerprint(self.users, self.file)
+        sut.load()
+
+        self.assertEqual(sut.changed(self.slots), [])
+
+    @patch("booker.listing.config")
+    def test_file_per_shard(self, config_mock):
+        config_mock.CACHE_DIR = self.directory.name
+        config_mock.SHARD_COUNT = 2
+        config_mock.SHARD_INDEX = 0
+        ListingFingerprint(self.users).save(self.slots)
+        config_mock.SHARD_INDEX = 1
+
+        sut = ListingFingerprint(self.users)
+        sut.load()
+
+        self.assertTrue(sut.file.endswith("listing-1-of-2.json"))
+        self.assertEqual(sut.changed(self.slots), self.slots)
+
+    def test_changed_users(self):
+        ListingFingerprint(self.users, self.file).save(self.slots)
+        users = self.users + [
+            {"email": "c@example.com", "date_pattern": "（土"}
+        ]
+
+        sut = ListingFingerprint(users, self.file)
+        sut.load()
+
+        self.assertEqual(sut.changed(self.slots), self.slots)
@@ -2,9 +2,24 @@ from unittest import TestCase
 from unittest.mock import MagicMock, call, patch
 
 import booker
+from booker.tasks import IndexingSlotTask
+from booker.types import Slot
+
+
+def user_kwargs(date_pattern):
+    return {
+        "name_kanji": "",
+        "name_kana": "",
+        "telephone": "",
+        "email": "test@example.com",
+        "date_pattern": date_pattern,
+    }
 
 
 class BookerMainTestCase(TestCase):
+    @patch("booker.SlackNotifier")
+    @patch("booker.IndexingSlotTask")
+    @patch("booker.SessionPool")
     @patch("booker.do_tasks")
     @patch("booker.LoadingUserTask")
     @patch("booker.CheckingConnectionTask")
@@ -13,9 +28,12 @@ class BookerMainTestCase(TestCase):
         checking_connection_task_mock,
         loading_user_task_mock,
         do_tasks_mock,
+        session_pool_mock,
+        indexing_slot_task_mock,
+        notifier_mock,
     ):
         checking_connection_task_mock.return_value.is_connectable = True
-        user_kwargs_1, user_kwargs_2 = MagicMock(), MagicMock()
+        user_kwargs_1, user_kwargs_2 = user_kwargs("（土"), user_kwargs("（日")
         loading_user_task_mock.return_value.users = [
             user_kwargs_1,
             user_kwargs_2,
@@ -28,9 +46,234 @@ class BookerMainTestCase(TestCase):
         checking_connection_task_mock.return_value.assert_called_once_with()
         loading_user_task_mock.assert_called_once_with()
         loading_user_task_mock.return_value.assert_called_once_with()
+        session_pool_mock.assert_called_once_with(size=1)
+        session_pool = session_pool_mock.return_value
+        session_pool.start.assert_called_once_with(lazy=False)
+        indexing_slot_task_mock.assert_called_once_with(
+            session_pool,
+            [user_kwargs_1["date_pattern"], user_kwargs_2["date_pattern"]],
+            None,
+        )
+        indexing_slot_task = indexing_slot_task_mock.return_value
+        indexing_slot_task.assert_called_once_with()
+        notifier = notifier_mock.return_value
         do_tasks_mock.assert_has_calls(
-            [call(user_kwargs_1), call(user_kwargs_2)]
+            [
+                call(
+                    user_kwargs_1, session_pool, indexing_slot_task, notifier
+                ),
+                call(
+                    user_kwargs_2, session_pool, indexing_slot_task, notifier
+                ),
+            ]
+        )
+        session_pool.close.assert_called_once_with()
+        notifier.close.assert_called_once_with()
+
+    @patch("booker.SlackNotifier", MagicMock())
+    @patch("booker.report")
+    @patch("booker.IndexingSlotTask")
+    @patch("booker.SessionPool")
+    @patch("booker.ThreadPoolExecutor")
+    @patch("booker.LoadingUserTask")
+    @patch("booker.CheckingConnectionTask")
+    def test_main_workers(
+        self,
+        checking_connection_task_mock,
+        loading_user_task_mock,
+        executor_mock,
+        session_pool_mock,
+        indexing_slot_task_mock,
+        report_mock,
+    ):
+        checking_connection_task_mock.return_value.is_connectable = True
+        executor = executor_mock.return_value.__enter__.return_value
+        executor.map.return_value = iter([("a", 1.0, True, [])])
+
+        actual = booker.main(workers=4)
+
+        self.assertIsNone(actual)
+        executor_mock.assert_called_once_with(
+            max_workers=4, thread_name_prefix="booker"
+        )
+        session_pool_mock.assert_called_once_with(size=4)
+        executor.map.assert_called_once()
+        self.assertEqual(
+            executor.map.call_args.args[:2],
+            (
+                booker.run_tasks,
+                list(loading_user_task_mock.return_value.users),
+            ),
+        )
+        report_mock.assert_called_once()
+        self.assertEqual(report_mock.call_args.args[0], [("a", 1.0, True, [])])
+
+    @patch("booker.SlackNotifier")
+    @patch("booker.report")
+    @patch("booker.do_tasks")
+    @patch("booker.IndexingSlotTask")
+    @patch("booker.SessionPool")
+    @patch("booker.LoadingUserTask")
+    @patch("booker.CheckingConnectionTask")
+    @patch("booker.config")
+    def test_main_http_engine(
+        self,
+        config_mock,
+        checking_connection_task_mock,
+        loading_user_task_mock,
+        session_pool_mock,
+        indexing_slot_task_mock,
+        do_tasks_mock,
+        report_mock,
+        notifier_mock,
+    ):
+        config_mock.ENGINE = "http"
+        config_mock.WORKERS = 1
+        config_mock.SNIPE = False
+        config_mock.INCREMENTAL = False
+        config_mock.SHARD_INDEX = 0
+        config_mock.SHARD_COUNT = 1
+        users = [
+            user_kwargs("（土"),
+            {"email": "test@example.com"},
+            user_kwargs(None),
+        ]
+        loading_user_task_mock.return_value.users = users
+
+        actual = booker.main()
+
+        self.assertIsNone(actual)
+        checking_connection_task_mock.assert_not_called()
+        session_pool_mock.assert_not_called()
+        indexing_slot_task_mock.assert_called_once_with(None, ["（土"], None)
+        do_tasks_mock.assert_any_call(
+            users[0],
+            None,
+            indexing_slot_task_mock.return_value,
+            notifier_mock.return_value,
         )
+        self.assertEqual(do_tasks_mock.call_count, 3)
+
+    @patch("booker.SlackNotifier", MagicMock())
+    @patch("booker.report", MagicMock())
+    @patch("booker.do_tasks", MagicMock())
+    @patch("booker.IndexingSlotTask", MagicMock())
+    @patch("booker.SessionPool")
+    @patch("booker.LoadingUserTask")
+    @patch("booker.CheckingConnectionTask")
+    @patch("booker.config")
+    def test_main_local_driver(
+        self,
+        config_mock,
+        checking_connection_task_mock,
+        loading_user_task_mock,
+        session_pool_mock,
+    ):
+        config_mock.ENGINE = "selenium"
+        config_mock.DRIVER = "local"
+        config_mock.WORKERS = 2
+        config_mock.SNIPE = False
+        config_mock.INCREMENTAL = False
+        config_mock.SHARD_INDEX = 0
+        config_mock.SHARD_COUNT = 1
+        loading_user_task_mock.return_value.users = [MagicMock()]
+
+        actual = booker.main()
+
+        self.assertIsNone(actual)
+        checking_connection_task_mock.assert_not_called()
+        session_pool_mock.assert_called_once_with(size=2)
+
+    @patch("booker.SlackNotifier", MagicMock())
+    @patch("booker.report")
+    @patch("booker.do_tasks")
+    @patch("booker.IndexingSlotTask")
+    @patch("booker.ListingFingerprint")
+    @patch("booker.SessionPool")
+    @patch("booker.LoadingUserTask")
+    @patch("booker.CheckingConnectionTask", MagicMock())
+    @patch("booker.config")
+    def test_main_incremental_unchanged(
+        self,
+        config_mock,
+        loading_user_task_mock,
+        session_pool_mock,
+        fingerprint_mock,
+        indexing_slot_task_mock,
+        do_tasks_mock,
+        report_mock,
+    ):
+        config_mock.ENGINE = "selenium"
+        config_mock.DRIVER = "remote"
+        config_mock.WORKERS = 2
+        config_mock.SNIPE = False
+        config_mock.INCREMENTAL = True
+        config_mock.SHARD_INDEX = 0
+        config_mock.SHARD_COUNT = 1
+        users = [user_kwargs("（土")]
+        loading_user_task_mock.return_value.users = users
+        indexing_slot_task_mock.return_value.slots = []
+
+        actual = booker.main()
+
+        self.assertIsNone(actual)
+        session_pool = session_pool_mock.return_value
+        session_pool.start.assert_called_once_with(lazy=True)
+        fingerprint_mock.assert_called_once_with(users)
+        fingerprint = fingerprint_mock.return_value
+        fingerprint.load.assert_called_once_with()
+        indexing_slot_task_mock.assert_called_once_with(
+            session_pool, ["（土"], fingerprint
+        )
+        do_tasks_mock.assert_not_called()
+        report_mock.assert_not_called()
+        fingerprint.save.assert_not_called()
+        session_pool.close.assert_called_once_with()
+
+    def test_save_fingerprint(self):
+        users = [
+            {
+                "name_kanji": "潜行密用",
+                "name_kana": "センコウミツヨウ",
+                "telephone": "012-345-6789",
+                "email": email,
+                "date_pattern": date_pattern,
+            }
+            for email, date_pattern in [
+                ("a@example.com", "7日"),
+                ("b@example.com", "8日"),
+                ("c@example.com", "9日"),
+            ]
+        ]
+        slots = [
+            Slot(0, "5月7日", "https://example.com/1"),
+            Slot(1, "5月8日", "https://example.com/2"),
+            Slot(2, "5月9日", "https://example.com/3"),
+            Slot(3, "5月10日", "https://example.com/4"),
+        ]
+        indexing_slot_task = IndexingSlotTask(None)
+        indexing_slot_task.listing = slots
+        indexing_slot_task.slots = slots
+        indexing_slot_task.retry(["5月10日"])
+        reservation = MagicMock()
+        reservation.user.email = "a@example.com"
+        reservation.reserved_date = "5月7日"
+        fingerprint = MagicMock()
+
+        actual = booker.save_fingerprint(
+            fingerprint,
+            indexing_slot_task,
+            users,
+            [
+                ("a@example.com", 1, True, [reservation]),
+                ("b@example.com", 1, True, []),
+                ("c@example.com", 1, False, []),
+            ],
+        )
+
+        self.assertIsNone(actual)
+        # failed users and timed out dates are retried, full ones are settled
+        fingerprint.save.assert_called_once_with([slots[0], slots[1]])
 
     @patch("booker.CheckingConnectionTask")
     def test_main_checking_connection_false(
@@ -54,16 +297,306 @@ class BookerMainTestCase(TestCase):
         user_type_mock,
     ):
         user_kwargs = MagicMock()
+        session_pool = MagicMock()
+        indexing_slot_task = MagicMock()
+        notifier = MagicMock()
 
-        actual = booker.do_tasks(user_kwargs)
+        actual = booker.do_tasks(
+            user_kwargs, session_pool, indexing_slot_task, notifier
+        )
 
-        self.assertIsNone(actual)
+        self.assertEqual(
+            actual, reservation_task_mock.return_value.reservations
+        )
         user_type_mock.assert_called_once_with(**user_kwargs)
-        reservation_task_mock.assert_called_once_with(
+        indexing_slot_task.slots_for.assert_called_once_with(
             user_type_mock.return_value
         )
+        reservation_task_mock.assert_called_once_with(
+            user_type_mock.return_value,
+            session_pool,
+            indexing_slot_task.slots_for.return_value,
+        )
         reservation_task_mock.return_value.assert_called_once_with()
+        indexing_slot_task.retry.assert_called_once_with(
+            reservation_task_mock.return_value.failed_dates
+        )
         notification_task_mock.assert_called_once_with(
-            reservation_task_mock.return_value.reservations
+            reservation_task_mock.return_value.reservations, notifier
         )
         notification_task_mock.return_value.assert_called_once_with()
+
+    @patch("booker.do_tasks")
+    def test_run_tasks(self, do_tasks_mock):
+        user_kwargs = {"email": "test@example.com"}
+
+        tag, elapsed, succeeded, reservations = booker.run_tasks(user_kwargs)
+
+        self.assertEqual(tag, "test@example.com")
+        self.assertGreaterEqual(elapsed, 0)
+        self.assertTrue(succeeded)
+        self.assertEqual(reservations, do_tasks_mock.return_value)
+        do_tasks_mock.assert_called_once_with(user_kwargs, None, None, None)
+
+    @patch("booker.logging")
+    @patch("booker.do_tasks")
+    def test_run_tasks_failed(self, do_tasks_mock, logging_mock):
+        user_kwargs = {"email": "test@example.com"}
+        do_tasks_mock.side_effect = RuntimeError
+
+        tag, elapsed, succeeded, reservations = booker.run_tasks(user_kwargs)
+
+        self.assertEqual(tag, "test@example.com")
+        self.assertFalse(succeeded)
+        self.assertEqual(reservations, [])
+        logging_mock.exception.assert_called_once_with(
+            "🚨 Failed to process test@example.com!"
+        )
+
+    @patch("booker.logging")
+    def test_report(self, logging_mock):
+        results = [
+            ("a@example.com", 1.5, True, [MagicMock()]),
+            ("b@example.com", 2, False, []),
+        ]
+
+        actual = booker.report(results, 3.5)
+
+        self.assertIsNone(actual)
+        logging_mock.info.assert_has_calls(
+            [
+                call("📊 Processed 2 users in 3.50s."),
+                call("✅ a@example.com: 1.50s, 1 reservations"),
+                call("🚨 b@example.com: 2.00s, 0 reservations"),
+            ]
+        )
+
+    @patch("booker.logging")
+    @patch("booker.unavailable_dates")
+    def test_report_unavailable_dates(
+        self, unavailable_dates_mock, logging_mock
+    ):
+        unavailable_dates_mock.return_value.hits = 3
+        unavailable_dates_mock.return_value.misses = 2
+
+        actual = booker.report_unavailable_dates()
+
+        self.assertIsNone(actual)
+        logging_mock.info.assert_called_once_with(
+            "🈵 Unavailable dates cache: 3 hits, 2 misses, saved 3 page loads."
+        )
+
+    @patch("booker.logging")
+    @patch("booker.unavailable_dates", MagicMock(return_value=None))
+    def test_report_unavailable_dates_disabled(self, logging_mock):
+        booker.report_unavailable_dates()
+
+        logging_mock.info.assert_not_called()
+
+    @patch("booker.logging")
+    def test_report_gaps(self, logging_mock):
+        sniper = MagicMock()
+        sniper.gap.side_effect = lambda at: at - 100
+        results = [
+            ("a", 1, True, [MagicMock(submitted_at=100.25)]),
+            ("b", 1, True, [MagicMock(submitted_at=None)]),
+            ("c", 1, True, [MagicMock(submitted_at=100.5)]),
+        ]
+
+        actual = booker.report_gaps(sniper, results)
+
+        self.assertIsNone(actual)
+        logging_mock.info.assert_called_once_with(
+            "🎯 Submitted 2 reservations +0.250s to +0.500s from opening."
+        )
+
+    @patch("booker.Sniper")
+    @patch("booker.parse_reservable_start")
+    @patch("booker.config")
+    def test_snipe(
+        self, config_mock, parse_reservable_start_mock, sniper_mock
+    ):
+        indexing_slot_task = MagicMock()
+        indexing_slot_task.slots = []
+        session_pool = MagicMock()
+
+        actual = booker.snipe(indexing_slot_task, session_pool)
+
+        self.assertEqual(actual, sniper_mock.return_value)
+        parse_reservable_start_mock.assert_called_once_with(
+            indexing_slot_task.reservable_start
+        )
+        sniper_mock.assert_called_once_with(
+            parse_reservable_start_mock.return_value,
+            config_mock.SNIPE_LEAD_TIME,
+        )
+        sniper_mock.return_value.wait.assert_called_once_with(
+            keepalive=session_pool.keep_alive
+        )
+        indexing_slot_task.assert_called_once_with()
+
+    @patch("booker.unavailable_dates")
+    @patch("booker.Sniper")
+    @patch("booker.parse_reservable_start", MagicMock())
+    @patch("booker.config", MagicMock())
+    def test_snipe_unavailable_dates(
+        self, sniper_mock, unavailable_dates_mock
+    ):
+        booker.snipe(MagicMock())
+
+        self.assertEqual(
+            unavailable_dates_mock.return_value.not_before,
+            sniper_mock.return_value.opening,
+        )
+
+    @patch("booker.logging")
+    @patch("booker.Sniper")
+    @patch("booker.parse_reservable_start")
+    def test_snipe_without_reservable_start(
+        self, parse_reservable_start_mock, sniper_mock, logging_mock
+    ):
+        indexing_slot_task = MagicMock()
+        parse_reservable_start_mock.return_value = None
+
+        actual = booker.snipe(indexing_slot_task)
+
+        self.assertIsNone(actual)
+        sniper_mock.assert_not_called()
+        logging_mock.warning.assert_called_once_with(
+            "⛔ Reservable start date not found, firing now."
+        )
+
+    @patch("booker.logging")
+    @patch("booker.main")
+    def test_cli(self, main_mock, logging_mock):
+        with patch("sys.argv", ["booker", "--workers", "3"]):
+            actual = booker.cli()
+
+        self.assertIsNone(actual)
+        main_mock.assert_called_once_with(workers=3)
+
+    @patch("booker.logging")
+    @patch("booker.compare_profiles")
+    def test_cli_bench_profiles(self, compare_profiles_mock, logging_mock):
+        argv = ["booker", "bench", "--profiles", "default,fast"]
+        with patch("sys.argv", argv):
+            booker.cli()
+
+        compare_profiles_mock.assert_called_once()
+        self.assertEqual(
+            compare_profiles_mock.call_args.args, (["default", "fast"],)
+        )
+
+    @patch("booker.logging")
+    @patch("booker.run_bench")
+    @patch("booker.main")
+    def test_cli_bench(self, main_mock, run_bench_mock, logging_mock):
+        argv = ["booker", "--workers", "2", "bench", "--users", "50"]
+        with patch("sys.argv", argv + ["--latency", "0.1"]):
+            actual = booker.cli()
+
+        self.assertIsNone(actual)
+        main_mock.assert_not_called()
+        run_bench_mock.assert_called_once_with(
+            users=50,
+            dates=30,
+            capacity=None,
+            latency=0.1,
+            asset_latency=0.0,
+            workers=2,
+            host="127.0.0.1",
+            public_host=None,
+            output=None,
+        )
+
+    @patch("booker.User")
+    @patch("booker.ReservationTask")
+    @patch("booker.HttpReservationTask")
+    @patch("booker.NotificationTask")
+    @patch("booker.config")
+    def test_do_tasks_http_engine(
+        self,
+        config_mock,
+        notification_task_mock,
+        http_reservation_task_mock,
+        reservation_task_mock,
+        user_type_mock,
+    ):
+        config_mock.ENGINE = "http"
+        user_kwargs = MagicMock()
+
+        actual = booker.do_tasks(user_kwargs)
+
+        self.assertEqual(
+            actual, http_reservation_task_mock.return_value.reservations
+        )
+        reservation_task_mock.assert_not_called()
+        http_reservation_task_mock.assert_called_once_with(
+            user_type_mock.return_value, None, None
+        )
+        http_reservation_task_mock.return_value.assert_called_once_with()
+        notification_task_mock.assert_called_once_with(
+            http_reservation_task_mock.return_value.reservations, None
+        )
+
+    @patch("booker.User")
+    @patch("booker.ReservationTask")
+    @patch("booker.NotificationTask")
+    @patch("booker.config")
+    def test_do_tasks_digest(
+        self,
+        config_mock,
+        notification_task_mock,
+        reservation_task_mock,
+        user_type_mock,
+    ):
+        config_mock.ENGINE = "selenium"
+        config_mock.NOTIFICATION_MODE = "digest"
+
+        actual = booker.do_tasks(MagicMock())
+
+        self.assertEqual(
+            actual, reservation_task_mock.return_value.reservations
+        )
+        notification_task_mock.assert_not_called()
+
+    @patch("booker.SlackNotifier")
+    @patch("booker.DigestNotificationTask")
+    @patch("booker.report")
+    @patch("booker.run_tasks")
+    @patch("booker.IndexingSlotTask")
+    @patch("booker.LoadingUserTask")
+    @patch("booker.config")
+    def test_main_digest(
+        self,
+        config_mock,
+        loading_user_task_mock,
+        indexing_slot_task_mock,
+        run_tasks_mock,
+        report_mock,
+        digest_notification_task_mock,
+        notifier_mock,
+    ):
+        config_mock.ENGINE = "http"
+        config_mock.WORKERS = 1
+        config_mock.SNIPE = False
+        config_mock.INCREMENTAL = False
+        config_mock.SHARD_INDEX = 0
+        config_mock.SHARD_COUNT = 1
+        config_mock.NOTIFICATION_MODE = "digest"
+        loading_user_task_mock.return_value.users = [
+            {"date_pattern": ""},
+            {"date_pattern": ""},
+        ]
+        run_tasks_mock.side_effect = [
+            ("a", 1.0, True, ["r1", "r2"]),
+            ("b", 1.0, True, ["r3"]),
+        ]
+
+        booker.main()
+
+        digest_notification_task_mock.assert_called_once_with(
+            ["r1", "r2", "r3"], notifier_mock.return_value
+        )
+        digest_notification_task_mock.return_value.assert_called_once_with()
+        notifier_mock.return_value.close.assert_called_once_with()
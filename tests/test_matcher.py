@@ -0,0 +1,59 @@
+import pytest
+from booker.matcher import DatePatternMatcher
+
+DATES = [
+    "5月3日（火・祝）",
+    "5月4日（水・祝）",
+    "5月5日（木・祝）",
+    "5月6日（金）",
+    "5月7日（土）",
+    "5月8日（日）",
+    "5月9日（月）",
+]
+
+
+@pytest.mark.parametrize(
+    "date_patterns",
+    [
+        ["（土,（日,祝）"],
+        ["（土,（日,祝）", "5月6日", "（月）,（金）"],
+        ["5月", "月", "5月7日（土）,5月8日"],
+        ["aaa", "（火", "祝"],
+        ["", "（土,,（日"],
+    ],
+)
+def test_match(date_patterns):
+    expected = []
+    for date in DATES:
+        keys = {
+            key
+            for key, date_pattern in enumerate(date_patterns)
+            for pattern in date_pattern.split(",")
+            if pattern in date
+        }
+        if keys:
+            expected.append((date, keys))
+
+    sut = DatePatternMatcher()
+    for key, date_pattern in enumerate(date_patterns):
+        sut.add(key, date_pattern)
+    sut.build()
+    actual = list(sut.match(DATES))
+
+    assert actual == expected
+
+
+def test_match_overlapping_patterns():
+    sut = DatePatternMatcher()
+    sut.add("a", "abcd")
+    sut.add("b", "bc")
+    sut.add("c", "bcx")
+    sut.build()
+
+    actual = list(sut.match(["xabcx", "abcd", "bcy"]))
+
+    assert actual == [
+        ("xabcx", {"b", "c"}),
+        ("abcd", {"a", "b"}),
+        ("bcy", {"b"}),
+    ]
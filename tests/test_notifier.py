@@ -0,0 +1,79 @@
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+from booker import config
+from booker.notifier import MAX_ATTEMPTS, SlackNotifier
+
+
+def response(status_code=200, ok=True, headers=None):
+    r = MagicMock()
+    r.status_code = status_code
+    r.ok = status_code < 400
+    r.headers = headers or {}
+    r.json.return_value = {"ok": ok}
+    return r
+
+
+@patch("booker.notifier.create_http_session")
+class SlackNotifierTestCase(TestCase):
+    def test_post(self, create_http_session_mock):
+        session = create_http_session_mock.return_value
+        session.post.return_value = response()
+
+        sut = SlackNotifier(concurrency=1)
+        actual = sut.post("chat.postMessage", params={"text": "hi"})
+        sut.close()
+
+        self.assertEqual(actual, session.post.return_value)
+        session.post.assert_called_once_with(
+            f"{config.SLACK_API_URL}/chat.postMessage",
+            timeout=config.HTTP_TIMEOUT,
+            params={"text": "hi"},
+        )
+
+    @patch("booker.notifier.sleep")
+    def test_post_rate_limited(self, sleep_mock, create_http_session_mock):
+        session = create_http_session_mock.return_value
+        session.post.side_effect = [
+            response(429, headers={"Retry-After": "2"}),
+            response(),
+        ]
+
+        sut = SlackNotifier(concurrency=1)
+        with patch("booker.notifier.monotonic", side_effect=[0, 0, 0, 2]):
+            actual = sut.post("files.upload", files={"file": b"png"})
+        sut.close()
+
+        self.assertTrue(actual.ok)
+        self.assertEqual(session.post.call_count, 2)
+        sleep_mock.assert_called_once_with(2.0)
+
+    @patch("booker.notifier.logging")
+    @patch("booker.notifier.sleep", MagicMock())
+    def test_post_gives_up(self, logging_mock, create_http_session_mock):
+        session = create_http_session_mock.return_value
+        session.post.return_value = response(429, headers={"Retry-After": "0"})
+
+        sut = SlackNotifier(concurrency=1)
+        sut.post("chat.postMessage")
+        sut.close()
+
+        self.assertEqual(session.post.call_count, MAX_ATTEMPTS)
+        logging_mock.error.assert_called_once_with(
+            "🚨 Gave up calling chat.postMessage after retries!"
+        )
+
+    @patch("booker.notifier.logging")
+    def test_close(self, logging_mock, create_http_session_mock):
+        done = MagicMock()
+
+        sut = SlackNotifier(concurrency=2)
+        sut.submit(done, 1)
+        sut.submit(MagicMock(side_effect=RuntimeError))
+        sut.close()
+
+        done.assert_called_once_with(1)
+        logging_mock.error.assert_called_once()
+        self.assertEqual(
+            logging_mock.error.call_args.args, ("🚨 Failed to notify!",)
+        )
@@ -0,0 +1,153 @@
+import json
+import os
+import tempfile
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+from booker import recorder
+from booker.recorder import (
+    BudgetExceeded,
+    CommandRecorder,
+    ReplayMismatch,
+    load_commands,
+    replay_driver,
+)
+from booker.tracing import tagged
+
+
+class CommandRecorderTestCase(TestCase):
+    def setUp(self):
+        self.driver = MagicMock()
+        self.execute = self.driver.command_executor.execute
+        self.execute.return_value = {"value": "申込み"}
+
+    def test_attach(self):
+        sut = CommandRecorder()
+        driver = sut.attach(self.driver)
+
+        with tagged(user="test@example.com", date="5月7日（土）"):
+            actual = driver.command_executor.execute(
+                "getTitle", {"sessionId": "s"}
+            )
+
+        self.assertEqual(actual, {"value": "申込み"})
+        self.execute.assert_called_once_with("getTitle", {"sessionId": "s"})
+        (entry,) = sut.commands
+        self.assertEqual(entry["command"], "getTitle")
+        self.assertEqual(entry["user"], "test@example.com")
+        self.assertEqual(entry["date"], "5月7日（土）")
+        self.assertEqual(entry["request_bytes"], len('{"sessionId": "s"}'))
+        self.assertEqual(
+            entry["response_bytes"], len('{"value": "申込み"}'.encode())
+        )
+        self.assertGreaterEqual(entry["duration"], 0)
+
+    def test_summarize(self):
+        sut = CommandRecorder()
+        driver = sut.attach(self.driver)
+
+        with tagged(user="a@example.com"):
+            driver.command_executor.execute("get", {})
+            for date, count in [("5月7日（土）", 3), ("5月8日（日）", 2)]:
+                with tagged(date=date):
+                    for _ in range(count):
+                        driver.command_executor.execute("getTitle", {})
+        actual = sut.summarize()
+
+        self.assertEqual(actual["commands"], 6)
+        self.assertEqual(actual["by_command"], {"getTitle": 5, "get": 1})
+        self.assertEqual(actual["by_user"], {"a@example.com": 6})
+        self.assertEqual(
+            actual["by_reservation"],
+            [
+                {
+                    "user": "a@example.com",
+                    "date": "5月7日（土）",
+                    "commands": 3,
+                },
+                {
+                    "user": "a@example.com",
+                    "date": "5月8日（日）",
+                    "commands": 2,
+                },
+            ],
+        )
+        self.assertEqual(
+            sut.over_budget(2),
+            [{"user": "a@example.com", "date": "5月7日（土）", "commands": 3}],
+        )
+        sut.assert_budget(3)
+        with self.assertRaises(BudgetExceeded):
+            sut.assert_budget(2)
+
+    def test_save_and_replay(self):
+        commands = [
+            {"command": "get", "response": {"value": None}},
+            {"command": "getTitle", "response": {"value": "申込み"}},
+        ]
+        sut = CommandRecorder()
+        driver = sut.attach(replay_driver(commands))
+        driver.get("https://example.com/dates/1")
+        self.assertEqual(driver.title, "申込み")
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "commands.jsonl")
+            sut.save(path)
+            recorded = load_commands(path)
+
+        self.assertEqual(
+            [entry["command"] for entry in recorded], ["get", "getTitle"]
+        )
+        replayed = replay_driver(recorded)
+        replayed.get("https://example.com/dates/1")
+        self.assertEqual(replayed.title, "申込み")
+        self.assertEqual(len(replayed.command_executor.commands), 0)
+
+    def test_replay_mismatch(self):
+        driver = replay_driver(
+            [{"command": "getTitle", "response": {"value": "申込み"}}]
+        )
+
+        with self.assertRaises(ReplayMismatch):
+            driver.get("https://example.com/")
+        with self.assertRaises(ReplayMismatch):
+            driver.current_url
+
+
+@patch("booker.recorder.config")
+class RecordingTestCase(TestCase):
+    def setUp(self):
+        recorder.command_recorder.cache_clear()
+        self.addCleanup(recorder.command_recorder.cache_clear)
+
+    def test_record_driver_disabled(self, config_mock):
+        config_mock.RECORD = False
+        driver = MagicMock()
+        execute = driver.command_executor.execute
+
+        actual = recorder.record_driver(driver)
+
+        self.assertIs(actual.command_executor.execute, execute)
+        self.assertTrue(recorder.finish_recording())
+
+    @patch("booker.recorder.logging")
+    def test_finish_recording(self, logging_mock, config_mock):
+        config_mock.RECORD = True
+        config_mock.COMMAND_BUDGET = 1
+        driver = MagicMock()
+        driver.command_executor.execute.return_value = {"value": None}
+        driver = recorder.record_driver(driver)
+        with tagged(user="a@example.com", date="5月7日（土）"):
+            driver.command_executor.execute("get", {})
+            driver.command_executor.execute("getTitle", {})
+
+        with tempfile.TemporaryDirectory() as directory:
+            config_mock.RECORD_FILE = os.path.join(directory, "c.jsonl")
+            actual = recorder.finish_recording()
+
+            with open(config_mock.RECORD_FILE, encoding="utf-8") as f:
+                lines = [json.loads(line) for line in f]
+
+        self.assertFalse(actual)
+        self.assertEqual(len(lines), 2)
+        logging_mock.error.assert_called_once()
@@ -0,0 +1,86 @@
+from datetime import datetime, timedelta
+from time import perf_counter
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+import pytest
+from booker.scheduler import JST, Sniper, parse_reservable_start
+
+NOW = datetime(2022, 4, 20, 12, 0, tzinfo=JST)
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("2022年5月1日 10:00", datetime(2022, 5, 1, 10, 0, tzinfo=JST)),
+        (
+            "2022年5月1日（日）10時30分から",
+            datetime(2022, 5, 1, 10, 30, tzinfo=JST),
+        ),
+        ("5月1日（日） 9：05～", datetime(2022, 5, 1, 9, 5, tzinfo=JST)),
+        ("5月1日（日）", datetime(2022, 5, 1, 0, 0, tzinfo=JST)),
+        ("受付中", None),
+        (None, None),
+    ],
+)
+def test_parse_reservable_start(text, expected):
+    actual = parse_reservable_start(text, now=NOW)
+
+    assert actual == expected
+
+
+def test_parse_reservable_start_new_year():
+    now = datetime(2022, 12, 20, 12, 0, tzinfo=JST)
+
+    actual = parse_reservable_start("1月4日 10:00", now=now)
+
+    assert actual == datetime(2023, 1, 4, 10, 0, tzinfo=JST)
+
+
+class SniperTestCase(TestCase):
+    def test_wait(self):
+        opens_at = datetime.now(JST) + timedelta(seconds=0.1)
+
+        sut = Sniper(opens_at)
+        actual = sut.wait()
+
+        self.assertGreaterEqual(actual, 0)
+        self.assertLess(actual, 0.05)
+
+    def test_wait_lead_time(self):
+        opens_at = datetime.now(JST) + timedelta(seconds=0.1)
+
+        sut = Sniper(opens_at, lead_time=0.05)
+        actual = sut.wait()
+
+        self.assertGreaterEqual(actual, -0.05)
+        self.assertLess(actual, 0)
+
+    @patch("booker.scheduler.KEEPALIVE_MARGIN", 0.1)
+    @patch("booker.scheduler.KEEPALIVE_INTERVAL", 0.1)
+    def test_wait_keepalive(self):
+        opens_at = datetime.now(JST) + timedelta(seconds=0.45)
+        keepalive = MagicMock()
+
+        sut = Sniper(opens_at)
+        actual = sut.wait(keepalive=keepalive)
+
+        # pings at about 0.1s, 0.2s and 0.3s, none in the last 0.1s
+        self.assertIn(keepalive.call_count, (2, 3))
+        self.assertLess(actual, 0.05)
+
+    def test_wait_opened(self):
+        opens_at = datetime.now(JST) - timedelta(seconds=10)
+
+        sut = Sniper(opens_at)
+        actual = sut.wait()
+
+        self.assertGreaterEqual(actual, 10)
+
+    def test_gap(self):
+        opens_at = datetime.now(JST) + timedelta(seconds=1)
+
+        sut = Sniper(opens_at)
+        actual = sut.gap(perf_counter() + 1.5)
+
+        self.assertAlmostEqual(actual, 0.5, places=2)
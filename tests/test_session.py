@@ -0,0 +1,169 @@
+from threading import Lock
+from unittest import TestCase
+from unittest.mock import MagicMock, PropertyMock, call
+
+from booker.session import RESET_STORAGE_SCRIPT, SessionPool
+from selenium.common.exceptions import WebDriverException
+from urllib3.exceptions import MaxRetryError
+
+
+class SessionPoolTestCase(TestCase):
+    def setUp(self):
+        self.drivers = []
+
+        def factory():
+            driver = MagicMock()
+            driver.window_handles = ["main"]
+            self.drivers.append(driver)
+            return driver
+
+        self.factory = factory
+
+    def test_start(self):
+        sut = SessionPool(size=3, max_uses=10, factory=self.factory)
+        sut.start()
+
+        self.assertEqual(len(self.drivers), 3)
+        self.assertEqual(sut._idle.qsize(), 3)
+
+    def test_start_failure_quits_created_sessions(self):
+        lock = Lock()
+
+        def factory():
+            with lock:
+                if len(self.drivers) == 1:
+                    self.drivers.append(None)
+                    raise WebDriverException("session not created")
+                return self.factory()
+
+        sut = SessionPool(size=3, max_uses=10, factory=factory)
+        with self.assertRaises(WebDriverException):
+            sut.start()
+
+        created = [driver for driver in self.drivers if driver is not None]
+        self.assertEqual(len(created), 2)
+        for driver in created:
+            driver.quit.assert_called_once_with()
+        self.assertEqual(sut._idle.qsize(), 0)
+
+    def test_start_lazy(self):
+        sut = SessionPool(size=3, max_uses=10, factory=self.factory)
+        sut.start(lazy=True)
+
+        self.assertEqual(self.drivers, [])
+        with sut.lease():
+            pass
+
+        self.assertEqual(len(self.drivers), 1)
+        self.assertEqual(sut._idle.qsize(), 3)
+
+    def test_lease_reuses_session(self):
+        sut = SessionPool(size=1, max_uses=10, factory=self.factory)
+        sut.start()
+
+        with sut.lease() as driver_1:
+            pass
+        with sut.lease() as driver_2:
+            pass
+
+        self.assertIs(driver_1, driver_2)
+        self.assertEqual(len(self.drivers), 1)
+        driver_1.delete_all_cookies.assert_has_calls([call(), call()])
+        driver_1.execute_script.assert_has_calls(
+            [call(RESET_STORAGE_SCRIPT), call(RESET_STORAGE_SCRIPT)]
+        )
+        driver_1.quit.assert_not_called()
+
+    def test_lease_closes_extra_windows(self):
+        sut = SessionPool(size=1, max_uses=10, factory=self.factory)
+        sut.start()
+
+        with sut.lease() as driver:
+            driver.window_handles = ["main", "sub_1", "sub_2"]
+
+        driver.switch_to.window.assert_has_calls(
+            [call("sub_1"), call("sub_2"), call("main")]
+        )
+        self.assertEqual(driver.close.call_count, 2)
+
+    def test_lease_recycles_after_max_uses(self):
+        sut = SessionPool(size=1, max_uses=2, factory=self.factory)
+        sut.start()
+
+        for _ in range(3):
+            with sut.lease():
+                pass
+
+        self.assertEqual(len(self.drivers), 2)
+        self.drivers[0].quit.assert_called_once_with()
+        self.drivers[1].quit.assert_not_called()
+
+    def test_lease_recycles_unhealthy_session(self):
+        sut = SessionPool(size=1, max_uses=10, factory=self.factory)
+        sut.start()
+        type(self.drivers[0]).window_handles = PropertyMock(
+            side_effect=WebDriverException
+        )
+
+        with sut.lease() as driver:
+            pass
+
+        self.assertIs(driver, self.drivers[1])
+        self.drivers[0].quit.assert_called_once_with()
+
+    def test_lease_recycles_unreachable_session(self):
+        sut = SessionPool(size=1, max_uses=10, factory=self.factory)
+        sut.start()
+        type(self.drivers[0]).window_handles = PropertyMock(
+            side_effect=MaxRetryError(None, "/session")
+        )
+        self.drivers[0].quit.side_effect = MaxRetryError(None, "/session")
+
+        with sut.lease() as driver:
+            pass
+
+        self.assertIs(driver, self.drivers[1])
+        self.assertEqual(sut._idle.qsize(), 1)
+
+    def test_release_keeps_size_when_hub_is_gone(self):
+        sut = SessionPool(size=1, max_uses=10, factory=self.factory)
+        sut.start()
+
+        with sut.lease() as driver:
+            driver.delete_all_cookies.side_effect = MaxRetryError(
+                None, "/session"
+            )
+            driver.quit.side_effect = MaxRetryError(None, "/session")
+
+        self.assertEqual(sut._idle.qsize(), 1)
+        with sut.lease() as driver:
+            pass
+        self.assertIs(driver, self.drivers[1])
+
+    def test_keep_alive(self):
+        sut = SessionPool(size=3, max_uses=10, factory=self.factory)
+        sut.start()
+        type(self.drivers[1]).window_handles = PropertyMock(
+            side_effect=MaxRetryError(None, "/session")
+        )
+        sut._idle.get_nowait()
+        sut._idle.put(None)
+
+        sut.keep_alive()
+
+        self.assertEqual(len(self.drivers), 5)
+        self.drivers[1].quit.assert_called_once_with()
+        self.assertEqual(
+            [sut._idle.get_nowait() for _ in range(3)],
+            [self.drivers[3], self.drivers[2], self.drivers[4]],
+        )
+
+    def test_close(self):
+        sut = SessionPool(size=2, max_uses=10, factory=self.factory)
+        sut.start()
+
+        sut.close()
+
+        for driver in self.drivers:
+            driver.quit.assert_called_once_with()
+        self.assertTrue(sut._idle.empty())
@@ -0,0 +1,72 @@
+from collections import Counter
+
+import pytest
+from booker.sharding import shard_users
+
+USERS = [
+    {
+        "name_kanji": f"利用者{i}",
+        "email": f"user{i}@example.com",
+        "date_pattern": ["（土", "（日", "祝）"][i % 3],
+    }
+    for i in range(60)
+]
+
+
+def test_shard_users_single():
+    assert shard_users(USERS, 0, 1) is USERS
+
+
+@pytest.mark.parametrize("index, count", [(2, 2), (-1, 2), (0, 0)])
+def test_shard_users_out_of_range(index, count):
+    with pytest.raises(ValueError):
+        shard_users(USERS, index, count)
+
+
+@pytest.mark.parametrize("placement", ["hash", "date"])
+@pytest.mark.parametrize("count", [2, 3, 7])
+def test_shard_users_partition(placement, count):
+    shards = [
+        list(shard_users(USERS, i, count, placement)) for i in range(count)
+    ]
+
+    emails = [u["email"] for shard in shards for u in shard]
+    assert sorted(emails) == sorted(u["email"] for u in USERS)
+    assert all(shards)
+
+
+@pytest.mark.parametrize("placement", ["hash", "date"])
+def test_shard_users_stable(placement):
+    shuffled = list(reversed(USERS))
+
+    for i in range(3):
+        expected = {u["email"] for u in shard_users(USERS, i, 3, placement)}
+        actual = {u["email"] for u in shard_users(shuffled, i, 3, placement)}
+        assert actual == expected
+
+
+def test_shard_users_date_placement():
+    count = 4
+
+    for i in range(count):
+        shard = shard_users(USERS, i, count, "date")
+        per_pattern = Counter(u["date_pattern"] for u in shard)
+        # 20 users per date pattern spread evenly over 4 shards
+        assert set(per_pattern.values()) == {5}
+
+
+def test_shard_users_date_placement_overlapping_patterns():
+    users = [
+        {"email": f"user{i}@example.com", "date_pattern": date_pattern}
+        for i, date_pattern in enumerate(
+            ["（土", "（土,（日", "（土,祝）", "（土,（日,祝）"]
+        )
+    ]
+
+    for i in range(2):
+        shard = shard_users(users, i, 2, "date")
+        per_pattern = Counter(
+            pattern for u in shard for pattern in u["date_pattern"].split(",")
+        )
+        # all 4 users want Saturdays, whatever else they want
+        assert per_pattern == {"（土": 2, "（日": 1, "祝）": 1}
@@ -1,19 +1,39 @@
+import json
+import os
+import tempfile
+import zipfile
 from datetime import datetime
+from io import BytesIO
 from unittest import TestCase
-from unittest.mock import MagicMock, call, mock_open, patch
+from unittest.mock import ANY, MagicMock, call, patch
 
 import pytest
+import requests
+from booker.availability import UnavailableDates
+from booker.document import Document
+from booker.fakesite import FakeSite
+from booker.ledger import ReservationLedger
 from booker.tasks import (
+    FILLING_FORM_SCRIPT,
+    INDEXING_SLOT_SCRIPT,
     By,
     CheckingConnectionTask,
+    DigestNotificationTask,
+    HttpReservationTask,
+    IndexingSlotTask,
     LoadingUserTask,
     NotificationTask,
     Reservation,
     ReservationTask,
+    Slot,
+    TimeoutException,
     User,
     config,
     metadata,
 )
+from booker.types import Screenshot
+from booker.waits import LatencyStore, StepWaiter
+from selenium.common.exceptions import NoSuchElementException
 
 
 class CheckingConnectionTaskTestCase(TestCase):
@@ -22,6 +42,7 @@ class CheckingConnectionTaskTestCase(TestCase):
     def test__init(self, urlparse_mock, config_mock):
         host, port = MagicMock(), MagicMock()
         urlparse_mock.return_value.netloc.split.return_value = [host, port]
+        config_mock.SELENIUM_REMOTE_URL = "http://local.selenium:4444/wd/hub/"
 
         sut = CheckingConnectionTask()
 
@@ -29,28 +50,51 @@ class CheckingConnectionTaskTestCase(TestCase):
         urlparse_mock.return_value.netloc.split.assert_called_once_with(":")
         self.assertEqual(sut.host, host)
         self.assertEqual(sut.port, port)
+        self.assertEqual(sut.url, "http://local.selenium:4444/wd/hub/status")
         self.assertEqual(sut.is_connectable, False)
+        self.assertIsNone(sut.time_to_ready)
 
+    @patch("booker.tasks.create_http_session")
     @patch("booker.tasks.sleep")
     @patch("booker.tasks.logging")
     @patch("booker.tasks.CheckingConnectionTask._check_connection")
     @patch("booker.tasks.config")
     def test__call_connectable(
-        self, config_mock, check_connection_mock, logging_mock, sleep_mock
+        self,
+        config_mock,
+        check_connection_mock,
+        logging_mock,
+        sleep_mock,
+        create_http_session_mock,
     ):
         config_mock.SELENIUM_REMOTE_URL = "http://local.selenium:4444/wd/hub"
-        check_connection_mock.side_effect = [False, False, False, True]
+        config_mock.READINESS_TIMEOUT = 100
+        check_connection_mock.side_effect = [False] * 6 + [True]
 
         sut = CheckingConnectionTask()
         actual = sut()
 
         self.assertIsNone(actual)
         self.assertTrue(sut.is_connectable)
+        self.assertGreaterEqual(sut.time_to_ready, 0)
+        check_connection_mock.assert_has_calls(
+            [call(create_http_session_mock.return_value)] * 7
+        )
         logging_mock.info.assert_has_calls(
-            [call("Sleeping."), call("Sleeping."), call("Sleeping.")]
+            [
+                call("Sleeping 0.05s."),
+                call("Sleeping 0.10s."),
+                call("Sleeping 0.20s."),
+                call("Sleeping 0.40s."),
+                call("Sleeping 0.80s."),
+                call("Sleeping 1.00s."),
+            ]
+        )
+        sleep_mock.assert_has_calls(
+            [call(0.05), call(0.1), call(0.2), call(0.4), call(0.8), call(1)]
         )
-        sleep_mock.assert_has_calls([call(1), call(1), call(1)])
 
+    @patch("booker.tasks.create_http_session")
     @patch("booker.tasks.sys")
     @patch("booker.tasks.sleep")
     @patch("booker.tasks.logging")
@@ -63,71 +107,79 @@ class CheckingConnectionTaskTestCase(TestCase):
         logging_mock,
         sleep_mock,
         sys_mock,
+        create_http_session_mock,
     ):
         config_mock.SELENIUM_REMOTE_URL = "http://local.selenium:4444/wd/hub"
-        retry = 100
-        check_connection_mock.side_effect = [False] * retry
+        config_mock.READINESS_TIMEOUT = 0
+        check_connection_mock.return_value = False
+        sys_mock.exit.side_effect = SystemExit(1)
 
         sut = CheckingConnectionTask()
-        actual = sut()
+        with self.assertRaises(SystemExit):
+            sut()
 
-        self.assertIsNone(actual)
         self.assertFalse(sut.is_connectable)
-        logging_mock.info.assert_has_calls([call("Sleeping.")] * retry)
-        sleep_mock.assert_has_calls([call(1)] * retry)
+        self.assertIsNone(sut.time_to_ready)
+        sleep_mock.assert_not_called()
         logging_mock.error.assert_called_once_with(
             "🚨 Failed to connect to local.selenium:4444!"
         )
         sys_mock.exit.assert_called_once_with(1)
 
     @patch("booker.tasks.logging")
-    @patch("booker.tasks.STDOUT")
-    @patch("booker.tasks.DEVNULL")
-    @patch("booker.tasks.Popen")
     @patch("booker.tasks.config")
-    def test__check_connection_connectable(
-        self, config_mock, Popen_mock, DEVNULL_mock, STDOUT_mock, logging_mock
-    ):
+    def test__check_connection_connectable(self, config_mock, logging_mock):
         config_mock.SELENIUM_REMOTE_URL = "http://local.selenium:4444/wd/hub"
-        Popen_mock.return_value.wait.return_value = 0
+        session = MagicMock()
+        session.get.return_value.ok = True
+        session.get.return_value.json.return_value = {
+            "value": {"ready": True, "message": "Selenium Grid ready."}
+        }
 
         sut = CheckingConnectionTask()
-        actual = sut._check_connection()
+        actual = sut._check_connection(session)
 
         self.assertTrue(actual)
-        Popen_mock.assert_called_once_with(
-            ["nc", "-zv", sut.host, sut.port],
-            stdout=DEVNULL_mock,
-            stderr=STDOUT_mock,
+        session.get.assert_called_once_with(
+            "http://local.selenium:4444/wd/hub/status", timeout=1.0
         )
-        Popen_mock.return_value.wait.assert_called_once_with()
         logging_mock.info.assert_called_once_with(
-            f"✅ Can communicate with {sut.host}:{sut.port}!"
+            f"✅ {sut.host}:{sut.port} is ready!"
+        )
+
+    @patch("booker.tasks.logging")
+    @patch("booker.tasks.config")
+    def test__check_connection_not_ready(self, config_mock, logging_mock):
+        config_mock.SELENIUM_REMOTE_URL = "http://local.selenium:4444/wd/hub"
+        session = MagicMock()
+        session.get.return_value.ok = True
+        session.get.return_value.json.return_value = {
+            "value": {"ready": False, "message": "Starting."}
+        }
+
+        sut = CheckingConnectionTask()
+        actual = sut._check_connection(session)
+
+        self.assertFalse(actual)
+        logging_mock.warning.assert_called_once_with(
+            f"⛔ {sut.host}:{sut.port} is not ready."
         )
 
     @patch("booker.tasks.logging")
-    @patch("booker.tasks.STDOUT")
-    @patch("booker.tasks.DEVNULL")
-    @patch("booker.tasks.Popen")
     @patch("booker.tasks.config")
     def test__check_connection_not_connectable(
-        self, config_mock, Popen_mock, DEVNULL_mock, STDOUT_mock, logging_mock
+        self, config_mock, logging_mock
     ):
         config_mock.SELENIUM_REMOTE_URL = "http://local.selenium:4444/wd/hub"
-        Popen_mock.return_value.wait.return_value = 1
+        session = MagicMock()
+        session.get.side_effect = requests.ConnectionError
 
         sut = CheckingConnectionTask()
-        actual = sut._check_connection()
+        actual = sut._check_connection(session)
 
         self.assertFalse(actual)
-        Popen_mock.assert_called_once_with(
-            ["nc", "-zv", sut.host, sut.port],
-            stdout=DEVNULL_mock,
-            stderr=STDOUT_mock,
-        )
-        Popen_mock.return_value.wait.assert_called_once_with()
         logging_mock.warning.assert_called_once_with(
-            f"⛔ Unable to communicate with {sut.host}:{sut.port}."
+            f"⛔ {sut.host}:{sut.port} is not ready."
         )
 
 
@@ -138,70 +190,617 @@ class LoadingUserTaskTestCase(TestCase):
         self.assertEqual(sut.users, [])
 
     @patch("booker.tasks.config")
-    @patch("booker.tasks.read_jsonlines_s3")
-    def test__call(self, read_jsonlines_s3_mock, config_mock):
+    @patch("booker.tasks.read_jsonlines")
+    def test__call(self, read_jsonlines_mock, config_mock):
+        config_mock.USERS_FILE_PATH = "file:///path/to/users.jsonl"
+        config_mock.SHARD_INDEX = 0
+        config_mock.SHARD_COUNT = 1
+
         sut = LoadingUserTask()
         actual = sut()
 
         self.assertIsNone(actual)
-        self.assertEqual(sut.users, read_jsonlines_s3_mock.return_value)
-        read_jsonlines_s3_mock.assert_called_once_with(
+        self.assertEqual(sut.users, read_jsonlines_mock.return_value)
+        read_jsonlines_mock.assert_called_once_with(
             config_mock.USERS_FILE_PATH
         )
 
+    @patch("booker.tasks.shard_users")
+    @patch("booker.tasks.config")
+    @patch("booker.tasks.read_jsonlines")
+    def test__call_sharded(
+        self, read_jsonlines_mock, config_mock, shard_users_mock
+    ):
+        config_mock.USERS_FILE_PATH = "/path/to/users.jsonl"
+
+        sut = LoadingUserTask()
+        sut()
+
+        self.assertEqual(sut.users, shard_users_mock.return_value)
+        shard_users_mock.assert_called_once_with(
+            read_jsonlines_mock.return_value,
+            config_mock.SHARD_INDEX,
+            config_mock.SHARD_COUNT,
+            config_mock.SHARD_PLACEMENT,
+        )
+
+
+class LoadingUserTaskCacheTestCase(TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.config_patchers = [
+            patch("booker.tasks.config"),
+            patch("booker.cache.config"),
+        ]
+        self.config_mocks = [p.start() for p in self.config_patchers]
+        for config_mock in self.config_mocks:
+            config_mock.USERS_FILE_PATH = "s3://bucket/users.jsonl"
+            config_mock.CACHE_DIR = self.cache_dir.name
+            config_mock.USERS_CACHE = True
+            config_mock.USERS_CACHE_TTL = 0
+            config_mock.USERS_CACHE_INVALIDATE = False
+            config_mock.SHARD_INDEX = 0
+            config_mock.SHARD_COUNT = 1
+        self.user_kwargs = {
+            "name_kanji": "潜行密用",
+            "name_kana": "センコウミツヨウ",
+            "telephone": "012-345-6789",
+            "email": "test@example.com",
+            "date_pattern": "（土,（日,祝）",
+        }
+
+    def tearDown(self):
+        for p in self.config_patchers:
+            p.stop()
+        self.cache_dir.cleanup()
+
+    def _object(self, etag):
+        body = json.dumps(self.user_kwargs) + "\n" + json.dumps({"a": 1})
+        return {"Body": BytesIO(body.encode("utf-8")), "ETag": etag}
+
+    @patch("booker.tasks.get_s3_object")
+    def test__call_not_cached(self, get_s3_object_mock):
+        get_s3_object_mock.return_value = self._object('"etag-1"')
+
+        sut = LoadingUserTask()
+        sut()
+
+        self.assertEqual(sut.users, [self.user_kwargs])
+        get_s3_object_mock.assert_called_once_with(
+            "s3://bucket/users.jsonl", None
+        )
+        (cache_file,) = os.listdir(self.cache_dir.name)
+        mode = os.stat(os.path.join(self.cache_dir.name, cache_file)).st_mode
+        self.assertEqual(mode & 0o777, 0o600)
+
+    @patch("booker.tasks.read_jsonlines")
+    @patch("booker.tasks.get_s3_object")
+    def test__call_cache_disabled(
+        self, get_s3_object_mock, read_jsonlines_mock
+    ):
+        self.config_mocks[0].USERS_CACHE = False
+        read_jsonlines_mock.return_value = [self.user_kwargs]
+
+        sut = LoadingUserTask()
+        sut()
+
+        self.assertEqual(sut.users, [self.user_kwargs])
+        read_jsonlines_mock.assert_called_once_with("s3://bucket/users.jsonl")
+        get_s3_object_mock.assert_not_called()
+        self.assertEqual(os.listdir(self.cache_dir.name), [])
+
+    @patch("booker.tasks.get_s3_object")
+    def test__call_not_modified(self, get_s3_object_mock):
+        get_s3_object_mock.side_effect = [self._object('"etag-1"'), None]
+        LoadingUserTask()()
+
+        sut = LoadingUserTask()
+        sut()
+
+        self.assertEqual(sut.users, [self.user_kwargs])
+        get_s3_object_mock.assert_called_with(
+            "s3://bucket/users.jsonl", '"etag-1"'
+        )
+
+    @patch("booker.tasks.get_s3_object")
+    def test__call_modified(self, get_s3_object_mock):
+        get_s3_object_mock.side_effect = [
+            self._object('"etag-1"'),
+            self._object('"etag-2"'),
+            None,
+        ]
+        LoadingUserTask()()
+        LoadingUserTask()()
+
+        sut = LoadingUserTask()
+        sut()
+
+        self.assertEqual(sut.users, [self.user_kwargs])
+        get_s3_object_mock.assert_called_with(
+            "s3://bucket/users.jsonl", '"etag-2"'
+        )
+
+    @patch("booker.tasks.get_s3_object")
+    def test__call_fresh(self, get_s3_object_mock):
+        get_s3_object_mock.return_value = self._object('"etag-1"')
+        LoadingUserTask()()
+
+        with patch("booker.cache.config") as config_mock:
+            config_mock.CACHE_DIR = self.cache_dir.name
+            config_mock.USERS_CACHE_TTL = 3600
+            sut = LoadingUserTask()
+            sut()
+
+        self.assertEqual(sut.users, [self.user_kwargs])
+        get_s3_object_mock.assert_called_once()
+
+    @patch("booker.tasks.config")
+    @patch("booker.tasks.get_s3_object")
+    def test__call_invalidate(self, get_s3_object_mock, config_mock):
+        config_mock.USERS_FILE_PATH = "s3://bucket/users.jsonl"
+        config_mock.USERS_CACHE_INVALIDATE = True
+        config_mock.SHARD_INDEX = 0
+        config_mock.SHARD_COUNT = 1
+        get_s3_object_mock.side_effect = lambda *args: self._object('"e"')
+        LoadingUserTask()()
+
+        sut = LoadingUserTask()
+        sut()
+
+        self.assertEqual(sut.users, [self.user_kwargs])
+        get_s3_object_mock.assert_called_with("s3://bucket/users.jsonl", None)
+
+
+class IndexingSlotTaskTestCase(TestCase):
+    def test__init(self):
+        session_pool = MagicMock()
+
+        sut = IndexingSlotTask(session_pool, ["（土", "（土", "祝）"])
+
+        self.assertEqual(sut.session_pool, session_pool)
+        self.assertEqual(sut.date_patterns, {"（土", "祝）"})
+        self.assertEqual(sut.slots, [])
+        self.assertEqual(sut.slots_by_pattern, {})
+        self.assertIsNone(sut.reservable_start)
+
+    @patch("booker.tasks.config")
+    def test__call(self, config_mock):
+        session_pool = MagicMock()
+        driver = session_pool.lease.return_value.__enter__.return_value
+        driver.execute_script.return_value = [
+            [
+                ["5月3日（火・祝）", "https://example.com/1", "iconFont"],
+                ["5月6日\u00a0 （金）", "https://example.com/2", "iconFont"],
+            ],
+            "2022年5月1日 10:00",
+        ]
+
+        sut = IndexingSlotTask(session_pool)
+        actual = sut()
+
+        self.assertIsNone(actual)
+        driver.get.assert_called_once_with(config_mock.RESERVATION_URL)
+        driver.execute_script.assert_called_once_with(
+            INDEXING_SLOT_SCRIPT,
+            metadata.CSS_SELECTOR,
+            metadata.XPATH_RESERVABLE_START_DATE,
+        )
+        self.assertEqual(sut.reservable_start, "2022年5月1日 10:00")
+        self.assertEqual(
+            sut.slots,
+            [
+                Slot(0, "5月3日（火・祝）", "https://example.com/1"),
+                Slot(1, "5月6日 （金）", "https://example.com/2"),
+            ],
+        )
+
+    @patch("booker.tasks.config")
+    def test__call_date_patterns(self, config_mock):
+        session_pool = MagicMock()
+        driver = session_pool.lease.return_value.__enter__.return_value
+        driver.execute_script.return_value = [
+            [
+                ["5月3日（火・祝）", "https://example.com/1", ""],
+                ["5月6日（金）", "https://example.com/2", ""],
+                ["5月7日（土）", "https://example.com/3", ""],
+            ],
+            None,
+        ]
+
+        sut = IndexingSlotTask(
+            session_pool, ["（土,（日,祝）", "（金）", "（月）"]
+        )
+        sut()
+
+        self.assertEqual(
+            sut.slots_by_pattern,
+            {
+                "（土,（日,祝）": [sut.slots[0], sut.slots[2]],
+                "（金）": [sut.slots[1]],
+                "（月）": [],
+            },
+        )
+
+    @patch("booker.tasks.config")
+    def test__call_over_http(self, config_mock):
+        with FakeSite(dates=["5月6日（金）", "5月7日（土）"]) as site:
+            config_mock.RESERVATION_URL = site.url
+            config_mock.HTTP_TIMEOUT = 10
+
+            sut = IndexingSlotTask(None, ["（土"])
+            sut()
+
+        self.assertEqual(
+            sut.slots,
+            [
+                Slot(0, "5月6日（金）", f"{site.url}dates/0"),
+                Slot(1, "5月7日（土）", f"{site.url}dates/1"),
+            ],
+        )
+        self.assertEqual(sut.slots_by_pattern, {"（土": [sut.slots[1]]})
+        self.assertEqual(sut.reservable_start, "2022年5月1日 10:00")
+        self.assertEqual(
+            sut.slots[1].marker, "iconFont is-outIcon 5月7日（土） ○"
+        )
+
+    @patch("booker.tasks.config")
+    def test__call_fingerprint(self, config_mock):
+        session_pool = MagicMock()
+        driver = session_pool.lease.return_value.__enter__.return_value
+        driver.execute_script.return_value = [
+            [
+                ["5月6日（金）", "https://example.com/1", "○"],
+                ["5月7日（土）", "https://example.com/2", "○"],
+            ],
+            None,
+        ]
+        fingerprint = MagicMock()
+        fingerprint.changed.side_effect = lambda slots: slots[1:]
+
+        sut = IndexingSlotTask(session_pool, ["（金）", "（土"], fingerprint)
+        sut()
+
+        self.assertEqual(len(sut.listing), 2)
+        fingerprint.changed.assert_called_once_with(sut.listing)
+        self.assertEqual(sut.slots, [sut.listing[1]])
+        self.assertEqual(
+            sut.slots_by_pattern, {"（金）": [], "（土": [sut.listing[1]]}
+        )
+
+    def test_slots_for_indexed(self):
+        user = MagicMock(spec=User)
+        user.date_pattern = "（土,（日,祝）"
+        slots = [Slot(2, "5月7日（土）", "https://example.com/3")]
+
+        sut = IndexingSlotTask(MagicMock())
+        sut.slots_by_pattern = {"（土,（日,祝）": slots}
+        actual = sut.slots_for(user)
+
+        self.assertEqual(actual, slots)
+
+    def test_slots_for(self):
+        user = MagicMock(spec=User)
+        user.date_pattern = "（土,（日,祝）"
+        slots = [
+            Slot(0, "5月3日（火・祝）", "https://example.com/1"),
+            Slot(1, "5月6日（金）", "https://example.com/2"),
+            Slot(2, "5月7日（土）", "https://example.com/3"),
+        ]
+
+        sut = IndexingSlotTask(MagicMock())
+        sut.slots = slots
+        actual = sut.slots_for(user)
+
+        self.assertEqual(actual, [slots[0], slots[2]])
+
 
 class ReservationTaskTestCase(TestCase):
+    def setUp(self):
+        # keep step latencies out of the store shared by the process
+        patcher = patch(
+            "booker.waits.latency_store", return_value=LatencyStore()
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = patch(
+            "booker.tasks.unavailable_dates",
+            return_value=UnavailableDates(ttl=300),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
     def test__init(self):
         user = MagicMock(spec=User)
 
         sut = ReservationTask(user)
 
         self.assertEqual(sut.user, user)
+        self.assertIsNone(sut.session_pool)
+        self.assertIsNone(sut.slots)
         self.assertEqual(sut.reservations, [])
 
     @patch("booker.tasks.ReservationTask._start")
-    @patch("booker.tasks.webdriver")
-    @patch("booker.tasks.config")
-    def test__call(self, config_mock, webdriver_mock, start_mock):
+    @patch("booker.tasks.create_driver")
+    def test__call(self, create_driver_mock, start_mock):
         user = MagicMock(spec=User)
-        config_mock.SELENIUM_REMOTE_URL = "http://local.selenium:4444/wd/hub"
-        options = webdriver_mock.ChromeOptions.return_value
-        driver = webdriver_mock.Remote.return_value
+        driver = create_driver_mock.return_value
 
         sut = ReservationTask(user)
         actual = sut()
 
         self.assertIsNone(actual)
-        options.add_argument.assert_has_calls(
+        create_driver_mock.assert_called_once_with()
+        start_mock.assert_called_once_with(driver)
+        driver.quit.assert_called_once_with()
+
+    @patch("booker.tasks.ReservationTask._start")
+    @patch("booker.tasks.create_driver")
+    def test__call_session_pool(self, create_driver_mock, start_mock):
+        user = MagicMock(spec=User)
+        session_pool = MagicMock()
+        driver = session_pool.lease.return_value.__enter__.return_value
+
+        sut = ReservationTask(user, session_pool)
+        actual = sut()
+
+        self.assertIsNone(actual)
+        create_driver_mock.assert_not_called()
+        session_pool.lease.assert_called_once_with()
+        start_mock.assert_called_once_with(driver)
+        driver.quit.assert_not_called()
+
+    @patch("booker.tasks.ReservationTask._start")
+    @patch("booker.tasks.create_driver")
+    def test__call_booked_slots(self, create_driver_mock, start_mock):
+        user = MagicMock(spec=User)
+        user.email = "test@example.com"
+        session_pool = MagicMock()
+        slots = [
+            Slot(1, "5月7日（土）", "https://example.com/2"),
+            Slot(5, "5月8日（日）", "https://example.com/6"),
+        ]
+
+        sut = ReservationTask(user, session_pool, slots)
+        sut.ledger = MagicMock()
+        sut.ledger.is_booked.side_effect = [True, True]
+        sut()
+
+        self.assertEqual(sut.slots, [])
+        sut.ledger.is_booked.assert_has_calls(
             [
-                call("--no-sandbox"),
-                call("--disable-dev-shm-usage"),
+                call("test@example.com", "5月7日（土）"),
+                call("test@example.com", "5月8日（日）"),
             ]
         )
-        webdriver_mock.Remote.assert_called_once_with(
-            command_executor="http://local.selenium:4444/wd/hub",
-            desired_capabilities=options.to_capabilities.return_value,
-            options=options,
+        session_pool.lease.assert_not_called()
+        start_mock.assert_not_called()
+
+    @patch("booker.tasks.ReservationTask._start")
+    @patch("booker.tasks.create_driver")
+    def test__call_unavailable_slots(self, create_driver_mock, start_mock):
+        user = MagicMock(spec=User)
+        session_pool = MagicMock()
+        slots = [
+            Slot(1, "5月7日（土）", "https://example.com/2"),
+            Slot(5, "5月8日（日）", "https://example.com/6"),
+        ]
+
+        sut = ReservationTask(user, session_pool, slots)
+        sut.unavailable_dates.add("5月7日（土）")
+        sut.unavailable_dates.add("5月8日（日）")
+        sut()
+
+        self.assertEqual(sut.slots, [])
+        self.assertEqual(sut.unavailable_dates.hits, 2)
+        session_pool.lease.assert_not_called()
+        start_mock.assert_not_called()
+
+    def test_target_dates_shifted(self):
+        user = MagicMock(spec=User)
+        date_elements = [MagicMock(), MagicMock(), MagicMock()]
+        for date_element, text in zip(
+            date_elements, ["5月6日（金）", "5月8日（日）", "5月7日（土）"]
+        ):
+            date_element.text = text
+        slots = [
+            Slot(1, "5月7日（土）", "https://example.com/2"),
+            Slot(2, "5月8日（日）", "https://example.com/3"),
+            Slot(3, "5月14日（土）", "https://example.com/4"),
+        ]
+
+        sut = ReservationTask(user)
+        actual = list(sut._target_dates(date_elements, slots))
+
+        self.assertEqual(
+            actual,
+            [
+                ("5月7日（土）", date_elements[2]),
+                ("5月8日（日）", date_elements[1]),
+            ],
         )
-        driver.set_window_size.assert_called_once_with(1200, 900)
-        start_mock.assert_called_once_with(driver)
+
+    def test_target_dates_whitespace(self):
+        user = MagicMock(spec=User)
+        date_elements = [MagicMock(), MagicMock()]
+        date_elements[0].text = "5月7日\u00a0（土）"
+        date_elements[1].text = "5月8日 \n（日）"
+        slots = [
+            Slot(0, "5月7日 （土）", "https://example.com/1"),
+            Slot(1, "5月8日\n（日）", "https://example.com/2"),
+        ]
+
+        sut = ReservationTask(user)
+        actual = list(sut._target_dates(date_elements, slots))
+
+        self.assertEqual(
+            actual,
+            [
+                ("5月7日 （土）", date_elements[0]),
+                ("5月8日\n（日）", date_elements[1]),
+            ],
+        )
+
+    def test_target_dates_booked(self):
+        user = MagicMock(spec=User)
+        user.email = "test@example.com"
+        user.date_pattern = "（土,（日"
+        date_elements = [MagicMock(), MagicMock()]
+        date_elements[0].text = "5月7日（土）"
+        date_elements[1].text = "5月8日（日）"
+
+        sut = ReservationTask(user)
+        sut.ledger = MagicMock()
+        sut.ledger.is_booked.side_effect = [True, False]
+        actual = list(sut._target_dates(date_elements, None))
+
+        self.assertEqual(actual, [("5月8日（日）", date_elements[1])])
+
+    def test_append_reservation_to_ledger(self):
+        user = MagicMock(spec=User)
+
+        sut = ReservationTask(user)
+        sut.ledger = MagicMock()
+        sut._append_reservation(
+            "5月7日（土）", "到達番号：123_456_789_0123\nAbCdEf"
+        )
+
+        sut.ledger.add.assert_called_once_with(sut.reservations[0])
+
+    @patch("booker.tasks.datetime")
+    def test_append_reservation_booked_at(self, datetime_mock):
+        user = MagicMock(spec=User)
+
+        sut = ReservationTask(user)
+        sut._append_reservation(
+            "5月7日（土）", "到達番号：123_456_789_0123\nAbCdEf"
+        )
+
+        self.assertEqual(
+            sut.reservations[0].booked_at, datetime_mock.now.return_value
+        )
+
+    @patch("booker.tasks.ReservationTask._start")
+    @patch("booker.tasks.create_driver")
+    def test__call_no_slots(self, create_driver_mock, start_mock):
+        user = MagicMock(spec=User)
+        session_pool = MagicMock()
+
+        sut = ReservationTask(user, session_pool, [])
+        actual = sut()
+
+        self.assertIsNone(actual)
+        create_driver_mock.assert_not_called()
+        session_pool.lease.assert_not_called()
+        start_mock.assert_not_called()
 
     @patch("booker.tasks.ReservationTask._reserve")
     @patch("booker.tasks.ReservationTask._is_reservable")
     @patch("booker.tasks.ReservationTask._match_date_pattern")
+    @patch("booker.tasks.config")
+    def test_start_slots(
+        self,
+        config_mock,
+        match_date_pattern_mock,
+        is_reservable_mock,
+        reserve_mock,
+    ):
+        config_mock.NAVIGATION = "click"
+        user = MagicMock(spec=User)
+        driver = MagicMock()
+        driver.window_handles = ["top", "date"]
+        date_elements = [MagicMock(), MagicMock(), MagicMock()]
+        for date_element, text in zip(
+            date_elements, ["5月6日（金）", "5月7日（土）", "5月9日（月）"]
+        ):
+            date_element.text = text
+        driver.find_elements.return_value = date_elements
+        is_reservable_mock.return_value = True
+        slots = [
+            Slot(1, "5月7日（土）", "https://example.com/2"),
+            Slot(5, "5月8日（日）", "https://example.com/6"),
+        ]
+
+        sut = ReservationTask(user, slots=slots)
+        actual = sut._start(driver)
+
+        self.assertIsNone(actual)
+        match_date_pattern_mock.assert_not_called()
+        date_elements[0].click.assert_not_called()
+        date_elements[1].click.assert_called_once_with()
+        date_elements[2].click.assert_not_called()
+        reserve_mock.assert_called_once_with(driver, "5月7日（土）")
+
+    @patch("booker.tasks.ReservationTask._reserve")
+    @patch("booker.tasks.ReservationTask._is_reservable")
+    @patch("booker.tasks.config")
+    def test_start_direct(
+        self,
+        config_mock,
+        is_reservable_mock,
+        reserve_mock,
+    ):
+        config_mock.NAVIGATION = "direct"
+        user = MagicMock(spec=User)
+        driver = MagicMock()
+        driver.window_handles = ["top", "date"]
+        date_elements = [MagicMock(), MagicMock()]
+        date_elements[1].text = "5月8日（日）"
+        driver.find_elements.return_value = date_elements
+        is_reservable_mock.side_effect = [True, False, True]
+        slots = [
+            Slot(0, "5月7日（土）", "https://example.com/1"),
+            Slot(1, "5月8日（日）", "javascript:void(0)"),
+            Slot(2, "5月14日（土）", "https://example.com/3"),
+        ]
+
+        sut = ReservationTask(user, slots=slots)
+        actual = sut._start(driver)
+
+        self.assertIsNone(actual)
+        driver.get.assert_has_calls(
+            [
+                call("https://example.com/1"),
+                call("https://example.com/3"),
+                call(config_mock.RESERVATION_URL),
+            ]
+        )
+        date_elements[0].click.assert_not_called()
+        date_elements[1].click.assert_called_once_with()
+        reserve_mock.assert_has_calls(
+            [
+                call(driver, "5月7日（土）"),
+                call(driver, "5月8日（日）"),
+            ]
+        )
+        driver.close.assert_called_once_with()
+        self.assertTrue(sut.unavailable_dates.contains("5月14日（土）"))
+        self.assertFalse(sut.unavailable_dates.contains("5月7日（土）"))
+
+    @patch("booker.tasks.ReservationTask._reserve")
+    @patch("booker.tasks.ReservationTask._is_reservable")
+    @patch("booker.tasks.ReservationTask._match_date_pattern")
+    @patch("booker.tasks.config")
     def test_start(
         self,
+        config_mock,
         match_date_pattern_mock,
         is_reservable_mock,
         reserve_mock,
     ):
+        config_mock.NAVIGATION = "direct"
         user = MagicMock(spec=User)
         driver = MagicMock()
+        driver.window_handles = ["top", "date"]
         driver_find_elements_return_value = [
             MagicMock(),
             MagicMock(),
             MagicMock(),
         ]
+        for date_element, text in zip(
+            driver_find_elements_return_value,
+            ["5月6日（金）", "5月7日（土）", "5月8日（日）"],
+        ):
+            date_element.text = text
         driver.find_elements.return_value = driver_find_elements_return_value
         match_date_pattern_mock.side_effect = [False, True, True]
         is_reservable_mock.side_effect = [True, True]
@@ -213,20 +812,26 @@ class ReservationTaskTestCase(TestCase):
         driver.find_elements.assert_called_once_with(
             By.CSS_SELECTOR, metadata.CSS_SELECTOR
         )
-        is_reservable_mock.assert_has_calls([call(driver), call(driver)])
+        is_reservable_mock.assert_has_calls(
+            [call(driver, ANY), call(driver, ANY)]
+        )
         reserve_mock.assert_has_calls(
             [
-                call(driver, driver_find_elements_return_value[1].text),
-                call(driver, driver_find_elements_return_value[2].text),
+                call(driver, "5月7日（土）"),
+                call(driver, "5月8日（日）"),
             ]
         )
         driver.close.assert_has_calls([call(), call()])
 
     @patch("booker.tasks.ReservationTask._save_screenshot")
     @patch("booker.tasks.ReservationTask._store_reservation")
-    def test_reserve(self, store_reservation_mock, save_screenshot_mock):
+    @patch("booker.tasks.config")
+    def test_reserve(
+        self, config_mock, store_reservation_mock, save_screenshot_mock
+    ):
         from fixtures.tasks_reserve_fixtures import xpath_values
 
+        config_mock.FORM_FILL = "keys"
         user = MagicMock(spec=User)
         user.name_kanji = "潜行密用"
         user.name_kana = "センコウミツヨウ"
@@ -234,8 +839,11 @@ class ReservationTaskTestCase(TestCase):
         user.email = "test@example.com"
         driver = MagicMock()
         date = "5月4日（水・祝）"
+        apply_button = MagicMock()
 
         sut = ReservationTask(user)
+        sut.waiter = MagicMock()
+        sut.waiter.wait.side_effect = [True, apply_button, True]
         actual = sut._reserve(driver, date)
 
         self.assertIsNone(actual)
@@ -248,17 +856,22 @@ class ReservationTaskTestCase(TestCase):
             [call(By.XPATH, metadata.XPATH_CONFIRMATION_BUTTON)]
         )
         driver.find_element.return_value.click.assert_has_calls([call()])
-        driver.find_element.assert_has_calls(
-            [call(By.XPATH, metadata.XPATH_APPLY_BUTTON)]
+        sut.waiter.wait.assert_has_calls(
+            [
+                call(driver, "form"),
+                call(driver, "confirmation", ANY),
+                call(driver, "completion", ANY, timeout=ANY),
+            ]
         )
-        driver.find_element.return_value.click.assert_has_calls([call()])
+        apply_button.click.assert_called_once_with()
         store_reservation_mock.assert_called_once_with(driver, date)
         save_screenshot_mock.assert_called_once_with(driver, date)
 
-    @patch("booker.tasks.ReservationTask._is_reservable")
-    def test_reserve_same_user_error(self, is_reservable_mock):
+    @patch("booker.tasks.config")
+    def test_reserve_same_user_error(self, config_mock):
         from fixtures.tasks_reserve_fixtures import xpath_values
 
+        config_mock.FORM_FILL = "keys"
         user = MagicMock(spec=User)
         user.name_kanji = "潜行密用"
         user.name_kana = "センコウミツヨウ"
@@ -266,9 +879,14 @@ class ReservationTaskTestCase(TestCase):
         user.email = "test@example.com"
         driver = MagicMock()
         date = "5月4日（水・祝）"
-        is_reservable_mock.return_value = False
 
         sut = ReservationTask(user)
+        sut.waiter = MagicMock()
+        sut.waiter.wait.side_effect = [
+            True,
+            driver.find_element.return_value,
+            False,
+        ]
         actual = sut._reserve(driver, date)
 
         self.assertIsNone(actual)
@@ -281,11 +899,153 @@ class ReservationTaskTestCase(TestCase):
             [call(By.XPATH, metadata.XPATH_CONFIRMATION_BUTTON)]
         )
         driver.find_element.return_value.click.assert_has_calls([call()])
+        sut.waiter.wait.assert_has_calls(
+            [
+                call(driver, "form"),
+                call(driver, "confirmation", ANY),
+                call(driver, "completion", ANY, timeout=ANY),
+            ]
+        )
+        self.assertEqual(sut.reservations, [])
+
+    @patch("booker.tasks.ReservationTask._fill_form", MagicMock())
+    @patch("booker.tasks.ReservationTask._store_reservation")
+    @patch("booker.tasks.config")
+    def test_reserve_completion_timeout(
+        self, config_mock, store_reservation_mock
+    ):
+        config_mock.WAIT_TIMEOUT = 30
+        user = MagicMock(spec=User)
+        driver = MagicMock()
+        apply_button = MagicMock()
+
+        sut = ReservationTask(user)
+        sut.ledger = MagicMock()
+        sut.waiter = MagicMock()
+        sut.waiter.wait.side_effect = [
+            True,
+            apply_button,
+            TimeoutException("completion not ready in 30.00s"),
+        ]
+        sut._reserve(driver, "5月7日（土）")
+
+        sut.waiter.wait.assert_called_with(
+            driver, "completion", sut.submitted_at, timeout=30
+        )
+        store_reservation_mock.assert_not_called()
+        self.assertEqual(
+            sut.reservations,
+            [
+                Reservation(
+                    user=user,
+                    reserved_date="5月7日（土）",
+                    application_number=None,
+                    inquiry_number=None,
+                )
+            ],
+        )
+        sut.ledger.add.assert_called_once_with(sut.reservations[0])
+
+    @patch("booker.tasks.ReservationTask._reserve")
+    @patch("booker.tasks.ReservationTask._is_reservable")
+    def test_navigate_dates_timeout(self, is_reservable_mock, reserve_mock):
+        user = MagicMock(spec=User)
+        driver = MagicMock()
+        is_reservable_mock.side_effect = [
+            TimeoutException("application not ready in 2.00s"),
+            True,
+        ]
+        slots = [
+            Slot(0, "5月7日（土）", "https://example.com/1"),
+            Slot(1, "5月8日（日）", "https://example.com/2"),
+        ]
+
+        sut = ReservationTask(user, slots=slots)
+        sut._navigate_dates(driver)
+
+        reserve_mock.assert_called_once_with(driver, "5月8日（日）")
+        self.assertFalse(sut.unavailable_dates.contains("5月7日（土）"))
+        self.assertEqual(sut.failed_dates, ["5月7日（土）"])
+
+    @patch("booker.tasks.ReservationTask._try_reserve")
+    def test_open_date_window_timeout(self, try_reserve_mock):
+        user = MagicMock(spec=User)
+        driver = MagicMock()
+
+        sut = ReservationTask(user)
+        sut.waiter = MagicMock()
+        sut.waiter.wait.side_effect = TimeoutException("window not ready")
+        sut._open_date(driver, "5月7日（土）", MagicMock())
+
+        try_reserve_mock.assert_not_called()
+        driver.switch_to.window.assert_not_called()
+        driver.close.assert_not_called()
+
+    @patch("booker.tasks.ReservationTask._save_screenshot")
+    @patch("booker.tasks.ReservationTask._store_reservation")
+    @patch("booker.tasks.config")
+    def test_reserve_script(
+        self, config_mock, store_reservation_mock, save_screenshot_mock
+    ):
+        config_mock.FORM_FILL = "script"
+        user = MagicMock(spec=User)
+        user.name_kanji = "潜行密用"
+        user.name_kana = "センコウミツヨウ"
+        user.telephone = "012-345-6789"
+        user.email = "test@example.com"
+        driver = MagicMock()
+        driver.execute_script.return_value = None
+        date = "5月4日（水・祝）"
+        apply_button = MagicMock()
+
+        sut = ReservationTask(user)
+        sut.waiter = MagicMock()
+        sut.waiter.wait.side_effect = [True, apply_button, True]
+        actual = sut._reserve(driver, date)
+
+        self.assertIsNone(actual)
+        driver.execute_script.assert_called_once_with(
+            FILLING_FORM_SCRIPT,
+            [
+                [metadata.XPATH_NAME_KANJI_FORM, "潜行密用"],
+                [metadata.XPATH_NAME_KANA_FORM, "センコウミツヨウ"],
+                [metadata.XPATH_TELEPHONE_FORM, "012-345-6789"],
+                [metadata.XPATH_EMAIL_FORM, "test@example.com"],
+                [metadata.XPATH_EMAIL_CONFIRMATION_FORM, "test@example.com"],
+            ],
+            metadata.XPATH_CHECK_TIME_FORM,
+        )
         driver.find_element.assert_has_calls(
-            [call(By.XPATH, metadata.XPATH_APPLY_BUTTON)]
+            [
+                call(By.XPATH, metadata.XPATH_CONFIRMATION_BUTTON),
+                call().click(),
+            ]
         )
-        driver.find_element.return_value.click.assert_has_calls([call()])
-        is_reservable_mock.assert_called_once_with(driver)
+        apply_button.click.assert_called_once_with()
+        driver.find_element.return_value.send_keys.assert_not_called()
+        store_reservation_mock.assert_called_once_with(driver, date)
+        save_screenshot_mock.assert_called_once_with(driver, date)
+
+    @patch("booker.tasks.ReservationTask._fill_form_by_keys")
+    @patch("booker.tasks.config")
+    def test_fill_form_script_missing_field(
+        self, config_mock, fill_form_by_keys_mock
+    ):
+        config_mock.FORM_FILL = "script"
+        user = MagicMock(spec=User)
+        user.name_kanji = "潜行密用"
+        user.name_kana = "センコウミツヨウ"
+        user.telephone = "012-345-6789"
+        user.email = "test@example.com"
+        driver = MagicMock()
+        driver.execute_script.return_value = metadata.XPATH_TELEPHONE_FORM
+
+        sut = ReservationTask(user)
+        actual = sut._fill_form(driver)
+
+        self.assertIsNone(actual)
+        driver.execute_script.assert_called_once()
+        fill_form_by_keys_mock.assert_called_once_with(driver)
 
     def test_store_reservation(self):
         user = MagicMock(spec=User)
@@ -313,23 +1073,61 @@ class ReservationTaskTestCase(TestCase):
             ),
         )
 
-    def test_save_screenshot(self):
+    def test_store_reservation_not_found(self):
+        user = MagicMock(spec=User)
+        driver = MagicMock()
+        driver.find_element.side_effect = NoSuchElementException()
+
+        sut = ReservationTask(user)
+        sut._store_reservation(driver, "5月4日（水・祝）")
+
+        self.assertEqual(len(sut.reservations), 1)
+        self.assertIsNone(sut.reservations[0].application_number)
+
+    def test_append_reservation_unexpected_text(self):
+        user = MagicMock(spec=User)
+
+        sut = ReservationTask(user)
+        sut.ledger = MagicMock()
+        sut._append_reservation(
+            "5月4日（水・祝）", "到達番号：123_456_789_0123"
+        )
+
+        self.assertIsNone(sut.reservations[0].application_number)
+        sut.ledger.add.assert_called_once_with(sut.reservations[0])
+
+    @patch("booker.tasks.capture")
+    def test_save_screenshot(self, capture_mock):
         user = MagicMock(spec=User)
         driver = MagicMock()
         date = "5月4日（水・祝）"
-        driver.execute_script.side_effect = [1200, 900]
+        reservation = MagicMock()
 
         sut = ReservationTask(user)
+        sut.reservations = [reservation]
         actual = sut._save_screenshot(driver, date)
 
-        driver.execute_script.assert_has_calls(
-            [
-                call("return document.body.scrollWidth"),
-                call("return document.body.scrollHeight"),
-            ]
+        self.assertIsNone(actual)
+        capture_mock.assert_called_once_with(driver)
+        self.assertEqual(reservation.screenshot, capture_mock.return_value)
+
+    @patch("booker.tasks.capture")
+    def test_save_screenshot_failed(self, capture_mock):
+        user = MagicMock(spec=User)
+        capture_mock.side_effect = OSError("cannot identify image file")
+        reservation = Reservation(
+            user=user,
+            reserved_date="5月4日（水・祝）",
+            application_number="123_456_789_0123",
+            inquiry_number="AbCdEf",
         )
-        driver.set_window_size.assert_called_once_with(1200, 900)
-        driver.save_screenshot.assert_called_once_with(f"{date}.png")
+
+        sut = ReservationTask(user)
+        sut.reservations = [reservation]
+        actual = sut._save_screenshot(MagicMock(), "5月4日（水・祝）")
+
+        self.assertIsNone(actual)
+        self.assertIsNone(reservation.screenshot)
 
 
 @pytest.mark.parametrize(
@@ -361,6 +1159,7 @@ def test_is_reservable(title):
     driver.title = title
 
     sut = ReservationTask(user)
+    sut.waiter = StepWaiter(LatencyStore())
     actual = sut._is_reservable(driver)
 
     if "エラー" in title:
@@ -369,6 +1168,222 @@ def test_is_reservable(title):
         assert actual
 
 
+class HttpReservationTaskTestCase(TestCase):
+    def setUp(self):
+        self.user = User(
+            name_kanji="潜行密用",
+            name_kana="センコウミツヨウ",
+            telephone="012-345-6789",
+            email="test@example.com",
+            date_pattern="（土,（日",
+        )
+        self.site = FakeSite()
+        self.site.start()
+        self.config_patcher = patch("booker.tasks.config")
+        config_mock = self.config_patcher.start()
+        config_mock.RESERVATION_URL = self.site.url
+        config_mock.HTTP_TIMEOUT = 10
+        patcher = patch(
+            "booker.tasks.unavailable_dates",
+            return_value=UnavailableDates(ttl=300),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.config_patcher.stop()
+        self.site.stop()
+
+    def test__call(self):
+        sut = HttpReservationTask(self.user)
+        actual = sut()
+
+        self.assertIsNone(actual)
+        self.assertEqual(
+            sut.reservations,
+            [
+                Reservation(
+                    user=self.user,
+                    reserved_date="5月7日（土）",
+                    application_number="000_000_004_0001",
+                    inquiry_number="Q00001",
+                ),
+                Reservation(
+                    user=self.user,
+                    reserved_date="5月8日（日）",
+                    application_number="000_000_005_0002",
+                    inquiry_number="Q00002",
+                ),
+            ],
+        )
+        self.assertEqual(
+            self.site.applications[4],
+            [
+                {
+                    "token": "token-4",
+                    "name_kanji": "潜行密用",
+                    "name_kana": "センコウミツヨウ",
+                    "telephone": "012-345-6789",
+                    "email": "test@example.com",
+                    "email_confirmation": "test@example.com",
+                    "time": "14:00-17:30",
+                    "apply": "申し込む",
+                }
+            ],
+        )
+
+    def test__call_with_ledger(self):
+        with tempfile.TemporaryDirectory() as directory:
+            ledger = ReservationLedger(f"{directory}/ledger.sqlite3")
+            ledger.add(
+                Reservation(
+                    user=self.user,
+                    reserved_date="5月7日（土）",
+                    application_number="000_000_004_0009",
+                    inquiry_number="Q00009",
+                )
+            )
+
+            sut = HttpReservationTask(self.user)
+            sut.ledger = ledger
+            sut()
+
+            self.assertTrue(ledger.is_booked(self.user.email, "5月8日（日）"))
+            ledger.close()
+
+        self.assertEqual(
+            [r.reserved_date for r in sut.reservations], ["5月8日（日）"]
+        )
+        self.assertNotIn(("GET", "/dates/4"), self.site.requests)
+        self.assertEqual(self.site.applications[4], [])
+
+    def test__call_slots(self):
+        slots = [Slot(4, "5月7日（土）", f"{self.site.url}dates/4")]
+
+        sut = HttpReservationTask(self.user, slots=slots)
+        sut()
+
+        self.assertEqual(len(sut.reservations), 1)
+        self.assertNotIn(("GET", "/"), self.site.requests)
+
+    def test__call_full(self):
+        self.site.capacity = 0
+        slots = [Slot(4, "5月7日（土）", f"{self.site.url}dates/4")]
+
+        sut = HttpReservationTask(self.user, slots=slots)
+        sut()
+
+        self.assertEqual(sut.reservations, [])
+        self.assertEqual(self.site.requests, [("GET", "/dates/4")])
+        self.assertTrue(sut.unavailable_dates.contains("5月7日（土）"))
+
+    def test__call_known_full(self):
+        slots = [
+            Slot(4, "5月7日（土）", f"{self.site.url}dates/4"),
+            Slot(5, "5月8日（日）", f"{self.site.url}dates/5"),
+        ]
+
+        sut = HttpReservationTask(self.user, slots=slots)
+        sut.unavailable_dates.add("5月7日（土）")
+        sut()
+
+        self.assertEqual(
+            [r.reserved_date for r in sut.reservations], ["5月8日（日）"]
+        )
+        self.assertNotIn(("GET", "/dates/4"), self.site.requests)
+        self.assertEqual(sut.unavailable_dates.hits, 1)
+        self.assertEqual(sut.unavailable_dates.misses, 1)
+
+    def test__call_same_user_error(self):
+        slots = [Slot(4, "5月7日（土）", f"{self.site.url}dates/4")]
+        self.site.capacity = 2
+        HttpReservationTask(self.user, slots=slots)()
+
+        sut = HttpReservationTask(self.user, slots=slots)
+        sut()
+
+        self.assertEqual(sut.reservations, [])
+        self.assertEqual(len(self.site.applications[4]), 1)
+
+    @patch(
+        "booker.fakesite.COMPLETION_HTML",
+        "<html><head><title>申込み完了</title></head>"
+        "<body><p>{application_number} {inquiry_number}</p></body></html>",
+    )
+    def test__call_numbers_not_found(self):
+        slots = [Slot(4, "5月7日（土）", f"{self.site.url}dates/4")]
+
+        sut = HttpReservationTask(self.user, slots=slots)
+        sut.ledger = MagicMock()
+        sut.ledger.is_booked.return_value = False
+        sut()
+
+        self.assertEqual(len(self.site.applications[4]), 1)
+        self.assertEqual(
+            sut.reservations,
+            [
+                Reservation(
+                    user=self.user,
+                    reserved_date="5月7日（土）",
+                    application_number=None,
+                    inquiry_number=None,
+                )
+            ],
+        )
+        sut.ledger.add.assert_called_once_with(sut.reservations[0])
+
+    @patch("booker.tasks.ReservationTask.__call__")
+    def test__call_fallback(self, reservation_task_call_mock):
+        slots = [
+            Slot(4, "5月7日（土）", f"{self.site.url}dates/4"),
+            Slot(9, "5月14日（土）", f"{self.site.url}dates/9"),
+        ]
+
+        sut = HttpReservationTask(self.user, slots=slots)
+        sut()
+
+        self.assertEqual(len(sut.reservations), 1)
+        self.assertEqual(sut.slots, [slots[1]])
+        reservation_task_call_mock.assert_called_once_with()
+
+    def test_form_request_shift_jis(self):
+        document = Document("""<html><body><form action="/apply" method="post"
+            accept-charset="Shift_JIS">
+            <input type="text" name="name">
+            <select name="time">
+              <option value="am">午前</option>
+              <option value="pm" selected>午後</option>
+            </select>
+            <textarea name="note">よろしく</textarea>
+            <input type="submit" name="apply" value="申し込む">
+            </form></body></html>""")
+        response = MagicMock()
+        response.url = "https://example.com/dates/4"
+        response.encoding = "utf-8"
+
+        sut = HttpReservationTask(self.user)
+        actual = sut._form_request(
+            response,
+            document,
+            "/html/body/form/input[2]",
+            {"/html/body/form/input[1]": "潜行密用"},
+        )
+
+        self.assertEqual(
+            actual,
+            (
+                "POST",
+                "https://example.com/apply",
+                [
+                    (b"name", "潜行密用".encode("shift_jis")),
+                    (b"time", b"pm"),
+                    (b"note", "よろしく".encode("shift_jis")),
+                    (b"apply", "申し込む".encode("shift_jis")),
+                ],
+            ),
+        )
+
+
 class NotificationTaskTestCase(TestCase):
     def setUp(self):
         self.user = User(
@@ -400,24 +1415,42 @@ class NotificationTaskTestCase(TestCase):
         self.assertEqual(sut.token, config.SLACK_TOKEN)
         self.assertEqual(sut.channel, config.SLACK_CHANNEL)
 
+    @patch("booker.tasks.SlackNotifier")
     @patch("booker.tasks.NotificationTask._notify")
-    def test__call(self, notify_mock):
+    def test__call(self, notify_mock, notifier_mock):
         sut = NotificationTask(self.reservations)
         actual = sut()
 
         self.assertIsNone(actual)
+        notifier_mock.assert_called_once_with(concurrency=1)
         notify_mock.assert_has_calls(
             [
                 call(self.reservations[0]),
                 call(self.reservations[1]),
             ]
         )
+        notifier_mock.return_value.close.assert_called_once_with()
+
+    @patch("booker.tasks.NotificationTask._notify")
+    def test__call_with_notifier(self, notify_mock):
+        notifier = MagicMock()
+
+        sut = NotificationTask(self.reservations, notifier)
+        actual = sut()
+
+        self.assertIsNone(actual)
+        notifier.submit.assert_has_calls(
+            [
+                call(notify_mock, self.reservations[0]),
+                call(notify_mock, self.reservations[1]),
+            ]
+        )
+        notifier.close.assert_not_called()
 
-    @patch("booker.tasks.os")
-    @patch("booker.tasks.requests")
     @patch("booker.tasks.datetime")
-    def test_notify(self, datetime_mock, requests_mock, os_mock):
+    def test_notify(self, datetime_mock):
         reservation = self.reservations[0]
+        reservation.screenshot = Screenshot(data=b"png", format="png")
         filename = f"{reservation.reserved_date}.png"
         comment = f"""予約が完了しました。
 ```
@@ -439,10 +1472,10 @@ class NotificationTaskTestCase(TestCase):
 来館利用日時 :
   {reservation.reserved_date} 14:00-17:30
 ```"""
-        m = mock_open()
-        files = {"file": m.return_value}
+        files = {"file": (filename, b"png", "image/png")}
 
-        sut = NotificationTask(self.reservations)
+        notifier = MagicMock()
+        sut = NotificationTask(self.reservations, notifier)
         param = {
             "token": sut.token,
             "channels": sut.channel,
@@ -450,17 +1483,165 @@ class NotificationTaskTestCase(TestCase):
             "initial_comment": comment,
             "title": filename,
         }
-        with patch("builtins.open", m):
-            actual = sut._notify(reservation)
+        actual = sut._notify(reservation)
 
         self.assertIsNone(actual)
         datetime_mock.now.return_value.strftime.assert_called_once_with(
             "%Y年%m月%d日 %H時%M分"
         )
-        m.assert_called_once_with(filename, "rb")
-        requests_mock.post.assert_called_once_with(
-            url="https://slack.com/api/files.upload",
-            params=param,
-            files=files,
+        notifier.post.assert_called_once_with(
+            "files.upload", params=param, files=files
+        )
+
+    def test_describe_booked_at(self):
+        reservation = self.reservations[0]
+        reservation.booked_at = datetime(2022, 5, 1, 10, 0, 3)
+
+        sut = NotificationTask(self.reservations)
+        actual = sut._describe(reservation)
+
+        self.assertTrue(
+            actual.startswith("到達日時：\n  2022年05月01日 10時00分")
+        )
+
+    def test_notify_unknown_result(self):
+        reservation = Reservation(
+            user=self.user,
+            reserved_date="5月3日（火・祝）",
+            application_number=None,
+            inquiry_number=None,
+        )
+        notifier = MagicMock()
+
+        sut = NotificationTask([reservation], notifier)
+        sut._notify(reservation)
+
+        text = notifier.post.call_args.kwargs["params"]["text"]
+        self.assertTrue(text.startswith("予約の結果が不明です。"))
+        self.assertIn("到達番号：\n  不明", text)
+
+    def test_notify_without_screenshot(self):
+        reservation = self.reservations[0]
+        notifier = MagicMock()
+
+        sut = NotificationTask(self.reservations, notifier)
+        actual = sut._notify(reservation)
+
+        self.assertIsNone(actual)
+        notifier.post.assert_called_once()
+        self.assertEqual(notifier.post.call_args.args, ("chat.postMessage",))
+        self.assertIn(
+            reservation.application_number,
+            notifier.post.call_args.kwargs["params"]["text"],
+        )
+
+
+class DigestNotificationTaskTestCase(TestCase):
+    def setUp(self):
+        self.users = [
+            User(
+                name_kanji=name_kanji,
+                name_kana="センコウミツヨウ",
+                telephone="012-345-6789",
+                email=email,
+                date_pattern="（土,（日,祝）",
+            )
+            for name_kanji, email in [
+                ("潜行密用", "a@example.com"),
+                ("密用潜行", "b@example.com"),
+            ]
+        ]
+        self.reservations = [
+            Reservation(
+                user=self.users[0],
+                reserved_date="5月3日（火・祝）",
+                application_number="123_456_789_0001",
+                inquiry_number="AbCdEf",
+                screenshot=Screenshot(data=b"png", format="png"),
+            ),
+            Reservation(
+                user=self.users[1],
+                reserved_date="5月3日（火・祝）",
+                application_number="123_456_789_0002",
+                inquiry_number="GhIjKl",
+                screenshot=Screenshot(data=b"jpeg", format="jpeg"),
+            ),
+        ]
+
+    def test__call(self):
+        notifier = MagicMock()
+
+        sut = DigestNotificationTask(self.reservations, notifier)
+        actual = sut()
+
+        self.assertIsNone(actual)
+        notifier.post.assert_called_once()
+        self.assertEqual(notifier.post.call_args.args, ("files.upload",))
+        params = notifier.post.call_args.kwargs["params"]
+        self.assertTrue(params["initial_comment"].startswith("2件の予約"))
+        for reservation in self.reservations:
+            self.assertIn(
+                reservation.application_number, params["initial_comment"]
+            )
+        filename, data, mimetype = notifier.post.call_args.kwargs["files"][
+            "file"
+        ]
+        self.assertEqual(filename, params["filename"])
+        self.assertEqual(mimetype, "application/zip")
+        with zipfile.ZipFile(BytesIO(data)) as archive:
+            self.assertEqual(
+                archive.namelist(),
+                [
+                    "5月3日（火・祝）_a@example.com.png",
+                    "5月3日（火・祝）_b@example.com.jpeg",
+                ],
+            )
+            self.assertEqual(
+                archive.read("5月3日（火・祝）_b@example.com.jpeg"), b"jpeg"
+            )
+        notifier.close.assert_not_called()
+
+    def test__call_unknown(self):
+        self.reservations[1].application_number = None
+        self.reservations[1].inquiry_number = None
+        notifier = MagicMock()
+
+        sut = DigestNotificationTask(self.reservations, notifier)
+        sut()
+
+        comment = notifier.post.call_args.kwargs["params"]["initial_comment"]
+        self.assertTrue(
+            comment.startswith(
+                "1件の予約が完了しました。\n"
+                "1件の予約の結果が不明です。サイトで確認してください。\n"
+            )
         )
-        os_mock.remove.assert_called_once_with(filename)
+
+    def test__call_without_screenshots(self):
+        for reservation in self.reservations:
+            reservation.screenshot = None
+        notifier = MagicMock()
+
+        sut = DigestNotificationTask(self.reservations, notifier)
+        sut()
+
+        notifier.post.assert_called_once()
+        self.assertEqual(notifier.post.call_args.args, ("chat.postMessage",))
+        self.assertNotIn("files", notifier.post.call_args.kwargs)
+
+    @patch("booker.tasks.SlackNotifier")
+    def test__call_without_notifier(self, notifier_mock):
+        sut = DigestNotificationTask(self.reservations)
+        sut()
+
+        notifier_mock.assert_called_once_with(concurrency=1)
+        notifier_mock.return_value.post.assert_called_once()
+        notifier_mock.return_value.close.assert_called_once_with()
+
+    def test__call_without_reservations(self):
+        notifier = MagicMock()
+
+        sut = DigestNotificationTask([], notifier)
+        sut()
+
+        notifier.post.assert_not_called()
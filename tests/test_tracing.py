@@ -0,0 +1,142 @@
+import io
+import json
+import os
+import tempfile
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+from booker import tracing
+
+
+@patch("booker.tracing.config")
+class TracingTestCase(TestCase):
+    def setUp(self):
+        tracing._spans.clear()
+        tracing.tag()
+        self.addCleanup(tracing._spans.clear)
+
+    def test_span_disabled(self, config_mock):
+        config_mock.TRACE = ""
+
+        with tracing.span("reserve", date="5月7日（土）"):
+            pass
+
+        self.assertIs(tracing.span("reserve"), tracing._NULL_SPAN)
+        self.assertEqual(tracing._spans, [])
+
+    def test_span(self, config_mock):
+        config_mock.TRACE = "jsonl"
+        tracing.tag(user="test@example.com")
+
+        with tracing.span("reserve", date="5月7日（土）"):
+            pass
+        with self.assertRaises(RuntimeError):
+            with tracing.span("capture"):
+                raise RuntimeError
+
+        reserve, capture = tracing._spans
+        self.assertEqual(reserve["name"], "reserve")
+        self.assertEqual(reserve["user"], "test@example.com")
+        self.assertEqual(reserve["date"], "5月7日（土）")
+        self.assertGreaterEqual(reserve["duration"], 0)
+        self.assertNotIn("error", reserve)
+        self.assertEqual(capture["error"], "RuntimeError")
+
+    def test_trace_driver_disabled(self, config_mock):
+        config_mock.TRACE = ""
+        driver = MagicMock()
+        execute = driver.execute
+
+        actual = tracing.trace_driver(driver)
+
+        self.assertEqual(actual, driver)
+        self.assertIs(actual.execute, execute)
+
+    def test_trace_driver(self, config_mock):
+        config_mock.TRACE = "jsonl"
+        driver = MagicMock()
+        execute = driver.execute
+
+        actual = tracing.trace_driver(driver)
+        result = actual.execute("get", {"url": "https://example.com"})
+
+        self.assertEqual(result, execute.return_value)
+        execute.assert_called_once_with("get", {"url": "https://example.com"})
+        self.assertEqual(
+            [record["name"] for record in tracing._spans], ["webdriver.get"]
+        )
+
+    def test_percentile(self, config_mock):
+        self.assertEqual(tracing.percentile([2, 1], 0.5), 1)
+        self.assertEqual(tracing.percentile(range(1, 21), 0.95), 19)
+        self.assertEqual(tracing.percentile([1], 0.0), 1)
+
+    def test_summarize(self, config_mock):
+        spans = [
+            {"name": "reserve", "duration": duration}
+            for duration in [0.1] * 18 + [1.0, 2.0]
+        ] + [{"name": "capture", "duration": 0.2}]
+
+        actual = tracing.summarize(spans)
+
+        self.assertEqual(
+            actual,
+            {
+                "capture": {"count": 1, "p50": 0.2, "p95": 0.2},
+                "reserve": {"count": 20, "p50": 0.1, "p95": 1.0},
+            },
+        )
+
+    def test_export_disabled(self, config_mock):
+        config_mock.TRACE = ""
+        tracing._spans.append({"name": "reserve", "duration": 0.1})
+
+        tracing.export()
+
+        self.assertEqual(len(tracing._spans), 1)
+
+    @patch("booker.tracing.logging")
+    def test_export_jsonl(self, logging_mock, config_mock):
+        config_mock.TRACE = "jsonl"
+        tracing._spans.append({"name": "reserve", "duration": 0.1})
+
+        with tempfile.TemporaryDirectory() as directory:
+            config_mock.TRACE_FILE = os.path.join(directory, "trace.jsonl")
+            tracing.export()
+
+            with open(config_mock.TRACE_FILE, encoding="utf-8") as f:
+                actual = [json.loads(line) for line in f]
+
+        self.assertEqual(
+            actual,
+            [
+                {"name": "reserve", "duration": 0.1},
+                {
+                    "name": "summary",
+                    "steps": {"reserve": {"count": 1, "p50": 0.1, "p95": 0.1}},
+                },
+            ],
+        )
+        self.assertEqual(tracing._spans, [])
+        logging_mock.info.assert_any_call(
+            "⏱ reserve: 1 spans, p50 100.0ms, p95 100.0ms"
+        )
+
+    def test_export_emf(self, config_mock):
+        config_mock.TRACE = "emf"
+        config_mock.TRACE_NAMESPACE = "booker"
+        tracing._spans.append({"name": "reserve", "duration": 0.1})
+        stdout = io.StringIO()
+
+        with patch("booker.tracing.sys.stdout", stdout):
+            tracing.export()
+
+        (actual,) = [
+            json.loads(line) for line in stdout.getvalue().splitlines()
+        ]
+        self.assertEqual(actual["Step"], "reserve")
+        self.assertEqual(actual["Count"], 1)
+        self.assertEqual(actual["p95"], 100.0)
+        self.assertEqual(
+            actual["_aws"]["CloudWatchMetrics"][0]["Namespace"], "booker"
+        )
@@ -0,0 +1,170 @@
+import json
+import os
+import tempfile
+from time import perf_counter
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+from booker import metadata
+from booker.waits import (
+    MIN_SAMPLES,
+    By,
+    LatencyStore,
+    StepWaiter,
+    listing_ready,
+    new_window,
+    title_known,
+)
+from selenium.common.exceptions import TimeoutException
+
+
+class ConditionsTestCase(TestCase):
+    def test_listing_ready(self):
+        driver = MagicMock()
+        driver.find_elements.return_value = ["a"]
+
+        actual = listing_ready(driver)
+
+        self.assertEqual(actual, ["a"])
+        driver.find_elements.assert_called_once_with(
+            By.CSS_SELECTOR, metadata.CSS_SELECTOR
+        )
+
+    def test_listing_ready_empty(self):
+        driver = MagicMock()
+        driver.find_elements.return_value = []
+        driver.execute_script.side_effect = ["loading", "complete"]
+
+        self.assertIs(listing_ready(driver), False)
+        self.assertEqual(listing_ready(driver), [])
+
+    def test_new_window(self):
+        driver = MagicMock()
+        driver.window_handles = ["top"]
+        self.assertFalse(new_window(driver))
+
+        driver.window_handles = ["top", "date"]
+        self.assertTrue(new_window(driver))
+
+    def test_title_known(self):
+        driver = MagicMock()
+        driver.title = ""
+        self.assertIs(title_known(driver), False)
+
+        driver.title = "申込みページ"
+        self.assertEqual(title_known(driver), "申込みページ")
+
+
+class StepWaiterTestCase(TestCase):
+    def setUp(self):
+        self.latencies = LatencyStore(os.devnull)
+        self.driver = MagicMock()
+
+    def test_wait(self):
+        self.driver.title = "申込みページ"
+
+        sut = StepWaiter(self.latencies, poll_frequency=0.01)
+        actual = sut.wait(self.driver, "application")
+
+        self.assertEqual(actual, "申込みページ")
+        self.assertTrue(self.latencies.dirty)
+
+    def test_wait_since_navigation(self):
+        self.driver.title = "申込みページ"
+
+        sut = StepWaiter(self.latencies, poll_frequency=0.01)
+        sut.wait(self.driver, "application", perf_counter() - 1.5)
+
+        self.assertGreaterEqual(
+            self.latencies._latencies["application"][0], 1.5
+        )
+
+    @patch("booker.waits.config")
+    def test_wait_explicit_timeout(self, config_mock):
+        config_mock.WAIT_TIMEOUT = 0.01
+        self.driver.title = "申込みページ"
+        self.driver.window_handles = ["top"]
+
+        sut = StepWaiter(self.latencies, poll_frequency=0.01)
+        started_at = perf_counter()
+        with self.assertRaises(TimeoutException):
+            sut.wait(self.driver, "window", timeout=0.2)
+
+        self.assertGreaterEqual(perf_counter() - started_at, 0.2)
+
+    def test_wait_error_page(self):
+        # the error page aborts even a step that would never be satisfied
+        self.driver.title = "エラー"
+        self.driver.window_handles = ["top"]
+
+        sut = StepWaiter(self.latencies, poll_frequency=0.01)
+        actual = sut.wait(self.driver, "window")
+
+        self.assertIs(actual, False)
+
+    @patch("booker.waits.config")
+    def test_wait_timeout(self, config_mock):
+        config_mock.WAIT_TIMEOUT = 0.05
+        self.driver.title = "申込みページ"
+        self.driver.window_handles = ["top"]
+
+        sut = StepWaiter(self.latencies, poll_frequency=0.01)
+        with self.assertRaises(TimeoutException):
+            sut.wait(self.driver, "window")
+        self.assertFalse(self.latencies.dirty)
+
+
+@patch("booker.waits.config")
+class LatencyStoreTestCase(TestCase):
+    def test_timeout_without_samples(self, config_mock):
+        config_mock.WAIT_TIMEOUT = 10
+
+        sut = LatencyStore(os.devnull)
+        for _ in range(MIN_SAMPLES - 1):
+            sut.record("form", 0.1)
+
+        self.assertEqual(sut.timeout("form"), 10)
+
+    def test_timeout(self, config_mock):
+        config_mock.WAIT_TIMEOUT = 10
+        config_mock.WAIT_MIN_TIMEOUT = 0.5
+
+        sut = LatencyStore(os.devnull)
+        for elapsed in [0.1] * 18 + [1.0, 2.0]:
+            sut.record("form", elapsed)
+        sut.record("listing", 100)
+
+        self.assertAlmostEqual(sut.timeout("form"), 3.0)
+        self.assertEqual(sut.timeout("listing"), config_mock.WAIT_TIMEOUT)
+
+    def test_timeout_floor(self, config_mock):
+        config_mock.WAIT_TIMEOUT = 10
+        config_mock.WAIT_MIN_TIMEOUT = 0.5
+
+        sut = LatencyStore(os.devnull)
+        for _ in range(MIN_SAMPLES):
+            sut.record("form", 0.01)
+
+        self.assertEqual(sut.timeout("form"), 0.5)
+
+    def test_save_and_load(self, config_mock):
+        with tempfile.TemporaryDirectory() as directory:
+            file = os.path.join(directory, "latencies.json")
+            sut = LatencyStore(file)
+            sut.record("form", 0.12345)
+            sut.save()
+
+            with open(file, encoding="utf-8") as f:
+                self.assertEqual(json.load(f), {"form": [0.1235]})
+            self.assertFalse(sut.dirty)
+
+            actual = LatencyStore(file)
+            actual.load()
+
+        self.assertEqual(list(actual._latencies["form"]), [0.1235])
+
+    def test_load_missing(self, config_mock):
+        sut = LatencyStore("/nonexistent/latencies.json")
+        sut.load()
+
+        self.assertEqual(dict(sut._latencies), {})